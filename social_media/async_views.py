@@ -0,0 +1,160 @@
+"""
+Async versions of the hot read endpoints, for deployments served by an ASGI
+server. They return the same payloads as their ``PostViewSet`` and
+``ProfileViewSet`` counterparts but wait on the database and the cache
+without holding a thread.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from user.authentication import CachedJWTAuthentication
+from . import cache, timeline
+from .models import Like, Post, Profile
+from .pagination import (
+    LikeCursorPagination,
+    PostCursorPagination,
+    get_feed_pagination_class,
+)
+from .serializers import (
+    PostDetailSerializer,
+    PostListSerializer,
+    PostSerializer,
+    ProfileDetailSerializer,
+)
+
+authentication = CachedJWTAuthentication()
+
+
+def render(data, status_code=200):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json",
+    )
+
+
+def error_response(request, exc):
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {"detail": exc.detail}
+
+    response = render(data, exc.status_code)
+    if isinstance(exc, exceptions.NotAuthenticated):
+        response["WWW-Authenticate"] = authentication.authenticate_header(request)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = "%d" % exc.wait
+    return response
+
+
+async def authenticate(request):
+    result = await authentication.aauthenticate(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+
+    drf_request = Request(request)
+    drf_request.user, drf_request.auth = result
+    return drf_request
+
+
+async def check_throttles(request):
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        allow_request = sync_to_async(throttle.allow_request, thread_sensitive=False)
+        if not await allow_request(request, None):
+            raise exceptions.Throttled(throttle.wait())
+
+
+def async_api_view(view):
+    """
+    Give an async GET view what ``APIView`` gives the sync ones: JWT
+    authentication, throttling and error responses. The view receives a DRF
+    ``Request`` and returns the data to render as JSON.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return render({"detail": f'Method "{request.method}" not allowed.'}, 405)
+
+        try:
+            drf_request = await authenticate(request)
+            await check_throttles(drf_request)
+            data = await view(drf_request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return error_response(request, exc)
+
+        return render(data)
+
+    return wrapper
+
+
+async def aget_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise exceptions.NotFound()
+
+
+async def paginate(
+    request, queryset, serializer_class, pagination_class=PostCursorPagination
+):
+    paginator = pagination_class()
+    page = await paginator.apaginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True, context={"request": request})
+    return paginator.get_paginated_response(serializer.data).data
+
+
+@async_api_view
+async def post_list(request):
+    """The feed of ``PostViewSet.list``; filtering stays on the sync endpoint."""
+    queryset = await timeline.afeed(
+        request.user.profile, Post.objects.for_action("list")
+    )
+    return await paginate(
+        request, queryset, PostListSerializer, get_feed_pagination_class(request)
+    )
+
+
+@async_api_view
+async def post_detail(request, pk):
+    visible = Post.objects.visible_to(request.user.profile).distinct()
+    author_id = await aget_or_404(visible.values_list("author_id", flat=True), pk=pk)
+
+    async def load():
+        post = await aget_or_404(visible.for_action("retrieve"), pk=pk)
+        return PostDetailSerializer(post, context={"request": request}).data
+
+    return await cache.acached(
+        "post", pk, [("post", pk), ("profile", author_id)], load
+    )
+
+
+@async_api_view
+async def liked_posts(request):
+    likes = Like.objects.filter(profile=request.user.profile)
+    paginator = LikeCursorPagination()
+    page = await paginator.apaginate_queryset(
+        likes.select_related("post__author"), request
+    )
+    serializer = PostSerializer(
+        [like.post for like in page], many=True, context={"request": request}
+    )
+    return paginator.get_paginated_response(serializer.data).data
+
+
+@async_api_view
+async def profile_detail(request, pk):
+    async def load():
+        profile = await aget_or_404(
+            Profile.objects.for_action("retrieve").distinct(), pk=pk
+        )
+        return ProfileDetailSerializer(profile, context={"request": request}).data
+
+    return await cache.acached("profile", pk, [("profile", pk)], load)
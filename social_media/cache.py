@@ -0,0 +1,172 @@
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from . import metrics
+
+DEFAULTS = {
+    "ALIAS": "default",
+    "ENABLED": True,
+    "TIMEOUT": 300,
+    "AUTH_TIMEOUT": 60,
+    "KEY_PREFIX": "sm",
+}
+
+stats = Counter()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_CACHE", {})}
+
+
+def is_enabled():
+    return get_config()["ENABLED"]
+
+
+def get_cache():
+    return caches[get_config()["ALIAS"]]
+
+
+def version_key(kind, pk):
+    return f"{get_config()['KEY_PREFIX']}:version:{kind}:{pk}"
+
+
+def get_versions(dependencies):
+    """
+    Return the current version of every ``(kind, pk)`` pair.
+
+    A missing version is created on the spot rather than read as 0, so an
+    evicted version key can never resurrect entries cached before a bump.
+    """
+    cache = get_cache()
+    keys = [version_key(kind, pk) for kind, pk in dependencies]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(dependencies):
+    """``get_versions`` through the async cache API."""
+    cache = get_cache()
+    keys = [version_key(kind, pk) for kind, pk in dependencies]
+    versions = await cache.aget_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, time.time_ns(), None)
+            versions[key] = await cache.aget(key)
+
+    return [versions[key] for key in keys]
+
+
+def _bump(keys):
+    get_cache().set_many(dict.fromkeys(keys, time.time_ns()), None)
+
+
+def invalidate(kind, *pks):
+    """
+    Move ``(kind, pk)`` to a new version right away and again after commit,
+    so readers that cached the pre-commit state in between are discarded.
+    """
+    if not is_enabled() or not pks:
+        return
+
+    keys = [version_key(kind, pk) for pk in pks]
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def _join_key(kind, pk, versions, viewer):
+    parts = [get_config()["KEY_PREFIX"], kind, str(pk)]
+    parts.extend(str(version) for version in versions)
+
+    if viewer is not None:
+        parts.append(f"viewer-{viewer}")
+
+    return ":".join(parts)
+
+
+def make_key(kind, pk, dependencies, viewer=None):
+    return _join_key(kind, pk, get_versions(dependencies), viewer)
+
+
+async def amake_key(kind, pk, dependencies, viewer=None):
+    return _join_key(kind, pk, await aget_versions(dependencies), viewer)
+
+
+def cache_stats():
+    requests = stats["hits"] + stats["misses"]
+    return {
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "hit_ratio": stats["hits"] / requests if requests else 0.0,
+    }
+
+
+async def acached(kind, pk, dependencies, load, viewer=None):
+    """
+    Async read-through of one serialized payload for async views, keyed as
+    ``CachedRetrieveMixin`` keys it. ``load`` is awaited on a miss.
+    """
+    if not is_enabled():
+        return await load()
+
+    key = await amake_key(kind, pk, dependencies, viewer)
+    data = await get_cache().aget(key)
+
+    if data is not None:
+        stats["hits"] += 1
+        metrics.count("cache_hits")
+        return data
+
+    stats["misses"] += 1
+    metrics.count("cache_misses")
+    data = await load()
+    await get_cache().aset(key, data, get_config()["TIMEOUT"])
+    return data
+
+
+class CachedRetrieveMixin:
+    """
+    Serve ``retrieve`` from a read-through cache of the serialized payload.
+
+    Visibility is still checked on every request through
+    ``get_cache_dependencies``, which returns the ``(kind, pk)`` pairs whose
+    versions make up the key.
+    """
+
+    cache_kind = None
+    cache_per_viewer = False
+
+    def get_cache_dependencies(self, pk):
+        return [(self.cache_kind, pk)]
+
+    def retrieve(self, request, *args, **kwargs):
+        if not is_enabled():
+            return super().retrieve(request, *args, **kwargs)
+
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        dependencies = self.get_cache_dependencies(pk)
+        viewer = request.user.pk if self.cache_per_viewer else None
+        key = make_key(self.cache_kind, pk, dependencies, viewer)
+        data = get_cache().get(key)
+
+        if data is not None:
+            stats["hits"] += 1
+            metrics.count("cache_hits")
+            return Response(data)
+
+        stats["misses"] += 1
+        metrics.count("cache_misses")
+        response = super().retrieve(request, *args, **kwargs)
+        get_cache().set(key, response.data, get_config()["TIMEOUT"])
+        return response
@@ -0,0 +1,165 @@
+"""
+The delta feed: what changed in a profile's feed since a watermark.
+
+New and edited posts are read in ``(updated_at, id)`` order and deleted
+posts as tombstones in id order. The watermark is an opaque cursor holding
+the position reached in both. The feed is a merge of id lists capped at the
+timeline length, so the posts are sorted rather than read in index order.
+
+Timestamps and ids are taken before commit, so a slow transaction can
+become visible behind a watermark already handed out. Only rows older than
+``LAG`` are read, which leaves in-flight writes time to commit.
+
+``updated_at`` moves on saves, publishing and image changes, not on the
+counter and score updates: each like would otherwise resend the post to
+every follower's next poll. Clients get fresh counts when they load a post.
+"""
+import hashlib
+import json
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from .models import Follow, PostTombstone
+from .pagination import keyset_condition
+
+DEFAULTS = {
+    "PAGE_SIZE": 100,
+    "TOMBSTONE_MAX_AGE": timedelta(days=30),
+    "LAG": timedelta(seconds=10),
+}
+
+ORDERING = ("updated_at", "id")
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "The cursor is older than the deletions kept; reload the feed."
+    default_code = "cursor_expired"
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_DELTA", {})}
+
+
+def encode_cursor(position, tombstone_id):
+    payload = {
+        "p": position and [position[0].isoformat(), position[1]],
+        "d": tombstone_id,
+        "s": int(time.time()),
+    }
+    return urlsafe_b64encode(
+        json.dumps(payload, separators=(",", ":")).encode()
+    ).decode()
+
+
+def decode_cursor(cursor):
+    """Return the post position and tombstone id of ``cursor``."""
+    try:
+        payload = json.loads(urlsafe_b64decode(cursor.encode()))
+        position, tombstone_id, issued = payload["p"], payload["d"], payload["s"]
+        if position is not None:
+            updated_at, pk = parse_datetime(position[0]), int(position[1])
+            if updated_at is None:
+                raise ValueError
+            position = (updated_at, pk)
+        tombstone_id, issued = int(tombstone_id), int(issued)
+    except (TypeError, ValueError, KeyError, IndexError):
+        raise NotFound("Invalid cursor")
+
+    # Tombstones after the cursor are newer than it, so none of them has
+    # been purged while the cursor is younger than the tombstones kept.
+    max_age = get_config()["TOMBSTONE_MAX_AGE"].total_seconds()
+    if time.time() - issued > max_age:
+        raise CursorExpired()
+
+    return position, tombstone_id
+
+
+def feed_author_ids(profile):
+    return Q(author_id=profile.pk) | Q(
+        author_id__in=Follow.objects.filter(to_profile=profile).values("from_profile")
+    )
+
+
+class Delta:
+    def __init__(self, posts, deleted, cursor, has_more):
+        self.posts = posts
+        self.deleted = deleted
+        self.cursor = cursor
+        self.has_more = has_more
+
+    def etag(self, viewer):
+        """
+        A tag of the changes, so repeated polls with nothing new get a 304.
+        The cursor itself is not part of it, it carries its issue time.
+        """
+        changes = [
+            viewer,
+            [(post.pk, post.updated_at.isoformat()) for post in self.posts],
+            self.deleted,
+        ]
+        digest = hashlib.sha1(json.dumps(changes).encode()).hexdigest()
+        return f'"{digest}"'
+
+
+def changes(profile, feed, since=None, page_size=None):
+    """
+    The posts of ``feed``, the feed queryset of ``profile``, created or
+    edited after the ``since`` cursor and the ids of its posts deleted
+    since, at most ``page_size`` of each.
+
+    Without ``since`` the whole feed is returned from its oldest post, with
+    no deletions.
+    """
+    config = get_config()
+    page_size = page_size or config["PAGE_SIZE"]
+    horizon = timezone.now() - config["LAG"]
+    settled = PostTombstone.objects.filter(deleted_at__lte=horizon)
+
+    if since:
+        position, tombstone_id = decode_cursor(since)
+    else:
+        position = None
+        latest = settled.order_by("-id").values_list("id", flat=True).first()
+        tombstone_id = latest or 0
+
+    posts = feed.filter(updated_at__lte=horizon).order_by(*ORDERING)
+    if position is not None:
+        posts = posts.filter(keyset_condition(ORDERING, position))
+    posts = list(posts[: page_size + 1])
+
+    tombstones = list(
+        settled.filter(feed_author_ids(profile), id__gt=tombstone_id)
+        .order_by("id")
+        .values_list("id", "post_id")[: page_size + 1]
+    )
+
+    has_more = len(posts) > page_size or len(tombstones) > page_size
+    posts, tombstones = posts[:page_size], tombstones[:page_size]
+
+    if posts:
+        position = (posts[-1].updated_at, posts[-1].pk)
+    if tombstones:
+        tombstone_id = tombstones[-1][0]
+
+    return Delta(
+        posts,
+        [post_id for _, post_id in tombstones],
+        encode_cursor(position, tombstone_id),
+        has_more,
+    )
+
+
+def purge_tombstones():
+    """Drop tombstones older than any cursor still accepted."""
+    cutoff = timezone.now() - get_config()["TOMBSTONE_MAX_AGE"]
+    deleted, _ = PostTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
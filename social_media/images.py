@@ -0,0 +1,177 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import cache
+
+DEFAULTS = {
+    # Longest edge in pixels; images are only ever scaled down.
+    "RENDITIONS": {"thumbnail": 150, "feed": 640, "full": 1600},
+    # File extension -> Pillow format.
+    "FORMATS": {"webp": "WEBP", "jpeg": "JPEG"},
+    "QUALITY": 82,
+    "POOL_SIZE": 2,
+}
+
+# The image field processed for each model, keyed by model label.
+IMAGE_FIELDS = {
+    "social_media.post": "image",
+    "social_media.profile": "profile_pic",
+}
+
+_pool = None
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_IMAGES", {})}
+
+
+def get_pool():
+    global _pool
+
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=get_config()["POOL_SIZE"])
+
+    return _pool
+
+
+def renditions_field(field):
+    return f"{field}_renditions"
+
+
+def auto_now_fields(model):
+    """
+    Names of the ``auto_now`` fields of ``model``, which partial writes
+    must name to move them, e.g. ``Post.updated_at`` read by the delta feed.
+    """
+    return [
+        field.name
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+    ]
+
+
+def needs_processing(instance):
+    """Whether the stored renditions were not built from the current image."""
+    field = IMAGE_FIELDS[instance._meta.label_lower]
+    renditions = getattr(instance, renditions_field(field))
+    return (getattr(instance, field).name or "") != renditions.get("source", "")
+
+
+def render(data, renditions, formats, quality):
+    """
+    Decode ``data`` once and encode every rendition in every format.
+
+    Only plain bytes and dicts go in and out, so this can run in a worker
+    process. Pillow never copies EXIF on save unless asked to, which strips
+    it once the orientation has been applied to the pixels.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.mode or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    output = {}
+    for name, size in renditions.items():
+        resized = image.copy()
+        resized.thumbnail((size, size))
+        output[name] = {}
+
+        for extension, image_format in formats.items():
+            encoded = resized
+            if image_format == "JPEG" and resized.mode != "RGB":
+                encoded = resized.convert("RGB")
+
+            buffer = io.BytesIO()
+            encoded.save(buffer, format=image_format, quality=quality)
+            output[name][extension] = buffer.getvalue()
+
+    return output
+
+
+def delete_files(renditions):
+    for name, paths in renditions.items():
+        if name != "source":
+            for path in paths.values():
+                default_storage.delete(path)
+
+
+def process(label, pk, in_pool=False):
+    """
+    Build the renditions of the image on ``label`` object ``pk`` and store
+    their paths, unless the image was replaced while they were rendered.
+    """
+    model = apps.get_model(label)
+    field = IMAGE_FIELDS[label]
+    target = renditions_field(field)
+    instance = model.objects.filter(pk=pk).only(field, target).first()
+
+    if instance is None or not needs_processing(instance):
+        return
+
+    image = getattr(instance, field)
+    previous = getattr(instance, target)
+    renditions = {"source": image.name or ""}
+
+    if image.name:
+        with image.open("rb"):
+            data = image.read()
+
+        config = get_config()
+        args = (data, config["RENDITIONS"], config["FORMATS"], config["QUALITY"])
+        if in_pool:
+            output = get_pool().submit(render, *args).result()
+        else:
+            output = render(*args)
+
+        stem, _ = os.path.splitext(os.path.basename(image.name))
+        directory = os.path.join(os.path.dirname(image.name), "renditions")
+        for name, encoded in output.items():
+            renditions[name] = {
+                extension: default_storage.save(
+                    os.path.join(directory, f"{stem}-{name}.{extension}"),
+                    ContentFile(content),
+                )
+                for extension, content in encoded.items()
+            }
+
+    if image.name:
+        unchanged = Q(**{field: image.name})
+    else:
+        unchanged = Q(**{field: ""}) | Q(**{f"{field}__isnull": True})
+
+    now = timezone.now()
+    updated = model.objects.filter(unchanged, pk=pk).update(
+        **{target: renditions}, **{name: now for name in auto_now_fields(model)}
+    )
+    delete_files(previous if updated else renditions)
+
+    if updated:
+        cache.invalidate(model._meta.model_name, pk)
+
+
+def rendition_urls(renditions, request=None):
+    urls = {}
+
+    for name, paths in renditions.items():
+        if name == "source":
+            continue
+
+        urls[name] = {}
+        for extension, path in paths.items():
+            url = default_storage.url(path)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[name][extension] = url
+
+    return urls
@@ -0,0 +1,230 @@
+import json
+import math
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from social_media.models import Post, Profile
+
+
+# Scenarios that flip state on each request; they run an even number of
+# times so the data is left as found and the next run measures the same rows.
+TOGGLES = {"like_toggle", "follow"}
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency, queries and response size of the main API endpoints "
+        "and optionally save or compare against a JSON baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--viewer",
+            help="Username to benchmark as; defaults to the profile that "
+            "follows the most profiles.",
+        )
+        parser.add_argument("--query", default="seed", help="Search query.")
+        parser.add_argument("--no-cache", action="store_true")
+        parser.add_argument("--output", help="Write the results to this file.")
+        parser.add_argument(
+            "--compare", help="Fail if results regress against this baseline."
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed relative growth of latency and response size.",
+        )
+
+    def handle(self, *args, **options):
+        viewer = self.get_viewer(options["viewer"])
+        post, target = self.get_targets(viewer)
+        client = APIClient()
+        client.force_authenticate(viewer.user)
+
+        overrides = {
+            "ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"],
+            "REST_FRAMEWORK": {
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_RATES": {},
+            },
+        }
+        if options["no_cache"]:
+            overrides["SOCIAL_MEDIA_CACHE"] = {
+                **getattr(settings, "SOCIAL_MEDIA_CACHE", {}),
+                "ENABLED": False,
+            }
+
+        with override_settings(**overrides):
+            results = {
+                name: self.measure(client, scenario, options, name in TOGGLES)
+                for name, scenario in self.get_scenarios(post, target, options).items()
+            }
+
+        report = {
+            "meta": {
+                "viewer": viewer.username,
+                "post": post.id,
+                "target": target.id,
+                "requests": options["requests"],
+                "profiles": Profile.objects.count(),
+                "posts": Post.objects.count(),
+                "cache": not options["no_cache"],
+            },
+            "results": results,
+        }
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<16} p50 {result['p50_ms']:8.2f} ms  "
+                f"p99 {result['p99_ms']:8.2f} ms  "
+                f"{result['queries']:3d} queries  {result['bytes']:8d} bytes"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2, sort_keys=True)
+
+        if options["compare"]:
+            self.compare(report, options["compare"], options["tolerance"])
+
+    def get_viewer(self, username):
+        profiles = Profile.objects.select_related("user")
+
+        if username:
+            viewer = profiles.filter(username=username).first()
+        else:
+            viewer = profiles.order_by("-following_count", "id").first()
+
+        if viewer is None:
+            raise CommandError("No viewer found; run seed_social_graph first.")
+        return viewer
+
+    def get_targets(self, viewer):
+        """
+        The post and profile the detail and toggle scenarios act on, picked
+        by id so they stay the same between runs.
+        """
+        posts = Post.objects.order_by("id")
+        post = (
+            posts.filter(author__in=viewer.following.all()).first()
+            or posts.filter(author=viewer).first()
+        )
+        target = (
+            Profile.objects.exclude(pk=viewer.pk)
+            .exclude(followers=viewer)
+            .order_by("id")
+            .first()
+        )
+        if post is None or target is None:
+            raise CommandError(
+                "The viewer needs a visible post and a profile to follow."
+            )
+        return post, target
+
+    def get_scenarios(self, post, target, options):
+        """Map scenario names to callables returning a request per iteration."""
+
+        def follow(index):
+            action = "follow" if index % 2 == 0 else "unfollow"
+            return "post", reverse(f"social_media:profile-{action}", args=[target.id])
+
+        return {
+            "feed": lambda index: ("get", reverse("social_media:post-list")),
+            "post_detail": lambda index: (
+                "get",
+                reverse("social_media:post-detail", args=[post.id]),
+            ),
+            "liked_posts": lambda index: (
+                "get",
+                reverse("social_media:post-liked-posts"),
+            ),
+            "profile_list": lambda index: (
+                "get",
+                reverse("social_media:profile-list"),
+            ),
+            "profile_search": lambda index: (
+                "get",
+                f"{reverse('social_media:profile-search')}?q={options['query']}",
+            ),
+            "like_toggle": lambda index: (
+                "post",
+                reverse("social_media:post-like-unlike", args=[post.id]),
+            ),
+            "follow": follow,
+        }
+
+    def measure(self, client, scenario, options, toggle=False):
+        latencies, queries, sizes = [], [], []
+        iterations = options["warmup"] + options["requests"]
+        if toggle:
+            iterations += iterations % 2
+
+        for index in range(iterations):
+            method, url = scenario(index)
+
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = getattr(client, method)(url)
+                elapsed = time.perf_counter() - started
+
+            if response.status_code >= 400:
+                raise CommandError(f"{method.upper()} {url}: {response.status_code}")
+            if index >= options["warmup"]:
+                latencies.append(elapsed * 1000)
+                queries.append(len(captured))
+                sizes.append(len(response.content))
+
+        return {
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "queries": max(queries),
+            "bytes": max(sizes),
+        }
+
+    def compare(self, report, path, tolerance):
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        for key in ("viewer", "post", "target"):
+            if baseline["meta"].get(key) != report["meta"][key]:
+                raise CommandError(
+                    f"The baseline was measured with {key} "
+                    f"{baseline['meta'].get(key)}, not {report['meta'][key]}."
+                )
+
+        regressions = []
+        for name, expected in baseline["results"].items():
+            actual = report["results"].get(name)
+            if actual is None:
+                continue
+
+            if actual["queries"] > expected["queries"]:
+                regressions.append(
+                    f"{name}: {actual['queries']} queries, "
+                    f"baseline {expected['queries']}"
+                )
+            for metric in ("p50_ms", "p99_ms", "bytes"):
+                if actual[metric] > expected[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{name}: {metric} {actual[metric]}, "
+                        f"baseline {expected[metric]}"
+                    )
+
+        if regressions:
+            raise CommandError("Regressions found:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
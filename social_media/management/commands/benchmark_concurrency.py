@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from social_media.metrics import percentile
+from social_media.models import Profile
+
+ENDPOINTS = {
+    "feed": ("social_media:post-list", "social_media:async-post-list"),
+    "liked_posts": (
+        "social_media:post-liked-posts",
+        "social_media:async-post-liked-posts",
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of a read endpoint served by the sync view "
+        "through WSGI with its async view through ASGI at high concurrency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", choices=list(ENDPOINTS), default="feed")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=32,
+            help="Worker threads of the WSGI run, like a threaded worker.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=500,
+            help="Requests in flight at once in the ASGI run.",
+        )
+        parser.add_argument("--viewer", help="Username to benchmark as.")
+        parser.add_argument("--output", help="Write the results to this file.")
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.select_related("user")
+        if options["viewer"]:
+            viewer = profiles.filter(username=options["viewer"]).first()
+        else:
+            viewer = profiles.order_by("-following_count", "id").first()
+        if viewer is None:
+            raise CommandError("No viewer found; run seed_social_graph first.")
+
+        sync_name, async_name = ENDPOINTS[options["endpoint"]]
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(viewer.user)}"}
+
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}},
+        ):
+            results = {
+                "wsgi": self.run_wsgi(reverse(sync_name), headers, options),
+                "asgi": asyncio.run(
+                    self.run_asgi(reverse(async_name), headers, options)
+                ),
+            }
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name}  {result['throughput']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(
+                    {"endpoint": options["endpoint"], "results": results},
+                    output,
+                    indent=2,
+                    sort_keys=True,
+                )
+
+    def run_wsgi(self, url, headers, options):
+        def request(_):
+            started = time.perf_counter()
+            response = Client().get(url, headers=headers)
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            outcomes = list(executor.map(request, range(options["requests"])))
+        return self.summarize(outcomes, time.perf_counter() - started)
+
+    async def run_asgi(self, url, headers, options):
+        client = AsyncClient()
+        slots = asyncio.Semaphore(options["concurrency"])
+
+        async def request():
+            async with slots:
+                started = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(request() for _ in range(options["requests"]))
+        )
+        return self.summarize(outcomes, time.perf_counter() - started)
+
+    def summarize(self, outcomes, elapsed):
+        failed = [status for status, _ in outcomes if status != 200]
+        if failed:
+            raise CommandError(f"{len(failed)} requests failed, e.g. {failed[0]}.")
+
+        latencies = [duration * 1000 for _, duration in outcomes]
+        return {
+            "requests": len(outcomes),
+            "throughput": round(len(outcomes) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+        }
@@ -0,0 +1,179 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from social_media import delta, timeline
+from social_media.models import (
+    Comment,
+    Follow,
+    Like,
+    Post,
+    PostTombstone,
+    Profile,
+    TimelineEntry,
+)
+from social_media.pagination import (
+    LikeCursorPagination,
+    PostCursorPagination,
+    PostScoreCursorPagination,
+    keyset_condition,
+)
+
+# Plan lines that read a whole table or index rather than a range of one.
+FULL_SCANS = {
+    "sqlite": re.compile(r"\bSCAN (?!CONSTANT ROW\b|\(subquery)"),
+    "postgresql": re.compile(r"\bSeq Scan on\b"),
+    "mysql": re.compile(r"\btype\W+(ALL|index)\b"),
+}
+
+# Plan lines that sort the rows instead of reading them in index order.
+SORTS = {
+    "sqlite": re.compile(r"\bUSE TEMP B-TREE FOR .*ORDER BY\b"),
+    "postgresql": re.compile(r"^\s*(->\s+)?(Incremental )?Sort\s+\("),
+    "mysql": re.compile(r"\bUsing filesort\b"),
+}
+
+# Paginated queries allowed to sort, and why what they sort stays small.
+BOUNDED_SORTS = {
+    "feed": "merges the timeline and each heavy author's newest posts, "
+    "MAX_LENGTH at most each",
+    "feed_top": "the same merge as the feed",
+    "feed_delta": "the same merge as the feed",
+    "delta_tombstones": "deletions of followed authors within TOMBSTONE_MAX_AGE",
+}
+
+
+def page(queryset, ordering, position, size=20):
+    """A keyset page after ``position``, as the cursor paginators read it."""
+    queryset = queryset.order_by(*ordering)
+    return queryset.filter(keyset_condition(ordering, position))[: size + 1]
+
+
+def main_queries(profile_id=1, post_id=1):
+    """The hot query shapes, keyed by name, with placeholder ids."""
+    now = timezone.now()
+    feed = timeline.filter_feed(
+        Post.objects.for_action("list"),
+        timeline.get_backend().post_ids(profile_id),
+        [profile_id + 1, profile_id + 2],
+    )
+
+    return {
+        "timeline": TimelineEntry.objects.filter(profile_id=profile_id)
+        .order_by("-created_at")
+        .values_list("post_id", flat=True)[:800],
+        "heavy_authors": Profile.objects.filter(
+            followers=profile_id, followers_count__gt=1000
+        ).values_list("id", flat=True),
+        "author_posts": timeline.newest_post_ids(profile_id, 800),
+        "feed": page(feed, PostCursorPagination.ordering, (now, post_id)),
+        "feed_top": page(feed, PostScoreCursorPagination.ordering, (1.0, post_id)),
+        "feed_delta": page(
+            feed.filter(updated_at__lte=now), delta.ORDERING, (now, post_id), 100
+        ),
+        "post_comments": Comment.objects.filter(post_id=post_id)[:20],
+        "post_likers": Like.objects.filter(post_id=post_id).values_list(
+            "profile_id", flat=True
+        ),
+        "liked_posts": page(
+            Like.objects.filter(profile_id=profile_id).select_related("post__author"),
+            LikeCursorPagination.ordering,
+            (post_id,),
+        ),
+        "followers": Follow.objects.filter(from_profile_id=profile_id).values_list(
+            "to_profile_id", flat=True
+        ),
+        "following": Follow.objects.filter(to_profile_id=profile_id).values_list(
+            "from_profile_id", flat=True
+        ),
+        "delta_tombstones": PostTombstone.objects.filter(
+            delta.feed_author_ids(Profile(pk=profile_id)),
+            id__gt=post_id,
+            deleted_at__lte=now,
+        ).order_by("id")[:101],
+        "scheduled_due": Post.objects.filter(
+            status=Post.Status.SCHEDULED, scheduled_time__lte=now
+        ).order_by("scheduled_time", "id")[:100],
+    }
+
+
+def matching_lines(patterns, plan, vendor=None):
+    pattern = patterns.get(vendor or connection.vendor)
+    if pattern is None:
+        return []
+    return [line.strip() for line in plan.splitlines() if pattern.search(line)]
+
+
+def postgresql_full_index_scans(plan):
+    """Index scans without an ``Index Cond``, which walk the whole index."""
+    lines = plan.splitlines()
+    scans = []
+
+    for number, line in enumerate(lines):
+        if not re.search(r"\bIndex (Only )?Scan\b", line):
+            continue
+        indent = len(line) - len(line.lstrip())
+        details = []
+        for detail in lines[number + 1 :]:
+            if len(detail) - len(detail.lstrip()) <= indent or "->" in detail:
+                break
+            details.append(detail)
+        if not any("Index Cond:" in detail for detail in details):
+            scans.append(line.strip())
+
+    return scans
+
+
+def full_scans(plan, vendor=None):
+    vendor = vendor or connection.vendor
+    scans = matching_lines(FULL_SCANS, plan, vendor)
+    if vendor == "postgresql":
+        scans += postgresql_full_index_scans(plan)
+    return scans
+
+
+def sorts(plan, vendor=None):
+    return matching_lines(SORTS, plan, vendor)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the main queries and fail if any of them scans a "
+        "whole table or index, or sorts a page instead of reading an index "
+        "in order."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--show-plans", action="store_true", help="Print every query plan."
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in FULL_SCANS:
+            raise CommandError(f"Unsupported database vendor: {connection.vendor}")
+
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # Small tables are sequentially scanned whether indexed or not.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for name, queryset in main_queries().items():
+                plan = queryset.explain()
+                if options["show_plans"]:
+                    self.stdout.write(f"{name}:\n{plan}\n")
+                    if name in BOUNDED_SORTS:
+                        self.stdout.write(f"(may sort: {BOUNDED_SORTS[name]})\n")
+
+                problems = full_scans(plan)
+                if queryset.query.is_sliced and name not in BOUNDED_SORTS:
+                    problems += sorts(plan)
+                if problems:
+                    failures.append(f"{name}: {'; '.join(problems)}")
+
+        if failures:
+            raise CommandError("Full scans or sorts found:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("Every query uses an index."))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from social_media.models import Post
+
+
+class Command(BaseCommand):
+    help = "Publish scheduled posts that are due, once or in a loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling instead of exiting after one pass.",
+        )
+        parser.add_argument("--interval", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        while True:
+            total = Post.objects.publish_due(batch_size=options["batch_size"])
+            self.stdout.write(f"Published {total} scheduled posts.")
+
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
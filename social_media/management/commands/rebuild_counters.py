@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from social_media import ranking
+from social_media.models import Comment, Post, Profile
+
+COUNTERS = (
+    (Post, "likes_count", Post.likes.through, "post"),
+    (Post, "comments_count", Comment, "post"),
+    (Profile, "followers_count", Profile.followers.through, "from_profile"),
+    (Profile, "following_count", Profile.followers.through, "to_profile"),
+)
+
+
+def related_count(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized like, comment and follow counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted rows without fixing them.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+
+        for model, counter, related_model, related_field in COUNTERS:
+            actual = related_count(related_model, related_field)
+            drifted = model.objects.annotate(actual=actual).exclude(
+                **{counter: F("actual")}
+            )
+            count = drifted.count()
+            total += count
+
+            if count and not options["dry_run"]:
+                model.objects.filter(pk__in=drifted.values("pk")).update(
+                    **{counter: actual}
+                )
+
+            self.stdout.write(f"{model.__name__}.{counter}: {count} drifted")
+
+        if total and not options["dry_run"]:
+            # Scores are derived from the post counters.
+            Post.objects.update(score=ranking.score_expression())
+
+        action = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"{action} {total} drifted counters."))
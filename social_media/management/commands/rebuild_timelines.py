@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from social_media import timeline
+from social_media.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Backfill every profile timeline from its own and followed profiles."
+
+    def handle(self, *args, **options):
+        total = 0
+
+        for profile in Profile.objects.only("id").iterator():
+            author_ids = [profile.id]
+            author_ids.extend(profile.following.values_list("id", flat=True))
+            timeline.follow(profile.id, author_ids)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} timelines."))
@@ -0,0 +1,185 @@
+import random
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from social_media import ranking, search
+from social_media.models import Comment, Post, Profile
+
+BATCH_SIZE = 1000
+
+
+def popularity_weights(size, alpha):
+    """Zipf weights, so that a few profiles or posts draw most attention."""
+    return list(accumulate(1 / rank**alpha for rank in range(1, size + 1)))
+
+
+def sample_count(rng, mean):
+    return round(rng.expovariate(1 / mean)) if mean > 0 else 0
+
+
+def chunks(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def sample_targets(rng, population, cum_weights, count, exclude):
+    """Draw up to ``count`` distinct items by weight, skipping ``exclude``."""
+    chosen = set()
+    if not population:
+        return chosen
+
+    for _ in range(count * 3):
+        if len(chosen) >= count:
+            break
+        target = rng.choices(population, cum_weights=cum_weights)[0]
+        if target != exclude:
+            chosen.add(target)
+
+    return chosen
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a synthetic social graph with power-law follower, like and "
+        "post distributions for benchmarking."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", type=int, default=1000)
+        parser.add_argument(
+            "--follows", type=int, default=50, help="Mean follows per profile."
+        )
+        parser.add_argument(
+            "--posts", type=int, default=5, help="Mean posts per profile."
+        )
+        parser.add_argument(
+            "--likes", type=int, default=20, help="Mean likes per profile."
+        )
+        parser.add_argument(
+            "--comments", type=int, default=2, help="Mean comments per post."
+        )
+        parser.add_argument(
+            "--alpha", type=float, default=1.1, help="Zipf exponent of popularity."
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="Prefix of the generated usernames and emails.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        prefix = options["prefix"]
+
+        with transaction.atomic():
+            profiles = self.create_profiles(prefix, options["profiles"])
+            profile_ids = [profile.id for profile in profiles]
+            profile_weights = popularity_weights(len(profile_ids), options["alpha"])
+            # Keep popularity independent of id order.
+            rng.shuffle(profile_ids)
+
+            self.create_follows(rng, profile_ids, profile_weights, options)
+            post_ids = self.create_posts(rng, profile_ids, profile_weights, options)
+            post_weights = popularity_weights(len(post_ids), options["alpha"])
+            self.create_likes(rng, profile_ids, post_ids, post_weights, options)
+            self.create_comments(rng, profile_ids, post_ids, options)
+
+        call_command("rebuild_counters", stdout=self.stdout)
+        call_command("rebuild_timelines", stdout=self.stdout)
+        ranking.refresh_decay()
+        self.index_for_search(profile_ids, post_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(profile_ids)} profiles and {len(post_ids)} posts."
+            )
+        )
+
+    def create_profiles(self, prefix, count):
+        user_model = get_user_model()
+        password = make_password(None)
+        users = user_model.objects.bulk_create(
+            [
+                user_model(email=f"{prefix}{index}@example.com", password=password)
+                for index in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        return Profile.objects.bulk_create(
+            [
+                Profile(user=user, username=f"{prefix}_{index}")
+                for index, user in enumerate(users)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    def create_follows(self, rng, profile_ids, weights, options):
+        through = Profile.followers.through
+        rows = []
+
+        for follower in profile_ids:
+            count = sample_count(rng, options["follows"])
+            for followed in sample_targets(rng, profile_ids, weights, count, follower):
+                rows.append(through(from_profile_id=followed, to_profile_id=follower))
+
+        through.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+    def create_posts(self, rng, profile_ids, weights, options):
+        posts = []
+        # Mean posts per profile, skewed towards the popular profiles.
+        total = options["posts"] * len(profile_ids)
+        authors = rng.choices(profile_ids, cum_weights=weights, k=total)
+
+        for index, author in enumerate(authors):
+            posts.append(
+                Post(
+                    author_id=author,
+                    title=f"Post {index}",
+                    content=f"Synthetic post number {index} by profile {author}.",
+                )
+            )
+
+        posts = Post.objects.bulk_create(posts, batch_size=BATCH_SIZE)
+        post_ids = [post.id for post in posts]
+        rng.shuffle(post_ids)
+        return post_ids
+
+    def create_likes(self, rng, profile_ids, post_ids, weights, options):
+        through = Post.likes.through
+        rows = []
+
+        for profile in profile_ids:
+            count = sample_count(rng, options["likes"])
+            for post in sample_targets(rng, post_ids, weights, count, None):
+                rows.append(through(post_id=post, profile_id=profile))
+
+        through.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+    def create_comments(self, rng, profile_ids, post_ids, options):
+        comments = []
+
+        for post in post_ids:
+            for _ in range(sample_count(rng, options["comments"])):
+                comments.append(
+                    Comment(
+                        author_id=rng.choice(profile_ids),
+                        post_id=post,
+                        content="Synthetic comment.",
+                    )
+                )
+
+        Comment.objects.bulk_create(comments, batch_size=BATCH_SIZE)
+
+    def index_for_search(self, profile_ids, post_ids):
+        backend = search.get_backend()
+
+        for model, ids in ((Profile, profile_ids), (Post, post_ids)):
+            for batch in chunks(ids):
+                for instance in model.objects.filter(id__in=batch):
+                    backend.index(instance)
@@ -0,0 +1,240 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.renderers import BaseRenderer
+
+DEFAULTS = {
+    "ENABLED": True,
+    "LATENCY_BUCKETS": (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    "QUERY_BUCKETS": (0, 1, 2, 5, 10, 20, 50, 100),
+    "WINDOW": 1000,
+    "LATENCY_BUDGET": 500,
+    "QUERY_BUDGET": 20,
+    "TRACE_SAMPLE_RATE": 0.1,
+    "TRACE_MAX_QUERIES": 50,
+}
+
+_current = ContextVar("social_media_request_sample", default=None)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_METRICS", {})}
+
+
+def current_sample():
+    return _current.get()
+
+
+def start_sample(max_queries):
+    sample = {
+        "queries": 0,
+        "db_time": 0.0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "sql": [],
+        "max_queries": max_queries,
+    }
+    return sample, _current.set(sample)
+
+
+def finish_sample(token):
+    _current.reset(token)
+
+
+def count(name, amount=1):
+    """Add ``amount`` to ``name`` on the sample of the current request, if any."""
+    sample = _current.get()
+    if sample is not None:
+        sample[name] += amount
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, -(-percent * len(ordered) // 100) - 1)]
+
+
+class Histogram:
+    """Cumulative bucket counts plus the last ``window`` observations."""
+
+    def __init__(self, buckets, window):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def snapshot(self):
+        cumulative, running = [], 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            cumulative.append([bound, running])
+
+        return {
+            "count": self.total,
+            "sum": round(self.sum, 3),
+            "p50": round(percentile(self.recent, 50), 3),
+            "p99": round(percentile(self.recent, 99), 3),
+            "buckets": cumulative,
+        }
+
+
+class RouteStats:
+    def __init__(self, config):
+        window = config["WINDOW"]
+        self.requests = 0
+        self.errors = 0
+        self.latency = Histogram(config["LATENCY_BUCKETS"], window)
+        self.queries = Histogram(config["QUERY_BUCKETS"], window)
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.response_bytes = 0
+
+    def record(self, status_code, latency, sample, size):
+        self.requests += 1
+        self.errors += status_code >= 500
+        self.latency.observe(latency)
+        self.queries.observe(sample["queries"])
+        self.db_time += sample["db_time"]
+        self.cache_hits += sample["cache_hits"]
+        self.cache_misses += sample["cache_misses"]
+        self.response_bytes += size
+
+    def snapshot(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": self.latency.snapshot(),
+            "queries": self.queries.snapshot(),
+            "db_time_ms": round(self.db_time, 3),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "response_bytes": self.response_bytes,
+        }
+
+
+class Registry:
+    """
+    Per-route statistics of this process. Every worker keeps its own, so a
+    scraper sees one worker per request and should aggregate across them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def record(self, route, method, status_code, latency, sample, size):
+        with self.lock:
+            stats = self.routes.get((route, method))
+            if stats is None:
+                stats = self.routes[route, method] = RouteStats(get_config())
+            stats.record(status_code, latency, sample, size)
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {"route": route, "method": method, **stats.snapshot()}
+                for (route, method), stats in sorted(self.routes.items())
+            ]
+
+    def reset(self):
+        with self.lock:
+            self.routes = {}
+
+
+registry = Registry()
+
+
+def record_query(execute, sql, params, many, context):
+    """``execute_wrapper`` counting and timing the queries of a request."""
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        sample["queries"] += 1
+        sample["db_time"] += elapsed
+        if len(sample["sql"]) < sample["max_queries"]:
+            sample["sql"].append((round(elapsed, 3), sql))
+
+
+@contextmanager
+def recording_queries():
+    """
+    Wrap the connections of this thread with ``record_query`` for the
+    duration of the block, leaving their wrappers as found afterwards.
+    """
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(record_query))
+        yield
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Render a ``Registry.snapshot()`` in the Prometheus text format."""
+
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    histograms = (
+        ("latency_ms", "social_media_request_latency_ms"),
+        ("queries", "social_media_request_queries"),
+    )
+    counters = (
+        ("requests", "social_media_requests_total"),
+        ("errors", "social_media_request_errors_total"),
+        ("db_time_ms", "social_media_request_db_time_ms_total"),
+        ("cache_hits", "social_media_cache_hits_total"),
+        ("cache_misses", "social_media_cache_misses_total"),
+        ("response_bytes", "social_media_response_bytes_total"),
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, list):
+            # Errors such as 403 are rendered as a plain message.
+            return str(data.get("detail", data)) if isinstance(data, dict) else data
+
+        lines = []
+        for field, name in self.counters:
+            lines.append(f"# TYPE {name} counter")
+            for route in data:
+                lines.append(f"{name}{{{self.labels(route)}}} {route[field]}")
+
+        for field, name in self.histograms:
+            lines.append(f"# TYPE {name} histogram")
+            for route in data:
+                labels = self.labels(route)
+                histogram = route[field]
+                for bound, bucket_count in histogram["buckets"]:
+                    lines.append(
+                        f'{name}_bucket{{{labels},le="{bound}"}} {bucket_count}'
+                    )
+                lines.append(
+                    f'{name}_bucket{{{labels},le="+Inf"}} {histogram["count"]}'
+                )
+                lines.append(f"{name}_sum{{{labels}}} {histogram['sum']}")
+                lines.append(f"{name}_count{{{labels}}} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def labels(self, route):
+        return f'route="{route["route"]}",method="{route["method"]}"'
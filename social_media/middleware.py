@@ -0,0 +1,153 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from . import metrics, replicas
+
+logger = logging.getLogger("social_media.metrics")
+
+
+class AsyncCapableMiddleware:
+    """
+    Base for middleware that runs natively in sync and async stacks, so
+    async views are not pushed onto a thread by the middleware around them.
+
+    Subclasses implement ``process`` for the sync stack and ``aprocess``
+    for the async one.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.aprocess(request)
+        return self.process(request)
+
+
+class RequestMetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Record latency, database queries and time, cache hits and misses and
+    response size of every request under its resolved route name, e.g.
+    ``post-like-unlike``, and its method.
+
+    Requests over the latency or query budget are logged with their SQL for
+    a sampled fraction of them.
+
+    In the async stack the ORM runs in the request's thread-sensitive sync
+    thread, so the query wrappers are entered and left in that thread.
+    """
+
+    def process(self, request):
+        config = metrics.get_config()
+        if not config["ENABLED"]:
+            return self.get_response(request)
+
+        sample, token = metrics.start_sample(config["TRACE_MAX_QUERIES"])
+        started = time.perf_counter()
+        try:
+            with metrics.recording_queries():
+                response = self.get_response(request)
+        finally:
+            metrics.finish_sample(token)
+
+        self.record(request, response, sample, started, config)
+        return response
+
+    async def aprocess(self, request):
+        config = metrics.get_config()
+        if not config["ENABLED"]:
+            return await self.get_response(request)
+
+        sample, token = metrics.start_sample(config["TRACE_MAX_QUERIES"])
+        started = time.perf_counter()
+        wrappers = ExitStack()
+        try:
+            await sync_to_async(wrappers.enter_context)(metrics.recording_queries())
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrappers.close)()
+            metrics.finish_sample(token)
+
+        self.record(request, response, sample, started, config)
+        return response
+
+    def record(self, request, response, sample, started, config):
+        latency = (time.perf_counter() - started) * 1000
+        match = request.resolver_match
+        route = match.url_name if match and match.url_name else "unresolved"
+        size = 0 if response.streaming else len(response.content)
+        metrics.registry.record(
+            route, request.method, response.status_code, latency, sample, size
+        )
+
+        over_budget = (
+            latency > config["LATENCY_BUDGET"]
+            or sample["queries"] > config["QUERY_BUDGET"]
+        )
+        if over_budget and random.random() < config["TRACE_SAMPLE_RATE"]:
+            self.log_trace(request, route, latency, sample)
+
+    def log_trace(self, request, route, latency, sample):
+        queries = "\n".join(
+            f"  {duration:.3f} ms  {sql}" for duration, sql in sample["sql"]
+        )
+        logger.warning(
+            "Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms\n%s",
+            request.method,
+            request.path,
+            route,
+            latency,
+            sample["queries"],
+            sample["db_time"],
+            queries,
+        )
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """
+    Let ``ReplicaRouter`` send the reads of GET, HEAD and OPTIONS requests
+    to the replicas, and pin the user to the primary after a request of
+    theirs has written.
+    """
+
+    read_only_methods = ("GET", "HEAD", "OPTIONS")
+
+    def process(self, request):
+        state, token = replicas.start_request(
+            request, request.method in self.read_only_methods
+        )
+
+        try:
+            response = self.get_response(request)
+        finally:
+            replicas.finish_request(token)
+
+        if state.wrote and state.user_id is not None:
+            replicas.pin(state.user_id)
+
+        return response
+
+    async def aprocess(self, request):
+        state, token = replicas.start_request(
+            request, request.method in self.read_only_methods
+        )
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            replicas.finish_request(token)
+
+        if state.wrote and state.user_id is not None:
+            await replicas.apin(state.user_id)
+
+        return response
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.3 on 2026-10-18 02:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def related_count(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def populate_counters(apps, schema_editor):
+    Post = apps.get_model("social_media", "Post")
+    Profile = apps.get_model("social_media", "Profile")
+    Comment = apps.get_model("social_media", "Comment")
+    likes = Post.likes.through
+    follows = Profile.followers.through
+
+    Post.objects.update(
+        likes_count=related_count(likes, "post"),
+        comments_count=related_count(Comment, "post"),
+    )
+    Profile.objects.update(
+        followers_count=related_count(follows, "from_profile"),
+        following_count=related_count(follows, "to_profile"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0011_post_created_id_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="followers_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="following_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
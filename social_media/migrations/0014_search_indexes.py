@@ -0,0 +1,95 @@
+# Generated by Django 4.2.3 on 2026-10-18 03:05
+
+from django.db import migrations
+
+FTS_TABLES = (
+    ("social_media_post_fts", "social_media_post", ("title", "content")),
+    ("social_media_profile_fts", "social_media_profile", ("username",)),
+)
+
+
+def sqlite_create(schema_editor):
+    for table, source, fields in FTS_TABLES:
+        columns = ", ".join(fields)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {table} USING fts5({columns}, tokenize='trigram')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {table} (rowid, {columns}) SELECT id, {columns} FROM {source}"
+        )
+
+
+def postgres_indexes(apps):
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models.functions import Upper
+
+    Post = apps.get_model("social_media", "Post")
+    Profile = apps.get_model("social_media", "Profile")
+
+    return (
+        (
+            Post,
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"), name="post_title_trgm"
+            ),
+        ),
+        (
+            Post,
+            GinIndex(
+                OpClass(Upper("content"), name="gin_trgm_ops"), name="post_content_trgm"
+            ),
+        ),
+        (
+            Profile,
+            GinIndex(
+                OpClass(Upper("username"), name="gin_trgm_ops"),
+                name="profile_username_trgm",
+            ),
+        ),
+        (
+            Post,
+            GinIndex(
+                SearchVector("title", "content", config="simple"),
+                name="post_search_vector",
+            ),
+        ),
+        (
+            Profile,
+            GinIndex(
+                SearchVector("username", config="simple"), name="profile_search_vector"
+            ),
+        ),
+    )
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        sqlite_create(schema_editor)
+    elif vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for model, index in postgres_indexes(apps):
+            schema_editor.add_index(model, index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        for table, _, _ in FTS_TABLES:
+            schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+    elif vendor == "postgresql":
+        for model, index in postgres_indexes(apps):
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0013_comment_ordering_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.3 on 2026-10-18 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0014_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="status",
+            field=models.CharField(
+                choices=[("scheduled", "Scheduled"), ("published", "Published")],
+                default="published",
+                max_length=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("status", "scheduled")),
+                fields=["scheduled_time", "id"],
+                name="post_scheduled_due",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.3 on 2026-10-18 03:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0015_post_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="image_renditions",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="profile_pic_renditions",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 4.2.3 on 2026-10-18 03:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0017_imageupload"),
+    ]
+
+    # The implicit through tables become explicit models so that they can
+    # carry indexes. The tables already have this shape.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="Follow",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "from_profile",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="+",
+                                to="social_media.profile",
+                            ),
+                        ),
+                        (
+                            "to_profile",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="+",
+                                to="social_media.profile",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "social_media_profile_followers",
+                        "unique_together": {("from_profile", "to_profile")},
+                    },
+                ),
+                migrations.CreateModel(
+                    name="Like",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "post",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="+",
+                                to="social_media.post",
+                            ),
+                        ),
+                        (
+                            "profile",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="+",
+                                to="social_media.profile",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "social_media_post_likes",
+                        "unique_together": {("post", "profile")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="post",
+                    name="likes",
+                    field=models.ManyToManyField(
+                        blank=True,
+                        related_name="posts_liked",
+                        through="social_media.Like",
+                        to="social_media.profile",
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="profile",
+                    name="followers",
+                    field=models.ManyToManyField(
+                        blank=True,
+                        related_name="following",
+                        through="social_media.Follow",
+                        through_fields=("from_profile", "to_profile"),
+                        to="social_media.profile",
+                    ),
+                ),
+            ],
+        ),
+    ]
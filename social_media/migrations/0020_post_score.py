@@ -0,0 +1,67 @@
+# Generated by Django 4.2.3 on 2026-10-18 03:35
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def populate_scores(apps, schema_editor):
+    """
+    Give existing posts the decay of their age, as ``ranking.decay``, and
+    the score that follows. The periodic refresh skips posts past MAX_AGE,
+    so they would otherwise rank as if new.
+    """
+    Post = apps.get_model("social_media", "Post")
+    config = {"COMMENT_WEIGHT": 2, "GRAVITY": 1.8}
+    config.update(getattr(settings, "SOCIAL_MEDIA_RANKING", {}))
+    now = timezone.now()
+    last_id = 0
+
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .only("pk", "created_at")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+
+        for post in batch:
+            age = max(0.0, (now - post.created_at).total_seconds() / 3600)
+            post.decay = ((age + 2) / 2) ** -config["GRAVITY"]
+        Post.objects.bulk_update(batch, ["decay"])
+        last_id = batch[-1].pk
+
+    Post.objects.update(
+        score=(
+            F("likes_count") + config["COMMENT_WEIGHT"] * F("comments_count") + 1
+        )
+        * F("decay")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0019_relation_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="decay",
+            field=models.FloatField(default=1.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="score",
+            field=models.FloatField(default=1.0, editable=False),
+        ),
+        migrations.RunPython(populate_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["-score", "-id"], name="post_score_id"),
+        ),
+    ]
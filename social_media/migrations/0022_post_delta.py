@@ -0,0 +1,49 @@
+# Generated by Django 4.2.3 on 2026-10-18 03:45
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    Post = apps.get_model("social_media", "Post")
+    Post.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0021_follow_suggestion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("post_id", models.PositiveBigIntegerField()),
+                ("author_id", models.PositiveBigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="posttombstone",
+            index=models.Index(fields=["author_id", "id"], name="tombstone_author_id"),
+        ),
+        migrations.AddIndex(
+            model_name="posttombstone",
+            index=models.Index(fields=["deleted_at"], name="tombstone_deleted_at"),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.3 on 2026-10-18 04:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_media", "0022_post_delta"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(fields=["profile", "-id"], name="like_profile_id"),
+        ),
+    ]
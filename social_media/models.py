@@ -2,9 +2,18 @@ import os
 import uuid
 
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.text import slugify
 
+from .signals import followed, likes_changed, published, unfollowed
+
+
+LATEST_COMMENTS = 5
+FOLLOW_PREVIEW = 5
+
 
 def profile_pic_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
@@ -20,26 +29,337 @@ def post_pic_file_path(instance, filename):
     return os.path.join("uploads/posts/", filename)
 
 
+def insert_relation(model, **fields):
+    """Insert a unique relation row and return False if it already existed."""
+    try:
+        with transaction.atomic():
+            model.objects.create(**fields)
+    except IntegrityError:
+        return False
+
+    return True
+
+
+def lock_relations(model, source, target, source_id, target_ids=()):
+    """
+    Lock the ``source`` row of ``model`` relations until the transaction
+    ends, so that writes of its relations run one at a time and the rows
+    they read before writing stay true.
+
+    When both ends are rows of one model, as for follows, the ``target``
+    rows are locked too, all in pk order. The writes need them for the
+    foreign key checks and counters, so a follow-back locking its own row
+    first would deadlock with the follow it answers.
+    """
+    related = model._meta.get_field(source).related_model
+    pks = {source_id}
+    if model._meta.get_field(target).related_model is related:
+        pks.update(target_ids)
+
+    list(
+        related.objects.select_for_update()
+        .filter(pk__in=sorted(pks))
+        .order_by("pk")
+        .values("pk")
+    )
+
+
+def insert_relations(model, source, target, source_id, target_ids):
+    """
+    Insert the missing ``source -> target`` rows in one statement and return
+    the target ids that were actually added. Runs in the caller's
+    transaction, with the source locked by ``lock_relations``.
+    """
+    lock_relations(model, source, target, source_id, target_ids)
+    existing = set(
+        model.objects.filter(
+            **{source: source_id, f"{target}__in": target_ids}
+        ).values_list(target, flat=True)
+    )
+    added = [pk for pk in target_ids if pk not in existing]
+    model.objects.bulk_create(
+        [model(**{f"{source}_id": source_id, f"{target}_id": pk}) for pk in added],
+        ignore_conflicts=True,
+    )
+    return added
+
+
+def delete_relations(model, source, target, source_id, target_ids):
+    """
+    Delete the ``source -> target`` rows and return the removed target ids,
+    with the source locked like in ``insert_relations``.
+    """
+    lock_relations(model, source, target, source_id, target_ids)
+    relations = model.objects.filter(
+        **{source: source_id, f"{target}__in": target_ids}
+    )
+    removed = list(relations.values_list(target, flat=True))
+    relations.filter(**{f"{target}__in": removed}).delete()
+    return removed
+
+
+class ProfileQuerySet(models.QuerySet):
+    def for_action(self, action):
+        """Load only the relations rendered by the serializer of ``action``."""
+        if action == "retrieve":
+            usernames = Profile.objects.only("id", "username").order_by("id")
+            preview = usernames[:FOLLOW_PREVIEW]
+            return self.prefetch_related(
+                models.Prefetch(
+                    "followers", queryset=preview, to_attr="followers_preview"
+                ),
+                models.Prefetch(
+                    "following", queryset=preview, to_attr="following_preview"
+                ),
+            )
+
+        return self
+
+    def previewing(self, profile_id):
+        """
+        Profiles whose follower or following preview can show ``profile_id``:
+        those where fewer than ``FOLLOW_PREVIEW`` related ids come before it.
+        """
+
+        def earlier(field, other):
+            return Coalesce(
+                Subquery(
+                    Follow.objects.filter(
+                        **{field: OuterRef(field), f"{other}__lt": profile_id}
+                    )
+                    .values(field)
+                    .annotate(total=Count("pk"))
+                    .values("total")
+                ),
+                0,
+            )
+
+        followed = (
+            Follow.objects.filter(to_profile=profile_id)
+            .annotate(earlier=earlier("from_profile", "to_profile"))
+            .filter(earlier__lt=FOLLOW_PREVIEW)
+            .values("from_profile")
+        )
+        following = (
+            Follow.objects.filter(from_profile=profile_id)
+            .annotate(earlier=earlier("to_profile", "from_profile"))
+            .filter(earlier__lt=FOLLOW_PREVIEW)
+            .values("to_profile")
+        )
+        return self.filter(Q(pk__in=followed) | Q(pk__in=following))
+
+
 class Profile(models.Model):
     username = models.CharField(max_length=50, unique=True, default="username")
     user = models.OneToOneField(get_user_model(), on_delete=models.CASCADE)
     status = models.CharField(max_length=50, blank=True)
     followers = models.ManyToManyField(
-        "self", symmetrical=False, related_name="following", blank=True
+        "self",
+        symmetrical=False,
+        related_name="following",
+        blank=True,
+        through="Follow",
+        through_fields=("from_profile", "to_profile"),
     )
     profile_pic = models.ImageField(
         upload_to=profile_pic_file_path, blank=True, null=True
     )
     bio = models.TextField(blank=True)
+    profile_pic_renditions = models.JSONField(default=dict, editable=False)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+    objects = ProfileQuerySet.as_manager()
 
     def follow(self, profile):
-        self.following.add(profile)
+        """Follow ``profile`` and return whether a new relation was created."""
+        with transaction.atomic():
+            lock_relations(
+                Profile.followers.through,
+                "to_profile",
+                "from_profile",
+                self.pk,
+                [profile.pk],
+            )
+            created = insert_relation(
+                Profile.followers.through, from_profile=profile, to_profile=self
+            )
+            if created:
+                self.update_follow_counters(profile, 1)
+
+        if created:
+            followed.send(sender=Profile, follower=self.pk, profile_ids=[profile.pk])
+        return created
 
     def unfollow(self, profile):
-        self.following.remove(profile)
+        """Unfollow ``profile`` and return whether a relation was removed."""
+        with transaction.atomic():
+            lock_relations(
+                Profile.followers.through,
+                "to_profile",
+                "from_profile",
+                self.pk,
+                [profile.pk],
+            )
+            deleted, _ = Profile.followers.through.objects.filter(
+                from_profile=profile, to_profile=self
+            ).delete()
+            if deleted:
+                self.update_follow_counters(profile, -1)
+
+        if deleted:
+            unfollowed.send(sender=Profile, follower=self.pk, profile_ids=[profile.pk])
+        return bool(deleted)
+
+    def follow_many(self, profile_ids):
+        """Follow every profile in ``profile_ids`` and return the newly followed."""
+        with transaction.atomic():
+            added = insert_relations(
+                Profile.followers.through,
+                "to_profile",
+                "from_profile",
+                self.pk,
+                profile_ids,
+            )
+            self.update_many_follow_counters(added, 1)
+
+        if added:
+            followed.send(sender=Profile, follower=self.pk, profile_ids=added)
+        return added
+
+    def unfollow_many(self, profile_ids):
+        """Unfollow every profile in ``profile_ids`` and return the unfollowed."""
+        with transaction.atomic():
+            removed = delete_relations(
+                Profile.followers.through,
+                "to_profile",
+                "from_profile",
+                self.pk,
+                profile_ids,
+            )
+            self.update_many_follow_counters(removed, -1)
+
+        if removed:
+            unfollowed.send(sender=Profile, follower=self.pk, profile_ids=removed)
+        return removed
+
+    def update_follow_counters(self, profile, delta):
+        Profile.objects.filter(pk=profile.pk).update(
+            followers_count=F("followers_count") + delta
+        )
+        Profile.objects.filter(pk=self.pk).update(
+            following_count=F("following_count") + delta
+        )
+
+    def update_many_follow_counters(self, profile_ids, delta):
+        """Adjust both sides of a batch of follows in a single UPDATE."""
+        if not profile_ids:
+            return
+
+        Profile.objects.filter(pk__in=[self.pk, *profile_ids]).update(
+            followers_count=Case(
+                When(pk__in=profile_ids, then=F("followers_count") + delta),
+                default=F("followers_count"),
+                output_field=models.IntegerField(),
+            ),
+            following_count=Case(
+                When(
+                    pk=self.pk, then=F("following_count") + delta * len(profile_ids)
+                ),
+                default=F("following_count"),
+                output_field=models.IntegerField(),
+            ),
+        )
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(status=Post.Status.PUBLISHED)
+
+    def visible_to(self, profile):
+        """Own posts of ``profile`` and published posts of whom it follows."""
+        return self.filter(
+            Q(author=profile)
+            | Q(author__in=profile.following.all(), status=Post.Status.PUBLISHED)
+        )
+
+    def publish_due(self, batch_size=100):
+        """
+        Publish scheduled posts whose time has come, claiming them in batches
+        so that concurrent publishers skip rows another one already holds.
+        """
+        total = 0
+
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    self.select_for_update(skip_locked=True)
+                    .filter(
+                        status=Post.Status.SCHEDULED,
+                        scheduled_time__lte=timezone.now(),
+                    )
+                    .order_by("scheduled_time", "id")[:batch_size]
+                )
+                now = timezone.now()
+                for post in batch:
+                    post.status = Post.Status.PUBLISHED
+                    post.created_at = post.scheduled_time
+                    post.updated_at = now
+                Post.objects.bulk_update(batch, ["status", "created_at", "updated_at"])
+
+            if not batch:
+                return total
+
+            published.send(sender=Post, posts=batch)
+            total += len(batch)
+
+    def like_many(self, profile, post_ids):
+        """Like every post in ``post_ids`` as ``profile``, return the new likes."""
+        with transaction.atomic():
+            added = insert_relations(
+                Post.likes.through, "profile", "post", profile.pk, post_ids
+            )
+            Post.objects.filter(pk__in=added).update(likes_count=F("likes_count") + 1)
+
+        if added:
+            likes_changed.send(sender=Post, post_ids=added)
+        return added
+
+    def unlike_many(self, profile, post_ids):
+        """Remove the likes of ``profile`` from ``post_ids``, return the removed."""
+        with transaction.atomic():
+            removed = delete_relations(
+                Post.likes.through, "profile", "post", profile.pk, post_ids
+            )
+            Post.objects.filter(pk__in=removed).update(
+                likes_count=F("likes_count") - 1
+            )
+
+        if removed:
+            likes_changed.send(sender=Post, post_ids=removed)
+        return removed
+
+    def for_action(self, action):
+        """Load only the relations rendered by the serializer of ``action``."""
+        queryset = self.select_related("author")
+
+        if action == "retrieve":
+            return queryset.prefetch_related(
+                models.Prefetch(
+                    "comments",
+                    queryset=Comment.objects.all()[:LATEST_COMMENTS],
+                    to_attr="latest_comments",
+                )
+            )
+
+        return queryset
 
 
 class Post(models.Model):
+    class Status(models.TextChoices):
+        SCHEDULED = "scheduled"
+        PUBLISHED = "published"
+
     author = models.ForeignKey(
         Profile,
         on_delete=models.CASCADE,
@@ -48,9 +368,138 @@ class Post(models.Model):
     title = models.CharField(max_length=50, default="Title")
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     image = models.ImageField(upload_to=post_pic_file_path, blank=True, null=True)
-    likes = models.ManyToManyField(Profile, related_name="posts_liked", blank=True)
+    image_renditions = models.JSONField(default=dict, editable=False)
+    likes = models.ManyToManyField(
+        Profile, related_name="posts_liked", blank=True, through="Like"
+    )
     scheduled_time = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PUBLISHED
+    )
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    # Precomputed by ``ranking`` for the "top" feed ordering.
+    decay = models.FloatField(default=1.0, editable=False)
+    score = models.FloatField(default=1.0, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="post_created_id"),
+            models.Index(
+                fields=["author", "-created_at", "-id"], name="post_author_created"
+            ),
+            # Only the few scheduled posts; a status prefix would lure the
+            # planner away from the author and feed indexes.
+            models.Index(
+                fields=["scheduled_time", "id"],
+                condition=Q(status="scheduled"),
+                name="post_scheduled_due",
+            ),
+            models.Index(fields=["-score", "-id"], name="post_score_id"),
+        ]
+
+    def like(self, profile):
+        """Like the post as ``profile`` and return whether a like was added."""
+        with transaction.atomic():
+            lock_relations(Post.likes.through, "profile", "post", profile.pk)
+            created = insert_relation(Post.likes.through, post=self, profile=profile)
+            if created:
+                self.update_likes_count(1)
+
+        if created:
+            likes_changed.send(sender=Post, post_ids=[self.pk])
+        return created
+
+    def unlike(self, profile):
+        """Remove the like of ``profile`` and return whether one existed."""
+        with transaction.atomic():
+            lock_relations(Post.likes.through, "profile", "post", profile.pk)
+            deleted, _ = Post.likes.through.objects.filter(
+                post=self, profile=profile
+            ).delete()
+            if deleted:
+                self.update_likes_count(-1)
+
+        if deleted:
+            likes_changed.send(sender=Post, post_ids=[self.pk])
+        return bool(deleted)
+
+    def toggle_like(self, profile):
+        """
+        Flip the like of ``profile`` and return whether the post is now liked.
+
+        The delete is tried first, so a concurrent double tap can never insert
+        twice: the losing insert hits the unique constraint and is ignored.
+        """
+        with transaction.atomic():
+            if self.unlike(profile):
+                return False
+
+            self.like(profile)
+            return True
+
+    def update_likes_count(self, delta):
+        Post.objects.filter(pk=self.pk).update(likes_count=F("likes_count") + delta)
+
+
+class PostTombstone(models.Model):
+    """
+    Marks a deleted post for the delta feed, so clients that synced it drop
+    it from their cache. Kept for the ``TOMBSTONE_MAX_AGE`` of ``delta``.
+    """
+
+    post_id = models.PositiveBigIntegerField()
+    author_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["author_id", "id"], name="tombstone_author_id"),
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_at"),
+        ]
+
+
+class Follow(models.Model):
+    """
+    A row of ``Profile.followers``: ``to_profile`` follows ``from_profile``.
+
+    The unique pair serves "who follows X"; the reverse index serves "whom
+    does X follow" without touching the table.
+    """
+
+    from_profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="+"
+    )
+    to_profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        db_table = "social_media_profile_followers"
+        unique_together = [("from_profile", "to_profile")]
+        indexes = [
+            models.Index(fields=["to_profile", "from_profile"], name="follow_to_from"),
+        ]
+
+
+class Like(models.Model):
+    """
+    A row of ``Post.likes``. The unique pair serves "who likes X"; the
+    reverse indexes serve "what does X like", the second newest first.
+    """
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+")
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        db_table = "social_media_post_likes"
+        unique_together = [("post", "profile")]
+        indexes = [
+            models.Index(fields=["profile", "post"], name="like_profile_post"),
+            models.Index(fields=["profile", "-id"], name="like_profile_id"),
+        ]
 
 
 class Comment(models.Model):
@@ -60,3 +509,92 @@ class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-created_at", "-id")
+        indexes = [
+            models.Index(
+                fields=["post", "-created_at", "-id"], name="comment_post_created"
+            ),
+        ]
+
+
+class TimelineEntry(models.Model):
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "post"], name="unique_timeline_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["profile", "-created_at"], name="timeline_profile_created"
+            ),
+        ]
+
+
+class FollowSuggestion(models.Model):
+    """
+    A profile suggested to ``profile`` by ``suggestions.rebuild``, followed
+    by ``mutual_count`` of the profiles ``profile`` follows.
+    """
+
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="follow_suggestions"
+    )
+    suggested = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="suggested_to"
+    )
+    mutual_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "suggested"], name="unique_follow_suggestion"
+            ),
+        ]
+
+
+class ImageUpload(models.Model):
+    """A resumable upload of an image, received in chunks at known offsets."""
+
+    class Target(models.TextChoices):
+        POST = "post"
+        PROFILE = "profile"
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        COMPLETE = "complete"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="image_uploads"
+    )
+    target = models.CharField(max_length=10, choices=Target.choices)
+    target_id = models.PositiveIntegerField()
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=50)
+    size = models.PositiveIntegerField()
+    offset = models.PositiveIntegerField(default=0)
+    chunks = models.JSONField(default=list, editable=False)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def get_target(self):
+        """Return the post or profile of ``owner`` the upload attaches to."""
+        if self.target == self.Target.POST:
+            targets = Post.objects.filter(author_id=self.owner_id)
+        else:
+            targets = Profile.objects.filter(pk=self.owner_id)
+
+        return targets.filter(pk=self.target_id).first()
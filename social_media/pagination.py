@@ -0,0 +1,241 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def parse_ordering(ordering):
+    return [(field.lstrip("-"), field.startswith("-")) for field in ordering]
+
+
+def keyset_condition(ordering, position):
+    """
+    Build the lexicographic "comes after ``position``" filter for ``ordering``,
+    e.g. ``created_at < c OR (created_at = c AND id < i)``.
+    """
+    condition = Q()
+    fields = parse_ordering(ordering)
+
+    for index, (name, descending) in enumerate(fields):
+        lookup = "lt" if descending else "gt"
+        step = Q(**{f"{name}__{lookup}": position[index]})
+
+        for previous, (previous_name, _) in enumerate(fields[:index]):
+            step &= Q(**{previous_name: position[previous]})
+
+        condition |= step
+
+    return condition
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique composite ordering.
+
+    Unlike DRF's ``CursorPagination`` the cursor stores the full ordering key,
+    so every page is a single index range scan regardless of depth. Passing
+    ``limit``/``offset`` switches to limit-offset pagination for old clients.
+    """
+
+    ordering = ("id",)
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    offset_pagination_class = LimitOffsetPagination
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.offset_paginator = None
+
+    def use_offset(self, request):
+        params = request.query_params
+        return self.cursor_query_param not in params and (
+            "limit" in params or "offset" in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+
+        if self.use_offset(request):
+            self.offset_paginator = self.offset_pagination_class()
+            self.offset_paginator.max_limit = self.max_page_size
+            return self.offset_paginator.paginate_queryset(
+                queryset.order_by(*self.ordering), request, view
+            )
+
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views."""
+        if self.use_offset(request):
+            # Offset pages need a count, which has no async iterator.
+            return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+        self.request = request
+        page = self.page_queryset(queryset, request)
+        return self.set_page([instance async for instance in page])
+
+    def page_queryset(self, queryset, request):
+        """The queryset of the requested page plus one row to detect more."""
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.position, self.reverse = self.decode_cursor(request, queryset.model)
+
+        return self.order_queryset(queryset, self.position)[: self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+
+        return self.page
+
+    def order_queryset(self, queryset, position=None):
+        ordering = self.ordering
+
+        if self.reverse:
+            ordering = [
+                name if descending else f"-{name}"
+                for name, descending in parse_ordering(ordering)
+            ]
+
+        queryset = queryset.order_by(*ordering)
+
+        if position is not None:
+            queryset = queryset.filter(keyset_condition(ordering, position))
+
+        return queryset
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_position(self, instance):
+        return [getattr(instance, name) for name, _ in parse_ordering(self.ordering)]
+
+    def encode_cursor(self, instance, reverse=False):
+        position = [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in self.get_position(instance)
+        ]
+        payload = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        cursor = urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()))
+            position = payload["p"]
+            if len(position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.to_python(model, name, value)
+                for (name, _), value in zip(parse_ordering(self.ordering), position)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, bool(payload.get("r"))
+
+    def to_python(self, model, name, value):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+
+        return field.to_python(value)
+
+    def get_next_link(self):
+        if self.offset_paginator:
+            return self.offset_paginator.get_next_link()
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if self.offset_paginator:
+            return self.offset_paginator.get_previous_link()
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if self.offset_paginator:
+            return self.offset_paginator.get_paginated_response(data)
+
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class SearchPagination(LimitOffsetPagination):
+    """Relevance-ranked results are paged by offset; they are rarely deep."""
+
+    default_limit = api_settings.PAGE_SIZE or 20
+    max_limit = 100
+
+
+class PostCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class PostScoreCursorPagination(KeysetPagination):
+    """The "top" feed; scores shift as they decay, so pages may too."""
+
+    ordering = ("-score", "-id")
+
+
+def get_feed_pagination_class(request):
+    """Pick the feed paginator from its ``ordering`` parameter, newest first."""
+    if request.query_params.get("ordering") == "top":
+        return PostScoreCursorPagination
+    return PostCursorPagination
+
+
+class CommentCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class LikeCursorPagination(KeysetPagination):
+    """A profile's likes, most recent first; pages hold ``Like`` rows."""
+
+    ordering = ("-id",)
+
+
+class ProfileCursorPagination(KeysetPagination):
+    ordering = ("id",)
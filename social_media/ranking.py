@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Post
+
+DEFAULTS = {
+    "COMMENT_WEIGHT": 2,
+    "GRAVITY": 1.8,
+    "MAX_AGE": timedelta(days=7),
+    "BATCH_SIZE": 1000,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_RANKING", {})}
+
+
+def decay(created_at, now):
+    """
+    Time decay of a post, 1 when new and falling with its age in hours as
+    in ``((age + 2) / 2) ** -GRAVITY``.
+    """
+    age = max(0.0, (now - created_at).total_seconds() / 3600)
+    return ((age + 2) / 2) ** -get_config()["GRAVITY"]
+
+
+def score_expression():
+    """``Post.score`` from the stored counters and decay, for ``update()``."""
+    engagement = (
+        F("likes_count") + get_config()["COMMENT_WEIGHT"] * F("comments_count") + 1
+    )
+    return engagement * F("decay")
+
+
+def rescore(*post_ids):
+    """Recompute the score of ``post_ids`` after their counters changed."""
+    if post_ids:
+        Post.objects.filter(pk__in=post_ids).update(score=score_expression())
+
+
+def refresh_decay(now=None):
+    """
+    Recompute decay and score of published posts younger than ``MAX_AGE``,
+    in batches. Older posts keep their last, already negligible, score.
+    """
+    config = get_config()
+    now = now or timezone.now()
+    posts = Post.objects.published().filter(created_at__gte=now - config["MAX_AGE"])
+    last_id, total = 0, 0
+
+    while True:
+        batch = list(
+            posts.filter(pk__gt=last_id)
+            .order_by("pk")
+            .only("pk", "created_at")[: config["BATCH_SIZE"]]
+        )
+        if not batch:
+            return total
+
+        for post in batch:
+            post.decay = decay(post.created_at, now)
+        Post.objects.bulk_update(batch, ["decay"])
+        rescore(*(post.pk for post in batch))
+
+        last_id = batch[-1].pk
+        total += len(batch)
@@ -0,0 +1,259 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from . import cache, images, ranking, search, timeline
+from .models import Comment, Post, PostTombstone, Profile
+from .signals import followed, likes_changed, published, unfollowed
+from .tasks import invalidate_profile_previews, process_image
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created and instance.status == Post.Status.PUBLISHED:
+        timeline.fan_out(instance)
+
+
+@receiver(published)
+def fan_out_published_posts(sender, posts, **kwargs):
+    for post in posts:
+        timeline.fan_out(post)
+    cache.invalidate("post", *(post.pk for post in posts))
+
+
+@receiver(post_delete, sender=Post)
+def remove_deleted_post(sender, instance, **kwargs):
+    timeline.remove(instance)
+
+
+@receiver(post_delete, sender=Post)
+def record_deleted_post(sender, instance, **kwargs):
+    PostTombstone.objects.create(post_id=instance.pk, author_id=instance.author_id)
+
+
+@receiver(followed)
+def backfill_timeline(sender, follower, profile_ids, **kwargs):
+    timeline.follow(follower, profile_ids)
+
+
+@receiver(unfollowed)
+def purge_timeline(sender, follower, profile_ids, **kwargs):
+    timeline.unfollow(follower, profile_ids)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comments_count=F("comments_count") + 1
+        )
+        ranking.rescore(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(
+        comments_count=F("comments_count") - 1
+    )
+    ranking.rescore(instance.post_id)
+
+
+def follow_pairs(instance, reverse, pk_set):
+    """Group ``followers`` changes as {follower id: [followed profile ids]}."""
+    pairs = defaultdict(list)
+
+    for pk in pk_set:
+        if reverse:
+            pairs[instance.pk].append(pk)
+        else:
+            pairs[pk].append(instance.pk)
+
+    return pairs
+
+
+def existing_related_ids(through, source, target, instance, reverse, pk_set):
+    """Return the ids from ``pk_set`` that are actually related to ``instance``."""
+    if reverse:
+        source, target = target, source
+
+    relations = through.objects.filter(**{source: instance.pk})
+    if pk_set is not None:
+        relations = relations.filter(**{f"{target}__in": pk_set})
+
+    return set(relations.values_list(target, flat=True))
+
+
+@receiver(m2m_changed, sender=Profile.followers.through)
+def sync_followers(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep counters and timelines right for writes that bypass Profile.follow."""
+    if action in ("pre_remove", "pre_clear"):
+        pk_set = existing_related_ids(
+            sender, "from_profile", "to_profile", instance, reverse, pk_set
+        )
+        delta, signal = -1, unfollowed
+    elif action == "post_add":
+        delta, signal = 1, followed
+    else:
+        return
+
+    if not pk_set:
+        return
+
+    if reverse:
+        own_counter, other_counter = "following_count", "followers_count"
+    else:
+        own_counter, other_counter = "followers_count", "following_count"
+
+    Profile.objects.filter(pk=instance.pk).update(
+        **{own_counter: F(own_counter) + delta * len(pk_set)}
+    )
+    Profile.objects.filter(pk__in=pk_set).update(
+        **{other_counter: F(other_counter) + delta}
+    )
+
+    for follower, profile_ids in follow_pairs(instance, reverse, pk_set).items():
+        signal.send(sender=Profile, follower=follower, profile_ids=profile_ids)
+
+
+@receiver(m2m_changed, sender=Post.likes.through)
+def sync_likes_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("pre_remove", "pre_clear"):
+        pk_set = existing_related_ids(
+            sender, "post", "profile", instance, reverse, pk_set
+        )
+        delta = -1
+    elif action == "post_add":
+        delta = 1
+    else:
+        return
+
+    if not pk_set:
+        return
+
+    if reverse:
+        post_ids = pk_set
+        Post.objects.filter(pk__in=pk_set).update(likes_count=F("likes_count") + delta)
+    else:
+        post_ids = [instance.pk]
+        Post.objects.filter(pk=instance.pk).update(
+            likes_count=F("likes_count") + delta * len(pk_set)
+        )
+
+    likes_changed.send(sender=Post, post_ids=post_ids)
+
+
+@receiver(pre_delete, sender=Profile)
+def release_profile_counters(sender, instance, **kwargs):
+    """Relation rows of a deleted profile cascade without m2m signals."""
+    follows = Profile.followers.through.objects
+    Profile.objects.filter(
+        pk__in=follows.filter(from_profile=instance).values("to_profile")
+    ).update(following_count=F("following_count") - 1)
+    Profile.objects.filter(
+        pk__in=follows.filter(to_profile=instance).values("from_profile")
+    ).update(followers_count=F("followers_count") - 1)
+    Post.objects.filter(
+        pk__in=Post.likes.through.objects.filter(profile=instance).values("post")
+    ).update(likes_count=F("likes_count") - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    cache.invalidate("post", instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_post(sender, instance, **kwargs):
+    cache.invalidate("post", instance.post_id)
+
+
+@receiver(likes_changed)
+def invalidate_liked_posts(sender, post_ids, **kwargs):
+    cache.invalidate("post", *post_ids)
+
+
+@receiver(likes_changed)
+def rescore_liked_posts(sender, post_ids, **kwargs):
+    ranking.rescore(*post_ids)
+
+
+@receiver(pre_save, sender=Profile)
+def detect_rename(sender, instance, update_fields=None, **kwargs):
+    instance._renamed = False
+
+    if instance._state.adding or not cache.is_enabled():
+        return
+    if update_fields is not None and "username" not in update_fields:
+        return
+
+    previous = (
+        Profile.objects.filter(pk=instance.pk)
+        .values_list("username", flat=True)
+        .first()
+    )
+    instance._renamed = previous is not None and previous != instance.username
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_saved_profile(sender, instance, created, **kwargs):
+    cache.invalidate("profile", instance.pk)
+
+    if getattr(instance, "_renamed", False):
+        # Detail payloads of a few related profiles preview this username.
+        pk = instance.pk
+        transaction.on_commit(lambda: invalidate_profile_previews.delay(pk))
+
+
+@receiver(post_delete, sender=Profile)
+def invalidate_deleted_profile(sender, instance, **kwargs):
+    cache.invalidate("profile", instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_owner(sender, instance, **kwargs):
+    cache.invalidate("user", instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user(sender, instance, **kwargs):
+    cache.invalidate("user", instance.pk)
+
+
+@receiver(followed)
+@receiver(unfollowed)
+def invalidate_follow(sender, follower, profile_ids, **kwargs):
+    cache.invalidate("profile", follower, *profile_ids)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Profile)
+def index_for_search(sender, instance, **kwargs):
+    search.get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Profile)
+def remove_from_search(sender, instance, **kwargs):
+    search.get_backend().remove(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Profile)
+def render_uploaded_image(sender, instance, **kwargs):
+    if images.needs_processing(instance):
+        label, pk = instance._meta.label_lower, instance.pk
+        transaction.on_commit(lambda: process_image.delay(label, pk))
@@ -0,0 +1,121 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import LazyObject, empty
+
+DEFAULTS = {
+    "ALIASES": [],
+    "PIN_SECONDS": 5,
+    "CACHE_ALIAS": "default",
+}
+
+# Sessions and users tell whose request it is, and must not lag behind a
+# login or logout.
+PRIMARY_MODELS = {"sessions.session", settings.AUTH_USER_MODEL.lower()}
+
+_current = ContextVar("social_media_replica_request", default=None)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_REPLICAS", {})}
+
+
+def pin_key(user_id):
+    return f"replicas:pinned:{user_id}"
+
+
+def pin(user_id):
+    """Send the reads of ``user_id`` to the primary for ``PIN_SECONDS``."""
+    config = get_config()
+    caches[config["CACHE_ALIAS"]].set(pin_key(user_id), True, config["PIN_SECONDS"])
+
+
+async def apin(user_id):
+    config = get_config()
+    await caches[config["CACHE_ALIAS"]].aset(
+        pin_key(user_id), True, config["PIN_SECONDS"]
+    )
+
+
+def is_pinned(user_id):
+    return bool(caches[get_config()["CACHE_ALIAS"]].get(pin_key(user_id)))
+
+
+class RequestState:
+    def __init__(self, request, read_only):
+        self.request = request
+        self.read_only = read_only
+        self.wrote = False
+        self.pinned = None
+
+    @property
+    def user_id(self):
+        # DRF sets the authenticated user on the wrapped request too. The
+        # lazy session user is left alone: loading it reads the session
+        # through the router, which would ask for the user again.
+        user = getattr(self.request, "user", None)
+        if isinstance(user, LazyObject) and user._wrapped is empty:
+            return None
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return None
+
+    def use_replica(self):
+        if not self.read_only or self.wrote:
+            return False
+        # Reads inside a transaction must see its own writes.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return False
+
+        user_id = self.user_id
+        if user_id is None:
+            return True
+        if self.pinned is None:
+            self.pinned = is_pinned(user_id)
+        return not self.pinned
+
+
+def start_request(request, read_only):
+    state = RequestState(request, read_only)
+    return state, _current.set(state)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Route reads of read-only requests to a random replica in ``ALIASES``.
+
+    Everything else, including sessions, users, management commands and
+    Celery tasks, stays on the primary. A user whose request wrote anything
+    is pinned to the primary for ``PIN_SECONDS``, so they read their own
+    writes while the replicas catch up.
+    """
+
+    def db_for_read(self, model, **hints):
+        aliases = get_config()["ALIASES"]
+        state = _current.get()
+
+        if model._meta.label_lower in PRIMARY_MODELS:
+            return DEFAULT_DB_ALIAS
+        if aliases and state is not None and state.use_replica():
+            return random.choice(aliases)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in get_config()["ALIASES"]
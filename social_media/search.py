@@ -0,0 +1,135 @@
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Post, Profile
+
+VENDOR_BACKENDS = {
+    "sqlite": "social_media.search.SQLiteFTSBackend",
+    "postgresql": "social_media.search.PostgresSearchBackend",
+}
+
+FTS_TABLES = {
+    Post: ("social_media_post_fts", ("title", "content")),
+    Profile: ("social_media_profile_fts", ("username",)),
+}
+
+
+def get_backend():
+    path = getattr(settings, "SOCIAL_MEDIA_SEARCH_BACKEND", None)
+
+    if not path:
+        path = VENDOR_BACKENDS.get(
+            connection.vendor, "social_media.search.ContainsSearchBackend"
+        )
+
+    return import_string(path)()
+
+
+class ContainsSearchBackend:
+    """Plain ``icontains`` scans, used where no search index is available."""
+
+    def index(self, instance):
+        pass
+
+    def remove(self, instance):
+        pass
+
+    def filter(self, queryset, fields, query):
+        """Narrow ``queryset`` to rows containing ``query`` in any of ``fields``."""
+        return queryset.filter(
+            reduce(or_, (Q(**{f"{field}__icontains": query}) for field in fields))
+        )
+
+    def search(self, queryset, fields, query):
+        """Like ``filter`` but annotated with ``search_rank`` and ordered by it."""
+        return (
+            self.filter(queryset, fields, query)
+            .annotate(search_rank=Value(0.0, output_field=FloatField()))
+            .order_by("-search_rank", "-id")
+        )
+
+
+class SQLiteFTSBackend(ContainsSearchBackend):
+    """
+    FTS5 tables with the trigram tokenizer, which keeps substring semantics
+    for queries of three characters or more. Shorter queries cannot use a
+    trigram index and fall back to ``icontains``.
+    """
+
+    min_length = 3
+
+    def index(self, instance):
+        table, fields = FTS_TABLES[type(instance)]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [instance.pk])
+            cursor.execute(
+                f"INSERT INTO {table} (rowid, {', '.join(fields)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(fields))})",
+                [instance.pk, *(getattr(instance, field) for field in fields)],
+            )
+
+    def remove(self, instance):
+        table, _ = FTS_TABLES[type(instance)]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [instance.pk])
+
+    def match_expression(self, fields, query):
+        phrase = query.replace('"', '""')
+        return f'{{{" ".join(fields)}}} : "{phrase}"'
+
+    def filter(self, queryset, fields, query):
+        if len(query) < self.min_length:
+            return super().filter(queryset, fields, query)
+
+        table, _ = FTS_TABLES[queryset.model]
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {table} WHERE {table} MATCH %s",
+                [self.match_expression(fields, query)],
+            )
+        )
+
+    def search(self, queryset, fields, query):
+        if len(query) < self.min_length:
+            return super().search(queryset, fields, query)
+
+        table, _ = FTS_TABLES[queryset.model]
+        model_table = queryset.model._meta.db_table
+        return queryset.extra(
+            select={"search_rank": f"-bm25({table})"},
+            tables=[table],
+            where=[f"{table}.rowid = {model_table}.id", f"{table} MATCH %s"],
+            params=[self.match_expression(fields, query)],
+        ).order_by("-search_rank", "-id")
+
+
+class PostgresSearchBackend(ContainsSearchBackend):
+    """
+    ``icontains`` filters are served by ``gin_trgm_ops`` indexes on
+    ``UPPER(field)``, ranked search by a GIN index over the same
+    ``SearchVector`` built here.
+    """
+
+    config = "simple"
+
+    def search(self, queryset, fields, query):
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVector,
+        )
+
+        vector = SearchVector(*fields, config=self.config)
+        search_query = SearchQuery(query, config=self.config, search_type="websearch")
+        return (
+            queryset.annotate(search_vector=vector)
+            .filter(search_vector=search_query)
+            .annotate(search_rank=SearchRank(vector, search_query))
+            .order_by("-search_rank", "-id")
+        )
@@ -1,6 +1,23 @@
+from django.utils import timezone
 from rest_framework import serializers
 
-from social_media.models import Comment, Post, Profile
+from social_media.images import rendition_urls
+from social_media.models import (
+    FOLLOW_PREVIEW,
+    LATEST_COMMENTS,
+    Comment,
+    ImageUpload,
+    Post,
+    Profile,
+)
+from social_media.uploads import SIGNATURES, get_config as get_upload_config
+
+
+class ImageRenditionsField(serializers.ReadOnlyField):
+    """URLs of the resized copies of an image, grouped by size and format."""
+
+    def to_representation(self, renditions):
+        return rendition_urls(renditions, self.context.get("request"))
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -15,7 +32,6 @@ class CommentSerializer(serializers.ModelSerializer):
             "content",
             "created_at",
         )
-        ordering = ("-created_at",)
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -34,29 +50,73 @@ class ProfileSerializer(serializers.ModelSerializer):
         return data
 
 
+def followed_ids(request, profile_ids):
+    """The ids among ``profile_ids`` followed by the user of ``request``."""
+    viewer = getattr(getattr(request, "user", None), "profile", None)
+    if viewer is None or not profile_ids:
+        return set()
+
+    return set(
+        Profile.followers.through.objects.filter(
+            to_profile=viewer, from_profile__in=profile_ids
+        ).values_list("from_profile", flat=True)
+    )
+
+
+class ProfileFollowsListSerializer(serializers.ListSerializer):
+    """
+    Look up which profiles of a page the viewer follows in one query, for
+    the ``viewer_follows`` flag of each row.
+    """
+
+    def to_representation(self, data):
+        profiles = list(data.all() if hasattr(data, "all") else data)
+        self.context["viewer_follows"] = followed_ids(
+            self.context.get("request"), [profile.pk for profile in profiles]
+        )
+        return super().to_representation(profiles)
+
+
 class ProfileListSerializer(ProfileSerializer):
-    followers = serializers.IntegerField(source="followers.count")
-    following = serializers.IntegerField(source="following.count")
+    followers = serializers.IntegerField(source="followers_count", read_only=True)
+    following = serializers.IntegerField(source="following_count", read_only=True)
+    profile_pic_renditions = ImageRenditionsField()
+    viewer_follows = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
         fields = (
+            "id",
             "username",
             "status",
             "profile_pic",
+            "profile_pic_renditions",
             "bio",
             "followers",
             "following",
+            "viewer_follows",
         )
+        list_serializer_class = ProfileFollowsListSerializer
+
+    def get_viewer_follows(self, profile):
+        followed = self.context.get("viewer_follows")
+        if followed is None:
+            followed = followed_ids(self.context.get("request"), [profile.pk])
+        return profile.pk in followed
+
+
+class ProfileSuggestionSerializer(ProfileListSerializer):
+    mutual_count = serializers.IntegerField(read_only=True)
+
+    class Meta(ProfileListSerializer.Meta):
+        fields = (*ProfileListSerializer.Meta.fields, "mutual_count")
 
 
 class ProfileDetailSerializer(ProfileSerializer):
-    followers = serializers.SlugRelatedField(
-        many=True, read_only=True, slug_field="username"
-    )
-    following = serializers.SlugRelatedField(
-        many=True, read_only=True, slug_field="username"
-    )
+    followers = serializers.IntegerField(source="followers_count", read_only=True)
+    following = serializers.IntegerField(source="following_count", read_only=True)
+    followers_preview = serializers.SerializerMethodField()
+    following_preview = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
@@ -67,8 +127,25 @@ class ProfileDetailSerializer(ProfileSerializer):
             "bio",
             "followers",
             "following",
+            "followers_preview",
+            "following_preview",
         )
 
+    def get_followers_preview(self, profile):
+        """A few usernames, the rest are paged under profiles/{id}/followers/."""
+        return self.preview(profile, "followers")
+
+    def get_following_preview(self, profile):
+        return self.preview(profile, "following")
+
+    def preview(self, profile, relation):
+        profiles = getattr(profile, f"{relation}_preview", None)
+
+        if profiles is None:
+            profiles = getattr(profile, relation).order_by("id")[:FOLLOW_PREVIEW]
+
+        return [related.username for related in profiles]
+
 
 class ProfileImageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -80,13 +157,15 @@ class PostSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = (
+            "id",
             "title",
             "content",
             "author",
             "scheduled_time",
+            "status",
             "image",
         )
-        read_only_fields = ("author",)
+        read_only_fields = ("author", "status")
 
     def validate(self, data):
         user_profile = self.context["request"].user.profile
@@ -96,21 +175,8 @@ class PostSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         scheduled_time = validated_data.get("scheduled_time")
 
-        if scheduled_time:
-            from .tasks import create_scheduled_post
-
-            create_scheduled_post.apply_async(
-                args=[
-                    validated_data["title"],
-                    validated_data["content"],
-                    validated_data["author"],
-                    scheduled_time,
-                    validated_data["image"],
-                ],
-                eta=scheduled_time,
-            )
-
-            return validated_data
+        if scheduled_time and scheduled_time > timezone.now():
+            validated_data["status"] = Post.Status.SCHEDULED
 
         post = Post.objects.create(**validated_data)
         return post
@@ -118,8 +184,9 @@ class PostSerializer(serializers.ModelSerializer):
 
 class PostListSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(read_only=True, slug_field="username")
-    comments = serializers.IntegerField(source="comments.count", read_only=True)
-    likes = serializers.IntegerField(source="likes.count", read_only=True)
+    comments = serializers.IntegerField(source="comments_count", read_only=True)
+    likes = serializers.IntegerField(source="likes_count", read_only=True)
+    image_renditions = ImageRenditionsField()
     write_only_fields = ("scheduled_time",)
 
     class Meta:
@@ -130,16 +197,24 @@ class PostListSerializer(serializers.ModelSerializer):
             "content",
             "created_at",
             "image",
+            "image_renditions",
             "comments",
             "likes",
             "scheduled_time",
         )
 
 
+class PostDeltaSerializer(PostListSerializer):
+    class Meta(PostListSerializer.Meta):
+        fields = ("id", *PostListSerializer.Meta.fields, "updated_at")
+
+
 class PostDetailSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(read_only=True, slug_field="username")
-    comments = CommentSerializer(many=True, read_only=True)
-    likes = serializers.IntegerField(source="likes.count", read_only=True)
+    comments = serializers.SerializerMethodField()
+    comments_count = serializers.IntegerField(read_only=True)
+    likes = serializers.IntegerField(source="likes_count", read_only=True)
+    image_renditions = ImageRenditionsField()
     write_only_fields = ("scheduled_time",)
 
     class Meta:
@@ -150,13 +225,79 @@ class PostDetailSerializer(serializers.ModelSerializer):
             "content",
             "created_at",
             "image",
+            "image_renditions",
             "comments",
+            "comments_count",
             "likes",
             "scheduled_time",
         )
 
+    def get_comments(self, post):
+        """Only the newest comments, the rest are paged under posts/{id}/comments/."""
+        comments = getattr(post, "latest_comments", None)
+
+        if comments is None:
+            comments = post.comments.all()[:LATEST_COMMENTS]
+
+        return CommentSerializer(comments, many=True).data
+
 
 class PostImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = ("image",)
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    max_size = 100
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=max_size,
+    )
+
+    def validate_ids(self, ids):
+        return list(dict.fromkeys(ids))
+
+
+class RelationshipIdsSerializer(BulkIdsSerializer):
+    max_size = 200
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=max_size,
+    )
+
+
+class ImageUploadSerializer(serializers.ModelSerializer):
+    content_type = serializers.ChoiceField(choices=list(SIGNATURES))
+
+    class Meta:
+        model = ImageUpload
+        fields = (
+            "id",
+            "target",
+            "target_id",
+            "filename",
+            "content_type",
+            "size",
+            "offset",
+            "status",
+        )
+        read_only_fields = ("offset", "status")
+
+    def validate_size(self, size):
+        if not 0 < size <= get_upload_config()["MAX_SIZE"]:
+            raise serializers.ValidationError("Upload size is out of range.")
+        return size
+
+    def validate(self, data):
+        owner = self.context["request"].user.profile
+
+        if ImageUpload(owner=owner, **data).get_target() is None:
+            raise serializers.ValidationError(
+                {"target_id": "No such post or profile of yours."}
+            )
+        return data
@@ -0,0 +1,12 @@
+from django.dispatch import Signal
+
+# Sent by ``Profile`` with ``follower`` (a profile id) and ``profile_ids``
+# once follow relations have actually been created or removed.
+followed = Signal()
+unfollowed = Signal()
+
+# Sent by ``Post`` with ``post_ids`` whenever likes were added or removed.
+likes_changed = Signal()
+
+# Sent by ``Post`` with the list of ``posts`` a scheduled publish just released.
+published = Signal()
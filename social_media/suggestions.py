@@ -0,0 +1,126 @@
+"""
+Follow suggestions from friends of friends: profiles followed by the
+profiles someone follows, ranked by how many of them do.
+
+The follow graph is loaded once per run into a compressed sparse row (CSR)
+structure of integer arrays, so a run costs a single scan of the follow
+table instead of a join per profile.
+"""
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import Follow, FollowSuggestion, Profile
+
+DEFAULTS = {
+    "TOP_K": 20,
+    "BATCH_SIZE": 1000,
+    "CHUNK_SIZE": 10000,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_SUGGESTIONS", {})}
+
+
+class FollowGraph:
+    """
+    Who follows whom, as CSR arrays: the profiles ``followed[offsets[i]:
+    offsets[i + 1]]`` are followed by ``followers[i]``. ``followers`` is
+    sorted, so a profile's row is found by bisection.
+    """
+
+    def __init__(self, followers, offsets, followed):
+        self.followers = followers
+        self.offsets = offsets
+        self.followed = followed
+
+    @classmethod
+    def load(cls, chunk_size=None):
+        """Build the graph from one scan of the follow table in follower order."""
+        chunk_size = chunk_size or get_config()["CHUNK_SIZE"]
+        followers, offsets, followed = array("q"), array("q"), array("q")
+        edges = (
+            Follow.objects.order_by("to_profile", "from_profile")
+            .values_list("to_profile", "from_profile")
+            .iterator(chunk_size=chunk_size)
+        )
+
+        for follower, profile in edges:
+            if not followers or followers[-1] != follower:
+                followers.append(follower)
+                offsets.append(len(followed))
+            followed.append(profile)
+
+        offsets.append(len(followed))
+        return cls(followers, offsets, followed)
+
+    def following(self, profile_id):
+        index = bisect_left(self.followers, profile_id)
+        if index == len(self.followers) or self.followers[index] != profile_id:
+            return self.followed[:0]
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.followed[start:end]
+
+    def suggest(self, profile_id, top_k):
+        """
+        Return up to ``top_k`` (profile id, mutual count) pairs of profiles
+        that ``profile_id`` does not follow yet, most mutual follows first.
+        """
+        following = self.following(profile_id)
+        counts = Counter()
+
+        for followed_id in following:
+            counts.update(self.following(followed_id))
+
+        for excluded in (profile_id, *following):
+            counts.pop(excluded, None)
+
+        return heapq.nsmallest(
+            top_k, counts.items(), key=lambda item: (-item[1], item[0])
+        )
+
+
+def rebuild(graph=None):
+    """
+    Replace the stored suggestions of every profile, in batches, and return
+    how many were stored.
+    """
+    config = get_config()
+    graph = graph or FollowGraph.load(config["CHUNK_SIZE"])
+    profile_ids = Profile.objects.order_by("pk").values_list("pk", flat=True)
+    last_id, total = 0, 0
+
+    while True:
+        batch = list(profile_ids.filter(pk__gt=last_id)[: config["BATCH_SIZE"]])
+        if not batch:
+            return total
+
+        suggestions = [
+            FollowSuggestion(
+                profile_id=profile_id, suggested_id=suggested_id, mutual_count=count
+            )
+            for profile_id in batch
+            for suggested_id, count in graph.suggest(profile_id, config["TOP_K"])
+        ]
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(profile_id__in=batch).delete()
+            FollowSuggestion.objects.bulk_create(suggestions)
+
+        last_id = batch[-1]
+        total += len(suggestions)
+
+
+def for_profile(profile):
+    """Stored suggestions of ``profile`` it does not follow meanwhile."""
+    return (
+        Profile.objects.filter(suggested_to__profile=profile)
+        .exclude(pk__in=profile.following.values("pk"))
+        .annotate(mutual_count=F("suggested_to__mutual_count"))
+        .order_by("-mutual_count", "pk")
+    )
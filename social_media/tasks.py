@@ -1,16 +1,48 @@
 from celery import shared_task
-from django.utils import timezone
-from .models import Post
+
+from . import cache, delta, images, ranking, suggestions, uploads
+from .models import Post, Profile
+from .timeline import get_backend
+
+
+@shared_task
+def publish_scheduled_posts(batch_size=100):
+    return Post.objects.publish_due(batch_size=batch_size)
+
+
+@shared_task
+def trim_timelines():
+    get_backend().trim()
+
+
+@shared_task
+def refresh_post_scores():
+    return ranking.refresh_decay()
+
+
+@shared_task
+def rebuild_follow_suggestions():
+    return suggestions.rebuild()
+
+
+@shared_task
+def purge_post_tombstones():
+    return delta.purge_tombstones()
+
+
+@shared_task
+def invalidate_profile_previews(profile_id):
+    """Drop cached detail payloads of profiles that preview a renamed one."""
+    profile_ids = Profile.objects.previewing(profile_id).values_list("pk", flat=True)
+    cache.invalidate("profile", *profile_ids)
+
+
+@shared_task(bind=True)
+def process_image(self, label, pk):
+    # Eager runs happen inside the web process, so keep Pillow out of it.
+    images.process(label, pk, in_pool=self.request.is_eager)
 
 
 @shared_task
-def create_scheduled_post(title, content, author, scheduled_time, image=None):
-    scheduled_time = timezone.make_aware(scheduled_time)
-    post = Post.objects.create(
-        title=title,
-        content=content,
-        author=author,
-        created_at=scheduled_time,
-        image=image
-    )
-    return post.id
+def purge_stale_uploads():
+    return uploads.purge_stale()
@@ -0,0 +1,142 @@
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from social_media import metrics
+from social_media.models import Comment, Post, Profile
+
+
+def sample_profile(email, username):
+    user = get_user_model().objects.create_user(email, "testpass")
+    return Profile.objects.create(user=user, username=username)
+
+
+class AsyncReadEndpointTests(TestCase):
+    def setUp(self):
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.other = sample_profile("other@test.com", "other_user")
+        self.stranger = sample_profile("stranger@test.com", "stranger")
+        self.profile.follow(self.other)
+
+        self.posts = [
+            Post.objects.create(author=self.other, title=f"Post {index}")
+            for index in range(3)
+        ]
+        self.hidden = Post.objects.create(author=self.stranger, title="Hidden")
+        Comment.objects.create(author=self.profile, post=self.posts[0], content="Hi")
+        self.posts[0].like(self.profile)
+
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.profile.user)}"
+        )
+
+    def assertSamePayload(self, sync_url, async_url, params=None):
+        sync_response = self.client.get(sync_url, params)
+        async_response = self.client.get(async_url, params)
+
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response["Content-Type"], "application/json")
+        return sync_response.json(), async_response.json()
+
+    def test_feed_matches_sync_endpoint(self):
+        sync_data, async_data = self.assertSamePayload(
+            reverse("social_media:post-list"),
+            reverse("social_media:async-post-list"),
+            {"page_size": 2},
+        )
+
+        self.assertEqual(async_data["results"], sync_data["results"])
+        self.assertEqual(len(async_data["results"]), 2)
+        self.assertIsNotNone(async_data["next"])
+
+        next_page = self.client.get(async_data["next"]).json()
+        self.assertEqual(len(next_page["results"]), 1)
+
+    def test_liked_posts_matches_sync_endpoint(self):
+        sync_data, async_data = self.assertSamePayload(
+            reverse("social_media:post-liked-posts"),
+            reverse("social_media:async-post-liked-posts"),
+        )
+        self.assertEqual(async_data["results"], sync_data["results"])
+        self.assertEqual(len(async_data["results"]), 1)
+
+    def test_post_detail_matches_sync_endpoint(self):
+        post_id = self.posts[0].id
+        for _ in range(2):
+            sync_data, async_data = self.assertSamePayload(
+                reverse("social_media:post-detail", args=[post_id]),
+                reverse("social_media:async-post-detail", args=[post_id]),
+            )
+            self.assertEqual(async_data, sync_data)
+
+    def test_profile_detail_matches_sync_endpoint(self):
+        sync_data, async_data = self.assertSamePayload(
+            reverse("social_media:profile-detail", args=[self.other.id]),
+            reverse("social_media:async-profile-detail", args=[self.other.id]),
+        )
+        self.assertEqual(async_data, sync_data)
+
+    def test_hidden_post_is_not_found(self):
+        url = reverse("social_media:async-post-detail", args=[self.hidden.id])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_authentication_required(self):
+        self.client.credentials()
+        response = self.client.get(reverse("social_media:async-post-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+    def test_only_get_is_allowed(self):
+        response = self.client.post(reverse("social_media:async-post-list"))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_queries_are_recorded_in_metrics(self):
+        metrics.registry.reset()
+        self.client.get(reverse("social_media:async-post-list"))
+
+        (stats,) = metrics.registry.snapshot()
+        self.assertEqual(stats["route"], "async-post-list")
+        self.assertGreater(stats["queries"]["sum"], 0)
+
+    async def test_queries_are_recorded_in_the_async_stack(self):
+        metrics.registry.reset()
+        token = await sync_to_async(AccessToken.for_user)(self.profile.user)
+        response = await AsyncClient().get(
+            reverse("social_media:async-post-list"), AUTHORIZATION=f"Bearer {token}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        (stats,) = metrics.registry.snapshot()
+        self.assertGreater(stats["queries"]["sum"], 0)
+        self.assertEqual(connection.execute_wrappers, [])
+
+
+class ConcurrencyBenchmarkTests(TransactionTestCase):
+    def test_compares_wsgi_and_asgi(self):
+        profile = sample_profile("test@test.com", "test_user")
+        other = sample_profile("other@test.com", "other_user")
+        profile.follow(other)
+        Post.objects.create(author=other, title="Post")
+
+        out = StringIO()
+        call_command(
+            "benchmark_concurrency",
+            requests=6,
+            threads=2,
+            concurrency=3,
+            stdout=out,
+        )
+
+        self.assertIn("wsgi", out.getvalue())
+        self.assertIn("asgi", out.getvalue())
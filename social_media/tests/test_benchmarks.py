@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from social_media.models import Comment, Post, Profile
+
+
+class BenchmarkCommandTests(TestCase):
+    def setUp(self):
+        call_command(
+            "seed_social_graph",
+            profiles=30,
+            follows=5,
+            posts=2,
+            likes=5,
+            comments=1,
+            stdout=StringIO(),
+        )
+        self.output = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
+        self.output.close()
+        self.addCleanup(os.unlink, self.output.name)
+
+    def benchmark(self, **options):
+        options = {"requests": 2, "warmup": 0, **options}
+        call_command("benchmark_api", stdout=StringIO(), **options)
+
+    def counters(self):
+        profiles = Profile.objects.order_by("id")
+        posts = Post.objects.order_by("id")
+        return (
+            list(profiles.values_list("followers_count", "following_count")),
+            list(posts.values_list("likes_count", flat=True)),
+        )
+
+    def test_seed_creates_graph_with_consistent_counters(self):
+        self.assertEqual(Profile.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertTrue(Profile.followers.through.objects.exists())
+        self.assertTrue(Post.likes.through.objects.exists())
+        self.assertTrue(Comment.objects.exists())
+
+        profile = Profile.objects.order_by("-followers_count").first()
+        self.assertEqual(profile.followers_count, profile.followers.count())
+
+    def test_benchmark_writes_baseline(self):
+        self.benchmark(output=self.output.name)
+
+        with open(self.output.name) as output:
+            report = json.load(output)
+
+        self.assertEqual(report["meta"]["profiles"], 30)
+        self.assertIn("feed", report["results"])
+        self.assertEqual(
+            set(report["results"]["feed"]), {"p50_ms", "p99_ms", "queries", "bytes"}
+        )
+
+    def test_compare_fails_on_query_regression(self):
+        self.benchmark(output=self.output.name)
+
+        with open(self.output.name) as output:
+            report = json.load(output)
+        report["results"]["feed"]["queries"] -= 1
+        with open(self.output.name, "w") as output:
+            json.dump(report, output)
+
+        with self.assertRaisesMessage(CommandError, "feed: "):
+            self.benchmark(compare=self.output.name, tolerance=1000)
+
+    def test_toggles_leave_the_data_as_found(self):
+        before = self.counters()
+
+        self.benchmark(requests=3, output=self.output.name)
+
+        self.assertEqual(self.counters(), before)
+        self.benchmark(requests=3, compare=self.output.name, tolerance=1000)
+
+    def test_compare_refuses_a_baseline_of_other_targets(self):
+        self.benchmark(output=self.output.name)
+
+        with open(self.output.name) as output:
+            report = json.load(output)
+        report["meta"]["post"] += 1
+        with open(self.output.name, "w") as output:
+            json.dump(report, output)
+
+        with self.assertRaisesMessage(CommandError, "measured with post"):
+            self.benchmark(compare=self.output.name, tolerance=1000)
@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media import cache
+from social_media_api_service.celery import app
+from social_media.models import FOLLOW_PREVIEW, Comment, Profile, Post
+
+
+def sample_profile(email, username):
+    user = get_user_model().objects.create_user(email)
+    return Profile.objects.create(user=user, username=username)
+
+
+@override_settings(SOCIAL_MEDIA_CACHE={"ENABLED": True})
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        cache.stats.clear()
+        eager = app.conf.task_always_eager
+        app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, app.conf, "CELERY_TASK_ALWAYS_EAGER", eager)
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.other = sample_profile("other@test.com", "other_user")
+        self.post = Post.objects.create(author=self.profile, title="Post")
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+        self.post_url = reverse("social_media:post-detail", args=[self.post.id])
+        self.profile_url = reverse(
+            "social_media:profile-detail", args=[self.profile.id]
+        )
+
+    def test_post_detail_is_served_from_cache(self):
+        self.client.get(self.post_url)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(self.post_url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(cache.cache_stats()["hits"], 1)
+        self.assertEqual(cache.cache_stats()["misses"], 1)
+
+    def test_cached_post_still_checks_visibility(self):
+        self.client.get(self.post_url)
+        self.client.force_authenticate(self.other.user)
+
+        res = self.client.get(self.post_url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_comment_and_like_invalidate_post_detail(self):
+        self.client.get(self.post_url)
+
+        Comment.objects.create(author=self.other, post=self.post, content="Hi")
+        res = self.client.get(self.post_url)
+        self.assertEqual(len(res.data["comments"]), 1)
+
+        self.post.like(self.other)
+        res = self.client.get(self.post_url)
+        self.assertEqual(res.data["likes"], 1)
+
+    def test_author_rename_invalidates_post_detail(self):
+        self.client.get(self.post_url)
+
+        self.profile.username = "renamed"
+        self.profile.save()
+
+        res = self.client.get(self.post_url)
+        self.assertEqual(res.data["author"], "renamed")
+
+    def test_follow_and_rename_invalidate_profile_detail(self):
+        self.client.get(self.profile_url)
+
+        self.other.follow(self.profile)
+        res = self.client.get(self.profile_url)
+        self.assertEqual(res.data["followers"], 1)
+        self.assertEqual(res.data["followers_preview"], ["other_user"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.username = "renamed"
+            self.other.save()
+        res = self.client.get(self.profile_url)
+        self.assertEqual(res.data["followers_preview"], ["renamed"])
+
+    def test_profile_edit_without_rename_does_not_fan_out(self):
+        self.other.follow(self.profile)
+        version = cache.get_versions([("profile", self.profile.pk)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.bio = "New bio"
+            self.other.save()
+
+        self.assertEqual(cache.get_versions([("profile", self.profile.pk)]), version)
+
+    def test_rename_reaches_only_previews_showing_it(self):
+        followers = [
+            sample_profile(f"follower{index}@test.com", f"follower_{index}")
+            for index in range(FOLLOW_PREVIEW)
+        ]
+        late = sample_profile("late@test.com", "late")
+        for follower in [*followers, late]:
+            follower.follow(self.profile)
+
+        previewing = Profile.objects.previewing
+        self.assertIn(self.profile, previewing(followers[-1].pk))
+        self.assertNotIn(self.profile, previewing(late.pk))
+
+    @override_settings(SOCIAL_MEDIA_CACHE={"ENABLED": False})
+    def test_cache_can_be_disabled(self):
+        self.client.get(self.post_url)
+        self.client.get(self.post_url)
+
+        self.assertEqual(cache.cache_stats()["hits"], 0)
+        self.assertEqual(cache.cache_stats()["misses"], 0)
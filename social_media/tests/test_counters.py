@@ -0,0 +1,187 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from social_media.models import Profile, Post
+from social_media.serializers import BulkIdsSerializer
+
+
+def sample_profile(email, username):
+    user = get_user_model().objects.create_user(email, "testpass")
+    return Profile.objects.create(user=user, username=username)
+
+
+class CounterAssertionsMixin:
+    def assertCounters(self, obj, **expected):
+        obj.refresh_from_db()
+        self.assertEqual({name: getattr(obj, name) for name in expected}, expected)
+
+
+class CounterTests(CounterAssertionsMixin, TestCase):
+    def setUp(self):
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.other = sample_profile("other@test.com", "other_user")
+        self.post = Post.objects.create(author=self.other, title="Post")
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+
+    def test_like_unlike_updates_likes_count(self):
+        self.profile.follow(self.other)
+        url = reverse("social_media:post-like-unlike", args=[self.post.id])
+
+        self.client.post(url)
+        self.assertCounters(self.post, likes_count=1)
+
+        self.client.post(url)
+        self.assertCounters(self.post, likes_count=0)
+
+    def test_like_is_idempotent(self):
+        self.assertTrue(self.post.like(self.profile))
+        self.assertFalse(self.post.like(self.profile))
+        self.assertCounters(self.post, likes_count=1)
+
+        self.assertFalse(self.post.toggle_like(self.profile))
+        self.assertFalse(self.post.unlike(self.profile))
+        self.assertCounters(self.post, likes_count=0)
+
+    def test_comment_updates_comments_count(self):
+        self.profile.follow(self.other)
+        self.client.post(
+            reverse("social_media:post-comment", args=[self.post.id]),
+            {"content": "Nice"},
+        )
+        self.assertCounters(self.post, comments_count=1)
+
+        self.post.comments.get().delete()
+        self.assertCounters(self.post, comments_count=0)
+
+    def test_follow_unfollow_update_counters(self):
+        self.assertTrue(self.profile.follow(self.other))
+        self.assertFalse(self.profile.follow(self.other))
+        self.assertCounters(self.profile, following_count=1, followers_count=0)
+        self.assertCounters(self.other, followers_count=1, following_count=0)
+
+        self.assertTrue(self.profile.unfollow(self.other))
+        self.assertFalse(self.profile.unfollow(self.other))
+        self.assertCounters(self.profile, following_count=0)
+        self.assertCounters(self.other, followers_count=0)
+
+    def test_follow_locks_both_profiles_in_pk_order(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.other.follow(self.profile)
+
+        (lock,) = [
+            query["sql"]
+            for query in captured.captured_queries
+            if query["sql"].startswith('SELECT "social_media_profile"."id"')
+        ]
+        ids = sorted([self.profile.pk, self.other.pk])
+        self.assertIn(f'"social_media_profile"."id" IN ({ids[0]}, {ids[1]})', lock)
+        self.assertTrue(lock.endswith('ORDER BY "social_media_profile"."id" ASC'))
+
+    def test_m2m_writes_update_counters(self):
+        self.other.followers.add(self.profile)
+        self.post.likes.add(self.profile)
+        self.assertCounters(self.other, followers_count=1)
+        self.assertCounters(self.profile, following_count=1)
+        self.assertCounters(self.post, likes_count=1)
+
+        self.profile.following.remove(self.other, self.profile)
+        self.profile.posts_liked.clear()
+        self.assertCounters(self.other, followers_count=0)
+        self.assertCounters(self.profile, following_count=0)
+        self.assertCounters(self.post, likes_count=0)
+
+    def test_deleting_profile_releases_counters(self):
+        self.profile.follow(self.other)
+        self.post.like(self.profile)
+
+        self.profile.delete()
+
+        self.assertCounters(self.other, followers_count=0)
+        self.assertCounters(self.post, likes_count=0)
+
+    def test_rebuild_counters_fixes_drift(self):
+        self.post.like(self.profile)
+        Post.objects.update(likes_count=7)
+        Profile.objects.update(followers_count=3)
+        out = StringIO()
+
+        call_command("rebuild_counters", stdout=out)
+
+        self.assertIn("Post.likes_count: 1 drifted", out.getvalue())
+        self.assertIn("Profile.followers_count: 2 drifted", out.getvalue())
+        self.assertCounters(self.post, likes_count=1)
+        self.assertCounters(self.other, followers_count=0)
+
+
+class BulkActionTests(CounterAssertionsMixin, TestCase):
+    def setUp(self):
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.others = [
+            sample_profile(f"user{index}@test.com", f"user_{index}")
+            for index in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+
+    def results(self, url_name, ids):
+        res = self.client.post(
+            reverse(f"social_media:{url_name}"), {"ids": ids}, format="json"
+        )
+        return [(item["id"], item["result"]) for item in res.data["results"]]
+
+    def test_bulk_follow_and_unfollow(self):
+        first, second, third = (other.id for other in self.others)
+        self.profile.follow(self.others[0])
+
+        self.assertEqual(
+            self.results("profile-bulk-follow", [first, second, self.profile.id, 9999]),
+            [
+                (first, "already_following"),
+                (second, "followed"),
+                (self.profile.id, "unavailable"),
+                (9999, "unavailable"),
+            ],
+        )
+        self.assertCounters(self.profile, following_count=2)
+        self.assertCounters(self.others[1], followers_count=1)
+
+        self.assertEqual(
+            self.results("profile-bulk-unfollow", [second, third]),
+            [(second, "unfollowed"), (third, "not_following")],
+        )
+        self.assertCounters(self.profile, following_count=1)
+        self.assertCounters(self.others[1], followers_count=0)
+
+    def test_bulk_like_and_unlike(self):
+        self.profile.follow(self.others[0])
+        visible = Post.objects.create(author=self.others[0], title="Visible")
+        hidden = Post.objects.create(author=self.others[1], title="Hidden")
+
+        self.assertEqual(
+            self.results("post-bulk-like", [visible.id, hidden.id, visible.id]),
+            [(visible.id, "liked"), (hidden.id, "unavailable")],
+        )
+        self.assertCounters(visible, likes_count=1)
+        self.assertCounters(hidden, likes_count=0)
+
+        self.assertEqual(
+            self.results("post-bulk-unlike", [visible.id]),
+            [(visible.id, "unliked")],
+        )
+        self.assertCounters(visible, likes_count=0)
+
+    def test_bulk_size_is_capped(self):
+        res = self.client.post(
+            reverse("social_media:profile-bulk-follow"),
+            {"ids": list(range(1, BulkIdsSerializer.max_size + 2))},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 400)
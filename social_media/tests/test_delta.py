@@ -0,0 +1,164 @@
+import json
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from social_media.models import Post, PostTombstone, Profile
+from social_media.tasks import purge_post_tombstones
+
+DELTA_URL = reverse("social_media:post-feed-delta")
+
+
+def sample_profile(email, username):
+    user = get_user_model().objects.create_user(email, "testpass")
+    return Profile.objects.create(user=user, username=username)
+
+
+def sample_post(author, **params):
+    defaults = {"title": "Sample post", "content": "Sample content"}
+    defaults.update(params)
+
+    return Post.objects.create(author=author, **defaults)
+
+
+# Rows count as committed at once; test_late_commit_is_not_skipped covers LAG.
+@override_settings(SOCIAL_MEDIA_DELTA={"LAG": timedelta(0)})
+class DeltaFeedTests(TestCase):
+    def setUp(self):
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.author = sample_profile("author@test.com", "author")
+        self.stranger = sample_profile("stranger@test.com", "stranger")
+        self.profile.follow(self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+
+    def poll(self, since=None, **headers):
+        params = {"since": since} if since else {}
+        return self.client.get(DELTA_URL, params, headers=headers)
+
+    def titles(self, res):
+        return [post["title"] for post in res.data["results"]]
+
+    def test_first_poll_returns_feed_oldest_first(self):
+        sample_post(self.author, title="First")
+        sample_post(self.profile, title="Second")
+        sample_post(self.stranger, title="Stranger")
+
+        res = self.poll()
+
+        self.assertEqual(self.titles(res), ["First", "Second"])
+        self.assertEqual(res.data["deleted"], [])
+        self.assertFalse(res.data["has_more"])
+
+    def test_poll_returns_new_edited_and_deleted_posts(self):
+        edited = sample_post(self.author, title="Edited")
+        deleted = sample_post(self.author, title="Deleted")
+        deleted_id = deleted.pk
+        sample_post(self.author, title="Unchanged")
+        since = self.poll().data["since"]
+
+        edited.title = "Edited again"
+        edited.save()
+        deleted.delete()
+        sample_post(self.profile, title="New")
+        sample_post(self.stranger).delete()
+
+        res = self.poll(since)
+
+        self.assertEqual(self.titles(res), ["Edited again", "New"])
+        self.assertEqual(res.data["deleted"], [deleted_id])
+
+        res = self.poll(res.data["since"])
+        self.assertEqual((res.data["results"], res.data["deleted"]), ([], []))
+
+    @override_settings(SOCIAL_MEDIA_DELTA={"PAGE_SIZE": 2, "LAG": timedelta(0)})
+    def test_changes_are_paged(self):
+        for index in range(3):
+            sample_post(self.author, title=str(index))
+
+        res = self.poll()
+        self.assertEqual(self.titles(res), ["0", "1"])
+        self.assertTrue(res.data["has_more"])
+
+        res = self.poll(res.data["since"])
+        self.assertEqual(self.titles(res), ["2"])
+        self.assertFalse(res.data["has_more"])
+
+    def test_late_commit_is_not_skipped(self):
+        now = timezone.now()
+        committed = sample_post(self.author, title="Committed")
+        Post.objects.filter(pk=committed.pk).update(
+            updated_at=now - timedelta(seconds=5)
+        )
+
+        with self.settings(SOCIAL_MEDIA_DELTA={"LAG": timedelta(seconds=10)}):
+            res = self.poll()
+        self.assertEqual(self.titles(res), [])
+
+        # Written before the poll, committed after it.
+        late = sample_post(self.author, title="Late")
+        Post.objects.filter(pk=late.pk).update(updated_at=now - timedelta(seconds=6))
+
+        res = self.poll(res.data["since"])
+        self.assertEqual(self.titles(res), ["Late", "Committed"])
+
+    def test_idle_poll_is_not_modified(self):
+        sample_post(self.author)
+        since = self.poll().data["since"]
+        res = self.poll(since)
+
+        # Heavy followed authors, changed posts and tombstones; no rendering.
+        with self.assertNumQueries(3):
+            idle = self.poll(since, **{"If-None-Match": res["ETag"]})
+
+        self.assertEqual(idle.status_code, 304)
+        self.assertEqual(idle["ETag"], res["ETag"])
+        self.assertIn("X-Delta-Since", idle)
+
+        sample_post(self.author)
+        res = self.poll(since, **{"If-None-Match": res["ETag"]})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_idle_poll_refreshes_the_cursor(self):
+        res = self.poll()
+        payload = json.loads(urlsafe_b64decode(res.data["since"]))
+        payload["s"] = int(time.time() - timedelta(days=29).total_seconds())
+        since = urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        idle = self.poll(since, **{"If-None-Match": res["ETag"]})
+
+        self.assertEqual(idle.status_code, 304)
+        refreshed = json.loads(urlsafe_b64decode(idle["X-Delta-Since"]))
+        self.assertEqual((refreshed["p"], refreshed["d"]), (payload["p"], payload["d"]))
+        self.assertGreater(refreshed["s"], payload["s"])
+
+    def test_invalid_cursor_is_rejected(self):
+        res = self.poll("not-a-cursor")
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_expired_cursor_is_gone(self):
+        payload = json.loads(urlsafe_b64decode(self.poll().data["since"]))
+        payload["s"] = int(time.time() - timedelta(days=31).total_seconds())
+        since = urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        res = self.poll(since)
+
+        self.assertEqual(res.status_code, 410)
+
+    def test_old_tombstones_are_purged(self):
+        sample_post(self.author).delete()
+        sample_post(self.author).delete()
+        PostTombstone.objects.filter(
+            pk=PostTombstone.objects.earliest("pk").pk
+        ).update(deleted_at=timezone.now() - timedelta(days=31))
+
+        self.assertEqual(purge_post_tombstones(), 1)
+        self.assertEqual(PostTombstone.objects.count(), 1)
@@ -0,0 +1,110 @@
+import io
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from social_media import images
+from social_media.models import Post, Profile
+from social_media_api_service.celery import app
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_bytes(size, image_format="JPEG", exif=None):
+    buffer = io.BytesIO()
+    image = Image.new("RGB", size, "red")
+    image.save(buffer, format=image_format, exif=exif or Image.Exif())
+    return buffer.getvalue()
+
+
+class RenderTests(TestCase):
+    def test_renditions_are_resized_and_stripped(self):
+        exif = Image.Exif()
+        exif[0x010F] = "Camera maker"
+
+        output = images.render(
+            image_bytes((2000, 1000), exif=exif),
+            {"thumbnail": 150, "full": 4000},
+            {"webp": "WEBP", "jpeg": "JPEG"},
+            80,
+        )
+
+        for name, size in (("thumbnail", (150, 75)), ("full", (2000, 1000))):
+            for extension, image_format in (("webp", "WEBP"), ("jpeg", "JPEG")):
+                with Image.open(io.BytesIO(output[name][extension])) as rendition:
+                    self.assertEqual(rendition.format, image_format)
+                    self.assertEqual(rendition.size, size)
+                    self.assertEqual(dict(rendition.getexif()), {})
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImagePipelineTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.profile = Profile.objects.create(user=user, username="test_user")
+        self.post = Post.objects.create(author=self.profile, title="Post")
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        # The app reads CELERY_-prefixed keys, so the override needs the prefix.
+        eager = app.conf.task_always_eager
+        app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, app.conf, "CELERY_TASK_ALWAYS_EAGER", eager)
+
+    def upload(self):
+        url = reverse("social_media:post-upload-image", args=[self.post.id])
+        upload = io.BytesIO(image_bytes((800, 400)))
+        upload.name = "upload.jpg"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"image": upload}, format="multipart")
+
+        self.post.refresh_from_db()
+        return self.post.image_renditions
+
+    def test_upload_builds_renditions(self):
+        renditions = self.upload()
+
+        self.assertEqual(renditions["source"], self.post.image.name)
+        self.assertEqual(set(renditions) - {"source"}, set(images.DEFAULTS["RENDITIONS"]))
+        for paths in (renditions["thumbnail"], renditions["full"]):
+            for path in paths.values():
+                self.assertTrue(os.path.exists(os.path.join(MEDIA_ROOT, path)))
+
+        res = self.client.get(reverse("social_media:post-list"))
+        self.assertTrue(
+            res.data["results"][0]["image_renditions"]["feed"]["webp"].endswith(
+                renditions["feed"]["webp"]
+            )
+        )
+
+    def test_renditions_move_updated_at(self):
+        self.upload()
+        Post.objects.filter(pk=self.post.pk).update(
+            image_renditions={}, updated_at=self.post.created_at
+        )
+
+        images.process("social_media.post", self.post.pk)
+
+        self.post.refresh_from_db()
+        self.assertGreater(self.post.updated_at, self.post.created_at)
+
+    def test_replaced_renditions_are_deleted(self):
+        first = self.upload()
+        second = self.upload()
+
+        self.assertNotEqual(first["source"], second["source"])
+        self.assertFalse(
+            os.path.exists(os.path.join(MEDIA_ROOT, first["thumbnail"]["jpeg"]))
+        )
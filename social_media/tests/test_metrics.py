@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media import metrics
+from social_media.models import Post, Profile
+
+METRICS_URL = reverse("social_media:metrics")
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics.registry.reset()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.profile = Profile.objects.create(user=self.user, username="test_user")
+        self.post = Post.objects.create(author=self.profile, title="Post")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def route(self, name, method="GET"):
+        for stats in metrics.registry.snapshot():
+            if (stats["route"], stats["method"]) == (name, method):
+                return stats
+
+    def test_requests_are_recorded_per_route_and_method(self):
+        self.client.get(reverse("social_media:post-list"))
+        self.client.get(reverse("social_media:post-list"))
+        self.client.post(reverse("social_media:post-like-unlike", args=[self.post.id]))
+
+        post_list = self.route("post-list")
+        self.assertEqual(post_list["requests"], 2)
+        self.assertEqual(post_list["latency_ms"]["count"], 2)
+        self.assertGreater(post_list["queries"]["sum"], 0)
+        self.assertGreater(post_list["response_bytes"], 0)
+        self.assertEqual(self.route("post-like-unlike", "POST")["requests"], 1)
+
+    def test_cache_hits_and_misses_are_recorded(self):
+        url = reverse("social_media:post-detail", args=[self.post.id])
+        self.client.get(url)
+        self.client.get(url)
+
+        stats = self.route("post-detail")
+        self.assertEqual((stats["cache_misses"], stats["cache_hits"]), (1, 1))
+
+    def test_endpoint_is_staff_only(self):
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get(reverse("social_media:post-list"))
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("post-list", [stats["route"] for stats in response.json()])
+
+    def test_prometheus_format(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get(reverse("social_media:post-list"))
+
+        response = self.client.get(METRICS_URL, {"format": "prometheus"})
+        text = response.content.decode()
+
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            'social_media_requests_total{route="post-list",method="GET"} 1', text
+        )
+        self.assertIn(
+            'social_media_request_latency_ms_bucket{route="post-list",method="GET",'
+            'le="+Inf"} 1',
+            text,
+        )
+
+    @override_settings(SOCIAL_MEDIA_METRICS={"QUERY_BUDGET": 0, "TRACE_SAMPLE_RATE": 1})
+    def test_requests_over_budget_are_traced_with_sql(self):
+        with self.assertLogs("social_media.metrics", "WARNING") as logs:
+            self.client.get(reverse("social_media:post-list"))
+
+        self.assertIn("(post-list)", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+    def test_query_wrappers_are_scoped_to_the_request(self):
+        def other_wrapper(execute, *args):
+            return execute(*args)
+
+        with connection.execute_wrapper(other_wrapper):
+            self.client.get(reverse("social_media:post-list"))
+            self.assertEqual(connection.execute_wrappers, [other_wrapper])
+
+        self.assertEqual(connection.execute_wrappers, [])
+        self.client.get(reverse("social_media:post-list"))
+        queries = self.route("post-list")["queries"]
+        self.assertEqual(queries["count"], 2)
+        # Neither request was recorded with zero queries.
+        self.assertEqual(queries["buckets"][0], [0, 0])
+
+    @override_settings(SOCIAL_MEDIA_METRICS={"ENABLED": False})
+    def test_disabled(self):
+        self.client.get(reverse("social_media:post-list"))
+        self.assertEqual(metrics.registry.snapshot(), [])
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media.models import Profile, Post
+
+POST_URL = reverse("social_media:post-list")
+PROFILE_URL = reverse("social_media:profile-list")
+
+
+def sample_profile(email, username):
+    user = get_user_model().objects.create_user(email, "testpass")
+    return Profile.objects.create(user=user, username=username)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+
+        posts = [
+            Post.objects.create(author=self.profile, title=f"Post {index}")
+            for index in range(5)
+        ]
+        # Identical timestamps must not lose or repeat rows between pages.
+        Post.objects.update(created_at=posts[0].created_at)
+
+    def collect(self, url, params=None):
+        titles = []
+        res = self.client.get(url, params)
+
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            titles.extend(item["title"] for item in res.data["results"])
+            if not res.data["next"]:
+                return titles, res
+            res = self.client.get(res.data["next"])
+
+    def test_cursor_walks_every_post_once(self):
+        titles, _ = self.collect(POST_URL, {"page_size": 2})
+
+        self.assertEqual(titles, [f"Post {index}" for index in reversed(range(5))])
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(POST_URL, {"page_size": 2})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_invalid_cursor(self):
+        res = self.client.get(POST_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_limit_offset_compatibility_mode(self):
+        res = self.client.get(POST_URL, {"limit": 2, "offset": 1})
+
+        self.assertEqual(res.data["count"], 5)
+        self.assertEqual(
+            [item["title"] for item in res.data["results"]], ["Post 3", "Post 2"]
+        )
+
+    def test_liked_posts_are_paginated_most_recently_liked_first(self):
+        for post in Post.objects.order_by("-id"):
+            post.likes.add(self.profile)
+
+        titles, _ = self.collect(
+            reverse("social_media:post-liked-posts"), {"page_size": 3}
+        )
+
+        self.assertEqual(titles, [f"Post {index}" for index in range(5)])
+
+    def test_profiles_are_paginated_by_id(self):
+        for index in range(3):
+            sample_profile(f"user{index}@test.com", f"user_{index}")
+
+        res = self.client.get(PROFILE_URL, {"page_size": 2})
+
+        self.assertEqual(
+            [item["username"] for item in res.data["results"]],
+            ["test_user", "user_0"],
+        )
+        self.assertIsNotNone(res.data["next"])
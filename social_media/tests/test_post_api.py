@@ -1,21 +1,24 @@
 import tempfile
 import os
+from datetime import timedelta
 
 from PIL import Image
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from social_media.models import Profile, Post, Comment
+from social_media.models import LATEST_COMMENTS, Profile, Post, Comment
 from social_media.serializers import (
     ProfileSerializer,
     PostListSerializer,
     PostDetailSerializer,
     CommentSerializer,
 )
+from social_media.tasks import publish_scheduled_posts
 
 POST_URL = reverse("social_media:post-list")
 
@@ -73,11 +76,11 @@ class AuthenticatedPostApiTests(TestCase):
 
         res = self.client.get(POST_URL)
 
-        posts = Post.objects.order_by("id")
+        posts = Post.objects.order_by("-created_at", "-id")
         serializer = PostListSerializer(posts, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertAlmostEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_filter_posts_by_title(self):
         post1 = sample_post(author=self.profile, title="Post 1")
@@ -88,8 +91,8 @@ class AuthenticatedPostApiTests(TestCase):
         serializer1 = PostListSerializer(post1)
         serializer2 = PostListSerializer(post2)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     def test_filter_posts_by_author(self):
         other_user = get_user_model().objects.create_user("other@test.com", "testpass")
@@ -103,8 +106,8 @@ class AuthenticatedPostApiTests(TestCase):
         serializer1 = PostListSerializer(post1)
         serializer2 = PostListSerializer(post2)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     def test_comment_on_post(self):
         post = sample_post(author=self.profile)
@@ -120,17 +123,100 @@ class AuthenticatedPostApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual("{'detail': 'Comment added successfully.'}", str(res.data))
 
+    def test_post_detail_shows_latest_comments(self):
+        post = sample_post(author=self.profile)
+        for index in range(LATEST_COMMENTS + 2):
+            Comment.objects.create(
+                author=self.profile, post=post, content=f"Comment {index}"
+            )
+
+        res = self.client.get(reverse("social_media:post-detail", args=[post.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["comments_count"], LATEST_COMMENTS + 2)
+        self.assertEqual(
+            [comment["content"] for comment in res.data["comments"]],
+            [f"Comment {index}" for index in reversed(range(2, LATEST_COMMENTS + 2))],
+        )
+
+    def test_list_comments_newest_first(self):
+        post = sample_post(author=self.profile)
+        for index in range(3):
+            Comment.objects.create(
+                author=self.profile, post=post, content=f"Comment {index}"
+            )
+        url = reverse("social_media:post-comments", args=[post.id])
+
+        res = self.client.get(url, {"page_size": 2})
+        next_page = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            [comment["content"] for comment in res.data["results"]],
+            ["Comment 2", "Comment 1"],
+        )
+        self.assertEqual(
+            [comment["content"] for comment in next_page.data["results"]],
+            ["Comment 0"],
+        )
+
     def test_like_and_unlike_post(self):
         post = sample_post(author=self.profile)
         res = self.client.post(reverse("social_media:post-like-unlike", args=[post.id]))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual((res.data["liked"], res.data["likes"]), (True, 1))
         self.assertTrue(self.profile.posts_liked.filter(id=post.id).exists())
 
         res = self.client.post(reverse("social_media:post-like-unlike", args=[post.id]))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual((res.data["liked"], res.data["likes"]), (False, 0))
         self.assertFalse(self.profile.posts_liked.filter(id=post.id).exists())
 
 
+class ScheduledPostTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(user)
+        self.profile = sample_profile(user, username="test_user")
+        self.follower = sample_profile(
+            get_user_model().objects.create_user("other@test.com", "testpass")
+        )
+        self.follower.follow(self.profile)
+
+    def follower_feed(self):
+        client = APIClient()
+        client.force_authenticate(self.follower.user)
+        return [post["title"] for post in client.get(POST_URL).data["results"]]
+
+    def test_scheduled_post_is_published_when_due(self):
+        scheduled_time = timezone.now() + timedelta(hours=1)
+        res = self.client.post(
+            POST_URL,
+            {"title": "Later", "content": "Soon", "scheduled_time": scheduled_time},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["status"], Post.Status.SCHEDULED)
+        self.assertEqual(publish_scheduled_posts(), 0)
+        self.assertEqual(self.follower_feed(), [])
+
+        Post.objects.filter(id=res.data["id"]).update(
+            scheduled_time=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertEqual(publish_scheduled_posts(), 1)
+
+        post = Post.objects.get(id=res.data["id"])
+        self.assertEqual(post.status, Post.Status.PUBLISHED)
+        self.assertEqual(post.created_at, post.scheduled_time)
+        self.assertEqual(self.follower_feed(), ["Later"])
+
+    def test_post_without_schedule_is_published_immediately(self):
+        res = self.client.post(POST_URL, {"title": "Now", "content": "Here"})
+
+        self.assertEqual(res.data["status"], Post.Status.PUBLISHED)
+        self.assertEqual(self.follower_feed(), ["Now"])
+
+
 class PostImageUploadTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -4,7 +4,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from social_media.models import Profile, Post
+from social_media.models import FOLLOW_PREVIEW, Profile, Post
 from social_media.serializers import ProfileDetailSerializer
 
 PROFILE_URL = reverse("social_media:profile-list")
@@ -53,23 +53,146 @@ class AuthenticatedProfileApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_follow_unfollow(self):
+        self.profile = sample_profile(self.user, username="test_user")
+        other_user = get_user_model().objects.create_user("other@test.com", "testpass")
+        other_profile = sample_profile(other_user, username="other_user")
 
-def test_follow_unfollow(self):
-    other_user = get_user_model().objects.create_user("other@test.com", "testpass")
-    other_profile = sample_profile(other_user, username="other_user")
-
-    res = self.client.post(
-        reverse("social_media:profile-follow", args=[other_profile.id])
-    )
-    self.assertEqual(res.status_code, status.HTTP_200_OK)
-    self.assertTrue(
-        self.profile.following.filter(username=other_profile.username).exists()
-    )
-
-    res = self.client.post(
-        reverse("social_media:profile-unfollow", args=[other_profile.id])
-    )
-    self.assertEqual(res.status_code, status.HTTP_200_OK)
-    self.assertFalse(
-        self.profile.following.filter(username=other_profile.username).exists()
-    )
+        res = self.client.post(
+            reverse("social_media:profile-follow", args=[other_profile.id])
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual((res.data["followers"], res.data["following"]), (1, 1))
+        self.assertTrue(
+            self.profile.following.filter(username=other_profile.username).exists()
+        )
+
+        res = self.client.post(
+            reverse("social_media:profile-unfollow", args=[other_profile.id])
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual((res.data["followers"], res.data["following"]), (0, 0))
+        self.assertFalse(
+            self.profile.following.filter(username=other_profile.username).exists()
+        )
+
+        res = self.client.post(
+            reverse("social_media:profile-unfollow", args=[other_profile.id])
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RelationshipApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.profile = sample_profile(
+            get_user_model().objects.create_user("test@test.com", "testpass"),
+            username="test_user",
+        )
+        self.others = [
+            sample_profile(
+                get_user_model().objects.create_user(f"{name}@test.com", "testpass"),
+                username=name,
+            )
+            for name in ("followed", "follower", "mutual", "stranger")
+        ]
+        followed, follower, mutual, _ = self.others
+        self.profile.follow_many([followed.pk, mutual.pk])
+        follower.follow(self.profile)
+        mutual.follow(self.profile)
+        self.client.force_authenticate(self.profile.user)
+
+    def test_relationships_for_ids(self):
+        ids = [profile.pk for profile in self.others]
+        url = reverse("social_media:profile-relationships")
+
+        with self.assertNumQueries(2):
+            res = self.client.get(url, {"ids": ",".join(map(str, ids))})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["following"], row["followed_by"]) for row in res.data["results"]],
+            [(True, False), (False, True), (True, True), (False, False)],
+        )
+        self.assertEqual([row["id"] for row in res.data["results"]], ids)
+
+    def test_relationships_validate_ids(self):
+        url = reverse("social_media:profile-relationships")
+
+        for ids in ("", "1,abc", ",".join(map(str, range(1, 202)))):
+            res = self.client.get(url, {"ids": ids})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_flags_followed_profiles(self):
+        res = self.client.get(PROFILE_URL)
+
+        flags = {row["username"]: row["viewer_follows"] for row in res.data["results"]}
+        self.assertEqual(
+            flags,
+            {
+                "test_user": False,
+                "followed": True,
+                "follower": False,
+                "mutual": True,
+                "stranger": False,
+            },
+        )
+
+
+class FollowListApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.profile = sample_profile(
+            get_user_model().objects.create_user("test@test.com", "testpass"),
+            username="test_user",
+        )
+        self.followers = [
+            sample_profile(
+                get_user_model().objects.create_user(f"f{index}@test.com", "testpass"),
+                username=f"follower_{index}",
+            )
+            for index in range(8)
+        ]
+        for follower in self.followers:
+            follower.follow(self.profile)
+        self.profile.follow(self.followers[0])
+        self.client.force_authenticate(self.profile.user)
+
+    def test_detail_shows_counts_and_preview(self):
+        res = self.client.get(
+            reverse("social_media:profile-detail", args=[self.profile.id])
+        )
+
+        self.assertEqual((res.data["followers"], res.data["following"]), (8, 1))
+        self.assertEqual(
+            res.data["followers_preview"],
+            [f"follower_{index}" for index in range(FOLLOW_PREVIEW)],
+        )
+        self.assertEqual(res.data["following_preview"], ["follower_0"])
+
+    def test_followers_are_cursor_paginated(self):
+        url = reverse("social_media:profile-followers", args=[self.profile.id])
+        usernames = []
+
+        while url:
+            res = self.client.get(url, {"page_size": 3} if not usernames else None)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            usernames.extend(row["username"] for row in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(usernames, [f"follower_{index}" for index in range(8)])
+
+    def test_following_flags_viewer_follows(self):
+        res = self.client.get(
+            reverse("social_media:profile-following", args=[self.followers[1].id])
+        )
+
+        self.assertEqual(
+            [(row["username"], row["viewer_follows"]) for row in res.data["results"]],
+            [("test_user", False)],
+        )
+
+    def test_unknown_profile_is_not_found(self):
+        res = self.client.get(reverse("social_media:profile-followers", args=[999]))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,144 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media.management.commands.check_query_plans import full_scans, sorts
+from social_media.models import Comment, Profile, Post
+
+DATASET_SIZES = (1, 5, 20)
+
+
+def sample_profile(email, username):
+    user = get_user_model().objects.create_user(email)
+    return Profile.objects.create(user=user, username=username)
+
+
+@override_settings(SOCIAL_MEDIA_CACHE={"ENABLED": False})
+class ConstantQueryCountTests(TestCase):
+    """Every read endpoint must cost the same number of queries at any size."""
+
+    def setUp(self):
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+        self.created = 0
+
+    def grow(self, size):
+        while self.created < size:
+            other = sample_profile(
+                f"user{self.created}@test.com", f"user_{self.created}"
+            )
+            self.profile.follow(other)
+            other.follow(self.profile)
+            post = Post.objects.create(author=other, title=f"Post {self.created}")
+            post.like(self.profile)
+            Comment.objects.create(author=other, post=post, content="Comment")
+            self.created += 1
+
+    def assertConstantQueries(self, num, url_factory):
+        for size in DATASET_SIZES:
+            self.grow(size)
+            url = url_factory()
+            with self.subTest(size=size), self.assertNumQueries(num):
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_post_list(self):
+        self.assertConstantQueries(2, lambda: reverse("social_media:post-list"))
+
+    def test_post_list_filtered(self):
+        self.assertConstantQueries(
+            1, lambda: reverse("social_media:post-list") + "?title=Post"
+        )
+
+    def test_liked_posts(self):
+        self.assertConstantQueries(1, lambda: reverse("social_media:post-liked-posts"))
+
+    def test_post_detail(self):
+        post = Post.objects.create(author=self.profile, title="Own")
+
+        def url():
+            Comment.objects.create(author=self.profile, post=post, content="Again")
+            return reverse("social_media:post-detail", args=[post.id])
+
+        self.assertConstantQueries(2, url)
+
+    def test_profile_list(self):
+        # The page, then the viewer_follows lookup for all of its rows.
+        self.assertConstantQueries(2, lambda: reverse("social_media:profile-list"))
+
+    def test_profile_detail(self):
+        self.assertConstantQueries(
+            3,
+            lambda: reverse("social_media:profile-detail", args=[self.profile.id]),
+        )
+
+
+class QueryPlanTests(TestCase):
+    def test_main_queries_use_indexes(self):
+        out = StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertIn("Every query uses an index.", out.getvalue())
+
+
+class FullScanDetectionTests(SimpleTestCase):
+    def test_sqlite(self):
+        plan = (
+            "2 0 0 SCAN social_media_post\n"
+            "5 0 0 SCAN social_media_post USING INDEX post_created_id\n"
+            "6 0 0 SCAN social_media_like USING COVERING INDEX like_profile_post\n"
+            "7 0 0 SEARCH social_media_comment USING INDEX x (post_id=?)\n"
+            "9 0 0 SCAN CONSTANT ROW"
+        )
+        self.assertEqual(
+            full_scans(plan, "sqlite"),
+            [
+                "2 0 0 SCAN social_media_post",
+                "5 0 0 SCAN social_media_post USING INDEX post_created_id",
+                "6 0 0 SCAN social_media_like USING COVERING INDEX like_profile_post",
+            ],
+        )
+
+    def test_postgresql(self):
+        plan = (
+            "Limit  (cost=0.15..8.17 rows=1 width=8)\n"
+            "  ->  Seq Scan on social_media_post  (cost=0.00..1.01 rows=1 width=8)\n"
+            "  ->  Index Scan using post_created_id on social_media_post\n"
+            "        Index Cond: (created_at < now())\n"
+            "  ->  Index Only Scan using like_profile_post on social_media_like\n"
+            "        Filter: (post_id = 1)"
+        )
+        self.assertEqual(
+            full_scans(plan, "postgresql"),
+            [
+                "->  Seq Scan on social_media_post  (cost=0.00..1.01 rows=1 width=8)",
+                "->  Index Only Scan using like_profile_post on social_media_like",
+            ],
+        )
+
+
+class SortDetectionTests(SimpleTestCase):
+    def test_sqlite(self):
+        plan = (
+            "5 0 0 SEARCH social_media_post USING INDEX x (author_id=?)\n"
+            "51 0 0 USE TEMP B-TREE FOR ORDER BY\n"
+            "52 0 0 USE TEMP B-TREE FOR RIGHT PART OF ORDER BY\n"
+            "53 0 0 USE TEMP B-TREE FOR DISTINCT"
+        )
+        self.assertEqual(len(sorts(plan, "sqlite")), 2)
+
+    def test_postgresql(self):
+        plan = (
+            "Limit  (cost=8.17..8.18 rows=1 width=8)\n"
+            "  ->  Sort  (cost=8.17..8.18 rows=1 width=8)\n"
+            "        Sort Key: created_at DESC, id DESC\n"
+            "        ->  Index Scan using x on social_media_post"
+        )
+        self.assertEqual(
+            sorts(plan, "postgresql"), ["->  Sort  (cost=8.17..8.18 rows=1 width=8)"]
+        )
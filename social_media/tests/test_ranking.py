@@ -0,0 +1,134 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from social_media import ranking
+from social_media.models import Comment, Profile, Post
+from social_media.tasks import refresh_post_scores
+
+POST_URL = reverse("social_media:post-list")
+
+
+def sample_profile(email, username):
+    user = get_user_model().objects.create_user(email, "testpass")
+    return Profile.objects.create(user=user, username=username)
+
+
+def sample_post(author, **params):
+    defaults = {"title": "Sample post", "content": "Sample content"}
+    defaults.update(params)
+
+    return Post.objects.create(author=author, **defaults)
+
+
+class RankingTests(TestCase):
+    def setUp(self):
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.author = sample_profile("author@test.com", "author")
+        self.profile.follow(self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+
+    def score(self, post):
+        post.refresh_from_db(fields=["score"])
+        return post.score
+
+    def top_titles(self, **params):
+        res = self.client.get(POST_URL, {"ordering": "top", **params})
+        return [post["title"] for post in res.data["results"]]
+
+    def test_likes_and_comments_update_score(self):
+        post = sample_post(self.author)
+        self.assertEqual(self.score(post), 1)
+
+        post.like(self.profile)
+        self.assertEqual(self.score(post), 2)
+
+        comment = Comment.objects.create(author=self.profile, post=post, content="Hi")
+        self.assertEqual(self.score(post), 4)
+
+        comment.delete()
+        post.likes.remove(self.profile)
+        self.assertEqual(self.score(post), 1)
+
+    def test_refresh_decays_older_posts(self):
+        fresh = sample_post(self.author, title="Fresh")
+        old = sample_post(self.author, title="Old")
+        old.like(self.profile)
+        Post.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(hours=24)
+        )
+
+        self.assertEqual(refresh_post_scores(), 2)
+
+        old.refresh_from_db()
+        self.assertAlmostEqual(old.decay, 13 ** -ranking.get_config()["GRAVITY"], 5)
+        self.assertAlmostEqual(old.score, 2 * old.decay)
+        self.assertAlmostEqual(self.score(fresh), 1, places=3)
+
+    def test_refresh_skips_posts_past_max_age(self):
+        post = sample_post(self.author)
+        Post.objects.filter(pk=post.pk).update(
+            created_at=timezone.now() - timedelta(days=8)
+        )
+
+        self.assertEqual(refresh_post_scores(), 0)
+        self.assertEqual(self.score(post), 1)
+
+    def test_migration_scores_existing_old_posts(self):
+        old = sample_post(self.author, title="Old")
+        Post.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=30), decay=1.0, score=1.0
+        )
+        sample_post(self.author, title="Fresh").like(self.profile)
+        Post.objects.filter(title="Fresh").update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+
+        import_module("social_media.migrations.0020_post_score").populate_scores(
+            apps, None
+        )
+
+        old.refresh_from_db()
+        self.assertAlmostEqual(old.decay, ranking.decay(old.created_at, timezone.now()))
+        self.assertAlmostEqual(old.score, old.decay)
+        self.assertEqual(self.top_titles(), ["Fresh", "Old"])
+
+    def test_top_ordering_ranks_by_score(self):
+        stranger = sample_profile("stranger@test.com", "stranger")
+        sample_post(self.author, title="Quiet")
+        liked = sample_post(self.author, title="Liked")
+        sample_post(stranger, title="Stranger").like(self.profile)
+        liked.like(stranger)
+        liked.like(self.profile)
+        sample_post(self.author, title="Newest")
+
+        self.assertEqual(self.top_titles(), ["Liked", "Newest", "Quiet"])
+
+    def test_top_ordering_pages_by_score_and_id(self):
+        posts = [sample_post(self.author, title=str(index)) for index in range(5)]
+        posts[1].like(self.profile)
+        posts[3].like(self.profile)
+
+        titles, url = [], POST_URL + "?ordering=top&page_size=2"
+        while url:
+            res = self.client.get(url)
+            titles.extend(post["title"] for post in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(titles, ["3", "1", "4", "2", "0"])
+
+    def test_invalid_cursor_for_ordering_is_rejected(self):
+        sample_post(self.author)
+        sample_post(self.author)
+        res = self.client.get(POST_URL, {"page_size": 1})
+
+        res = self.client.get(res.data["next"] + "&ordering=top")
+
+        self.assertEqual(res.status_code, 404)
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+
+from social_media.middleware import ReplicaRoutingMiddleware
+from social_media.models import Post
+from social_media.replicas import ReplicaRouter
+
+
+def sample_user(pk):
+    return SimpleNamespace(pk=pk, is_authenticated=True)
+
+
+@override_settings(SOCIAL_MEDIA_REPLICAS={"ALIASES": ["replica"], "PIN_SECONDS": 5})
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def request(self, method, user=None, write=False):
+        """Run a request through the middleware, return where it read from."""
+        request = getattr(self.factory, method)("/")
+        request.user = user or AnonymousUser()
+        used = []
+
+        def view(request):
+            used.append(self.router.db_for_read(Post))
+            if write:
+                self.router.db_for_write(Post)
+                used.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(request)
+        return used
+
+    def test_reads_of_safe_requests_go_to_replicas(self):
+        self.assertEqual(self.request("get"), ["replica"])
+        self.assertEqual(self.request("get", sample_user(1)), ["replica"])
+
+    def test_unsafe_requests_read_from_primary(self):
+        self.assertEqual(self.request("post", sample_user(1)), ["default"])
+
+    def test_writer_is_pinned_to_primary(self):
+        writer, other = sample_user(1), sample_user(2)
+
+        self.assertEqual(self.request("post", writer, write=True), ["default"] * 2)
+        self.assertEqual(self.request("get", writer), ["default"])
+        self.assertEqual(self.request("get", other), ["replica"])
+
+        cache.clear()
+        self.assertEqual(self.request("get", writer), ["replica"])
+
+    def test_reads_after_a_write_in_the_same_request_use_primary(self):
+        self.assertEqual(
+            self.request("get", sample_user(1), write=True), ["replica", "default"]
+        )
+
+    def test_outside_requests_everything_uses_primary(self):
+        self.assertEqual(self.router.db_for_read(Post), "default")
+        self.assertEqual(self.router.db_for_write(Post), "default")
+
+    def test_migrations_only_run_on_primary(self):
+        self.assertTrue(self.router.allow_migrate("default", "social_media"))
+        self.assertFalse(self.router.allow_migrate("replica", "social_media"))
+
+    @override_settings(SOCIAL_MEDIA_REPLICAS={"ALIASES": []})
+    def test_without_replicas_everything_uses_primary(self):
+        self.assertEqual(self.request("get"), ["default"])
+
+
+class SessionRequestTests(TransactionTestCase):
+    # Not TestCase: its transaction would keep every read on the primary.
+    # The test database stands in for a replica, which only has to exist.
+    @override_settings(SOCIAL_MEDIA_REPLICAS={"ALIASES": ["default"]})
+    def test_session_authenticated_request_through_middleware(self):
+        user = get_user_model().objects.create_superuser("admin@test.com", "pass")
+        self.client.force_login(user)
+
+        res = self.client.get("/admin/")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.context["user"], user)
+
+    @override_settings(SOCIAL_MEDIA_REPLICAS={"ALIASES": ["replica"]})
+    def test_sessions_and_users_are_read_from_primary(self):
+        router = ReplicaRouter()
+        used = []
+
+        def view(request):
+            for model in (Session, get_user_model(), Post):
+                used.append(router.db_for_read(model))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(RequestFactory().get("/"))
+
+        self.assertEqual(used, ["default", "default", "replica"])
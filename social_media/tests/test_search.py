@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from social_media.models import Profile, Post
+
+POST_URL = reverse("social_media:post-list")
+POST_SEARCH_URL = reverse("social_media:post-search")
+PROFILE_URL = reverse("social_media:profile-list")
+PROFILE_SEARCH_URL = reverse("social_media:profile-search")
+
+
+def sample_profile(email, username):
+    user = get_user_model().objects.create_user(email)
+    return Profile.objects.create(user=user, username=username)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+
+    def titles(self, res):
+        return [post["title"] for post in res.data["results"]]
+
+    def test_title_filter_matches_substrings(self):
+        Post.objects.create(author=self.profile, title="Gardening tips")
+        Post.objects.create(author=self.profile, title="Cooking")
+
+        res = self.client.get(POST_URL, {"title": "ARDEN"})
+
+        self.assertEqual(self.titles(res), ["Gardening tips"])
+
+    def test_short_queries_fall_back_to_contains(self):
+        Post.objects.create(author=self.profile, title="Go")
+        Post.objects.create(author=self.profile, title="Stop")
+
+        res = self.client.get(POST_URL, {"title": "go"})
+
+        self.assertEqual(self.titles(res), ["Go"])
+
+    def test_index_follows_updates_and_deletes(self):
+        post = Post.objects.create(author=self.profile, title="Before")
+        post.title = "After"
+        post.save()
+
+        self.assertEqual(
+            self.titles(self.client.get(POST_URL, {"title": "Before"})), []
+        )
+        self.assertEqual(
+            self.titles(self.client.get(POST_URL, {"title": "After"})), ["After"]
+        )
+
+        post.delete()
+        self.assertEqual(self.titles(self.client.get(POST_URL, {"title": "After"})), [])
+
+    def test_search_ranks_posts_by_relevance(self):
+        Post.objects.create(
+            author=self.profile, title="Other", content="mention of django once"
+        )
+        Post.objects.create(
+            author=self.profile, title="Django", content="django django django"
+        )
+        Post.objects.create(author=self.profile, title="Nothing", content="here")
+
+        res = self.client.get(POST_SEARCH_URL, {"q": "django"})
+
+        self.assertEqual(self.titles(res), ["Django", "Other"])
+        self.assertEqual(res.data["count"], 2)
+
+    def test_search_only_returns_visible_posts(self):
+        stranger = sample_profile("stranger@test.com", "stranger")
+        Post.objects.create(author=stranger, title="Hidden django")
+
+        res = self.client.get(POST_SEARCH_URL, {"q": "django"})
+
+        self.assertEqual(self.titles(res), [])
+
+    def test_profile_search_and_filter(self):
+        sample_profile("alice@test.com", "alice_wonder")
+        sample_profile("bob@test.com", "bob")
+
+        res = self.client.get(PROFILE_SEARCH_URL, {"q": "wonder"})
+        self.assertEqual(
+            [profile["username"] for profile in res.data["results"]],
+            ["alice_wonder"],
+        )
+
+        res = self.client.get(PROFILE_URL, {"username": "BOB"})
+        self.assertEqual(
+            [profile["username"] for profile in res.data["results"]], ["bob"]
+        )
+
+    @override_settings(
+        SOCIAL_MEDIA_SEARCH_BACKEND="social_media.search.ContainsSearchBackend"
+    )
+    def test_contains_backend(self):
+        Post.objects.create(author=self.profile, title="Gardening tips")
+
+        res = self.client.get(POST_SEARCH_URL, {"q": "garden"})
+
+        self.assertEqual(self.titles(res), ["Gardening tips"])
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from social_media import suggestions
+from social_media.models import FollowSuggestion, Profile
+from social_media.tasks import rebuild_follow_suggestions
+
+SUGGESTIONS_URL = reverse("social_media:profile-suggestions")
+
+
+def sample_profile(username):
+    user = get_user_model().objects.create_user(f"{username}@test.com", "testpass")
+    return Profile.objects.create(user=user, username=username)
+
+
+class FollowSuggestionTests(TestCase):
+    def setUp(self):
+        self.profile, self.alice, self.bob, self.carol, self.dave = (
+            sample_profile(name)
+            for name in ("test_user", "alice", "bob", "carol", "dave")
+        )
+        self.profile.follow_many([self.alice.pk, self.bob.pk])
+        self.alice.follow_many([self.carol.pk, self.dave.pk, self.profile.pk])
+        self.bob.follow_many([self.carol.pk, self.alice.pk])
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+
+    def suggested(self):
+        res = self.client.get(SUGGESTIONS_URL)
+        return [
+            (item["username"], item["mutual_count"]) for item in res.data["results"]
+        ]
+
+    def test_graph_is_loaded_in_one_query(self):
+        with self.assertNumQueries(1):
+            graph = suggestions.FollowGraph.load()
+
+        self.assertEqual(
+            sorted(graph.following(self.profile.pk)), [self.alice.pk, self.bob.pk]
+        )
+        self.assertEqual(len(graph.following(self.carol.pk)), 0)
+
+    def test_friends_of_friends_ranked_by_mutual_follows(self):
+        graph = suggestions.FollowGraph.load()
+
+        self.assertEqual(
+            graph.suggest(self.profile.pk, 10), [(self.carol.pk, 2), (self.dave.pk, 1)]
+        )
+        self.assertEqual(graph.suggest(self.profile.pk, 1), [(self.carol.pk, 2)])
+
+    def test_rebuild_replaces_stored_suggestions(self):
+        FollowSuggestion.objects.create(
+            profile=self.carol, suggested=self.dave, mutual_count=5
+        )
+
+        self.assertEqual(rebuild_follow_suggestions(), 5)
+
+        self.assertFalse(FollowSuggestion.objects.filter(profile=self.carol).exists())
+        self.assertEqual(self.suggested(), [("carol", 2), ("dave", 1)])
+
+    @override_settings(SOCIAL_MEDIA_SUGGESTIONS={"TOP_K": 1, "BATCH_SIZE": 2})
+    def test_rebuild_keeps_top_k_in_batches(self):
+        suggestions.rebuild()
+
+        self.assertEqual(self.suggested(), [("carol", 2)])
+        self.assertEqual(FollowSuggestion.objects.filter(profile=self.bob).count(), 1)
+
+    def test_followed_suggestions_are_hidden(self):
+        suggestions.rebuild()
+        self.profile.follow(self.carol)
+
+        self.assertEqual(self.suggested(), [("dave", 1)])
+
+    def test_suggestions_require_authentication(self):
+        res = APIClient().get(SUGGESTIONS_URL)
+
+        self.assertEqual(res.status_code, 401)
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media.models import Post, Profile
+from social_media.throttling import LocalRateLimitBackend, RedisRateLimitBackend
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def test_previous_window_fades_out(self):
+        backend = LocalRateLimitBackend()
+
+        for now in (0, 10, 20):
+            self.assertEqual(backend.hit("key", 3, 60, now=now), (True, None))
+        self.assertEqual(backend.hit("key", 3, 60, now=30), (False, 30))
+
+        # Halfway through the next window the previous one counts 1.5.
+        self.assertEqual(backend.hit("key", 3, 60, now=90), (True, None))
+        self.assertEqual(backend.hit("key", 3, 60, now=90), (True, None))
+        allowed, wait = backend.hit("key", 3, 60, now=90)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 10)
+
+        self.assertEqual(backend.hit("key", 3, 60, now=200), (True, None))
+
+    def test_keys_are_independent(self):
+        backend = LocalRateLimitBackend()
+
+        self.assertTrue(backend.hit("first", 1, 60, now=0)[0])
+        self.assertFalse(backend.hit("first", 1, 60, now=1)[0])
+        self.assertTrue(backend.hit("second", 1, 60, now=1)[0])
+
+    def test_unreachable_redis_falls_back_to_local_counters(self):
+        backend = RedisRateLimitBackend(location="redis://localhost:1/0")
+
+        self.assertTrue(backend.hit("key", 1, 60, now=0)[0])
+        self.assertFalse(backend.hit("key", 1, 60, now=1)[0])
+
+
+@override_settings(
+    SOCIAL_MEDIA_THROTTLE={},
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"user": "100/hour", "likes": "2/hour"},
+    },
+)
+class ActionThrottleTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("test@test.com", "testpass")
+        profile = Profile.objects.create(user=user, username="test_user")
+        self.post = Post.objects.create(author=profile, title="Post")
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_writes_have_their_own_scope(self):
+        url = reverse("social_media:post-like-unlike", args=[self.post.id])
+
+        for _ in range(2):
+            self.assertEqual(self.client.post(url).status_code, status.HTTP_200_OK)
+        res = self.client.post(url)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res.headers)
+        res = self.client.get(reverse("social_media:post-list"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from social_media import timeline
+from social_media.models import Profile, Post, TimelineEntry
+
+POST_URL = reverse("social_media:post-list")
+
+
+def sample_profile(email, username):
+    user = get_user_model().objects.create_user(email, "testpass")
+    return Profile.objects.create(user=user, username=username)
+
+
+def sample_post(author, **params):
+    defaults = {"title": "Sample post", "content": "Sample content"}
+    defaults.update(params)
+
+    return Post.objects.create(author=author, **defaults)
+
+
+class TimelineTests(TestCase):
+    def setUp(self):
+        self.profile = sample_profile("test@test.com", "test_user")
+        self.author = sample_profile("author@test.com", "author")
+        self.client = APIClient()
+        self.client.force_authenticate(self.profile.user)
+
+    def feed_titles(self):
+        res = self.client.get(POST_URL)
+        return [post["title"] for post in res.data["results"]]
+
+    def test_new_post_is_pushed_to_followers(self):
+        self.profile.follow(self.author)
+        post = sample_post(self.author)
+
+        self.assertTrue(
+            TimelineEntry.objects.filter(profile=self.profile, post=post).exists()
+        )
+        self.assertTrue(
+            TimelineEntry.objects.filter(profile=self.author, post=post).exists()
+        )
+
+    def test_feed_reads_from_timeline(self):
+        stranger = sample_profile("stranger@test.com", "stranger")
+        self.profile.follow(self.author)
+        sample_post(self.author, title="Followed")
+        sample_post(self.profile, title="Own")
+        sample_post(stranger, title="Stranger")
+
+        self.assertEqual(self.feed_titles(), ["Own", "Followed"])
+
+    def test_follow_backfills_and_unfollow_purges(self):
+        sample_post(self.author, title="Earlier")
+
+        self.profile.follow(self.author)
+        self.assertEqual(self.feed_titles(), ["Earlier"])
+
+        self.profile.unfollow(self.author)
+        self.assertEqual(self.feed_titles(), [])
+
+    @override_settings(SOCIAL_MEDIA_TIMELINE={"FANOUT_THRESHOLD": 0})
+    def test_heavy_author_is_merged_at_read_time(self):
+        self.profile.follow(self.author)
+        TimelineEntry.objects.all().delete()
+        post = sample_post(self.author, title="Heavy")
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(profile=self.profile, post=post).exists()
+        )
+        self.assertEqual(self.feed_titles(), ["Heavy"])
+
+    @override_settings(SOCIAL_MEDIA_TIMELINE={"FANOUT_THRESHOLD": 0, "MAX_LENGTH": 2})
+    def test_heavy_author_is_capped_like_the_timeline(self):
+        self.profile.follow(self.author)
+        for index in range(3):
+            sample_post(self.author, title=f"Post {index}")
+
+        self.assertEqual(self.feed_titles(), ["Post 2", "Post 1"])
+
+    @override_settings(SOCIAL_MEDIA_TIMELINE={"MAX_LENGTH": 2})
+    def test_trim_bounds_timeline_length(self):
+        self.profile.follow(self.author)
+        for index in range(4):
+            sample_post(self.author, title=f"Post {index}")
+
+        timeline.get_backend().trim()
+
+        self.assertEqual(
+            list(
+                TimelineEntry.objects.filter(profile=self.profile)
+                .order_by("-created_at")
+                .values_list("post__title", flat=True)
+            ),
+            ["Post 3", "Post 2"],
+        )
@@ -0,0 +1,113 @@
+import io
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media.models import ImageUpload, Post, Profile
+
+MEDIA_ROOT = tempfile.mkdtemp()
+UPLOADS_URL = reverse("social_media:upload-list")
+
+
+def jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 200), "blue").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def upload_url(upload_id, offset=None):
+    url = reverse("social_media:upload-detail", args=[upload_id])
+    return url if offset is None else f"{url}?offset={offset}"
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ChunkedUploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.profile = Profile.objects.create(user=user, username="test_user")
+        self.post = Post.objects.create(author=self.profile, title="Post")
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.data = jpeg_bytes()
+
+    def start(self, **params):
+        payload = {
+            "target": "post",
+            "target_id": self.post.id,
+            "filename": "photo.jpg",
+            "content_type": "image/jpeg",
+            "size": len(self.data),
+            **params,
+        }
+        return self.client.post(UPLOADS_URL, payload)
+
+    def put_chunk(self, upload_id, offset, chunk):
+        return self.client.put(
+            upload_url(upload_id, offset),
+            chunk,
+            content_type="application/octet-stream",
+        )
+
+    def test_upload_in_chunks_and_finalize(self):
+        edited_at = self.post.updated_at
+        upload_id = self.start().data["id"]
+        middle = len(self.data) // 2
+
+        res = self.put_chunk(upload_id, 0, self.data[:middle])
+        self.assertEqual(res.data["offset"], middle)
+
+        res = self.put_chunk(upload_id, 0, self.data[:middle])
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["offset"], middle)
+
+        self.put_chunk(upload_id, middle, self.data[middle:])
+        res = self.client.post(upload_url(upload_id) + "finalize/")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], ImageUpload.Status.COMPLETE)
+        self.post.refresh_from_db()
+        self.assertGreater(self.post.updated_at, edited_at)
+        with open(self.post.image.path, "rb") as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertFalse(
+            os.listdir(os.path.join(MEDIA_ROOT, "uploads", "chunks", upload_id))
+        )
+
+    def test_first_chunk_must_match_content_type(self):
+        upload_id = self.start(content_type="image/png").data["id"]
+
+        res = self.put_chunk(upload_id, 0, self.data)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ImageUpload.objects.get(id=upload_id).offset, 0)
+
+    def test_size_and_target_are_checked_on_create(self):
+        other_user = get_user_model().objects.create_user("other@test.com", "pass")
+        other = Profile.objects.create(user=other_user, username="other_user")
+
+        with override_settings(SOCIAL_MEDIA_UPLOADS={"MAX_SIZE": 10}):
+            self.assertEqual(self.start().status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.start(target="profile", target_id=other.id)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("target_id", res.data)
+
+    def test_finalize_requires_every_byte(self):
+        upload_id = self.start().data["id"]
+        self.put_chunk(upload_id, 0, self.data[:10])
+
+        res = self.client.post(upload_url(upload_id) + "finalize/")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,210 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+DEFAULTS = {
+    "BACKEND": "social_media.throttling.LocalRateLimitBackend",
+    "OPTIONS": {},
+}
+
+_backend = None
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_THROTTLE", {})}
+
+
+def get_backend():
+    global _backend
+
+    if _backend is None:
+        config = get_config()
+        _backend = import_string(config["BACKEND"])(**config["OPTIONS"])
+
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+
+    if setting == "SOCIAL_MEDIA_THROTTLE":
+        _backend = None
+
+
+def sliding_window(previous, current, elapsed, duration, limit):
+    """
+    Decide a request against a sliding window approximated by two fixed
+    windows: the previous one counts in proportion to how much of it still
+    overlaps the last ``duration`` seconds.
+
+    Return whether the request is allowed and, if not, the seconds to wait.
+    """
+    weight = 1 - elapsed / duration
+
+    if previous * weight + current < limit:
+        return True, None
+    if current >= limit or not previous:
+        return False, duration - elapsed
+
+    # The previous window fades out linearly until the total drops below.
+    return False, max(0.0, (1 - (limit - current) / previous) * duration - elapsed)
+
+
+class LocalRateLimitBackend:
+    """Counters kept in this process, for setups without a shared Redis."""
+
+    def __init__(self, max_keys=10_000):
+        self.max_keys = max_keys
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def hit(self, key, limit, duration, now=None):
+        now = time.time() if now is None else now
+        window, elapsed = divmod(now, duration)
+
+        with self.lock:
+            start, current, previous, _ = self.windows.get(key, (window, 0, 0, 0))
+            if start != window:
+                previous = current if start == window - 1 else 0
+                current = 0
+
+            allowed, wait = sliding_window(previous, current, elapsed, duration, limit)
+            if allowed:
+                current += 1
+            self.windows[key] = (window, current, previous, (window + 2) * duration)
+
+            if len(self.windows) > self.max_keys:
+                self.windows = {
+                    key: counters
+                    for key, counters in self.windows.items()
+                    if counters[3] > now
+                }
+
+        return allowed, wait
+
+
+class RedisRateLimitBackend:
+    """
+    Counters shared by every process in Redis, checked and incremented by a
+    single script call, i.e. one atomic round trip per request.
+
+    If Redis cannot be reached, requests are counted locally instead.
+    """
+
+    script = """
+    local current = tonumber(redis.call("GET", KEYS[1]) or "0")
+    local previous = tonumber(redis.call("GET", KEYS[2]) or "0")
+    if previous * tonumber(ARGV[1]) + current < tonumber(ARGV[2]) then
+        current = redis.call("INCR", KEYS[1])
+        redis.call("EXPIRE", KEYS[1], ARGV[3])
+        return {1, current, previous}
+    end
+    return {0, current, previous}
+    """
+
+    def __init__(self, location="redis://localhost:6379/2", key_prefix="throttle"):
+        import redis
+
+        self.client = redis.Redis.from_url(location)
+        self.check = self.client.register_script(self.script)
+        self.errors = redis.RedisError
+        self.key_prefix = key_prefix
+        self.fallback = LocalRateLimitBackend()
+
+    def hit(self, key, limit, duration, now=None):
+        now = time.time() if now is None else now
+        window, elapsed = divmod(now, duration)
+        keys = [
+            f"{self.key_prefix}:{key}:{int(window)}",
+            f"{self.key_prefix}:{key}:{int(window) - 1}",
+        ]
+
+        try:
+            allowed, current, previous = self.check(
+                keys=keys, args=[1 - elapsed / duration, limit, 2 * duration]
+            )
+        except self.errors:
+            return self.fallback.hit(key, limit, duration, now)
+
+        if allowed:
+            return True, None
+        return sliding_window(previous, current, elapsed, duration, limit)
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    ``SimpleRateThrottle`` with O(1) counters from the configured backend
+    instead of a cached list of request timestamps. Rates are read from the
+    settings on every request.
+    """
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self.wait_seconds = get_backend().hit(
+            self.key, self.num_requests, self.duration
+        )
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonRateThrottle(SlidingWindowRateThrottle):
+    scope = "anon"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class UserRateThrottle(SlidingWindowRateThrottle):
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class ActionRateThrottle(UserRateThrottle):
+    """
+    Limit actions listed in the view's ``throttle_scopes`` under their own
+    scope, so writes such as likes or follows have budgets apart from reads.
+    """
+
+    def __init__(self):
+        pass
+
+    def allow_request(self, request, view):
+        scopes = getattr(view, "throttle_scopes", {})
+        self.scope = scopes.get(getattr(view, "action", None))
+        if self.scope is None:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
@@ -0,0 +1,264 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models import Count, Q
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Post, Profile, TimelineEntry
+
+DEFAULTS = {
+    "BACKEND": "social_media.timeline.DatabaseTimelineBackend",
+    "OPTIONS": {},
+    "MAX_LENGTH": 800,
+    "FANOUT_THRESHOLD": 1000,
+}
+
+_backend = None
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_TIMELINE", {})}
+
+
+def get_backend():
+    global _backend
+
+    if _backend is None:
+        config = get_config()
+        backend_class = import_string(config["BACKEND"])
+        _backend = backend_class(max_length=config["MAX_LENGTH"], **config["OPTIONS"])
+
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+
+    if setting == "SOCIAL_MEDIA_TIMELINE":
+        _backend = None
+
+
+class BaseTimelineBackend:
+    """Bounded, newest-first list of post ids per profile."""
+
+    def __init__(self, max_length):
+        self.max_length = max_length
+
+    def push(self, post, profile_ids):
+        raise NotImplementedError
+
+    def remove(self, post):
+        raise NotImplementedError
+
+    def backfill(self, profile_id, author_ids):
+        raise NotImplementedError
+
+    def purge(self, profile_id, author_ids):
+        raise NotImplementedError
+
+    def post_ids(self, profile_id):
+        raise NotImplementedError
+
+    def trim(self):
+        pass
+
+    def recent_posts(self, author_ids):
+        return (
+            Post.objects.published()
+            .filter(author_id__in=author_ids)
+            .order_by("-created_at")
+            .values_list("id", "created_at")[: self.max_length]
+        )
+
+
+class DatabaseTimelineBackend(BaseTimelineBackend):
+    def push(self, post, profile_ids):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    profile_id=profile_id, post_id=post.id, created_at=post.created_at
+                )
+                for profile_id in profile_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+    def remove(self, post):
+        # Rows go away with the post through the foreign key cascade.
+        pass
+
+    def backfill(self, profile_id, author_ids):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    profile_id=profile_id, post_id=post_id, created_at=created_at
+                )
+                for post_id, created_at in self.recent_posts(author_ids)
+            ],
+            ignore_conflicts=True,
+        )
+
+    def purge(self, profile_id, author_ids):
+        TimelineEntry.objects.filter(
+            profile_id=profile_id, post__author_id__in=author_ids
+        ).delete()
+
+    def post_ids(self, profile_id):
+        return (
+            TimelineEntry.objects.filter(profile_id=profile_id)
+            .order_by("-created_at")
+            .values_list("post_id", flat=True)[: self.max_length]
+        )
+
+    def trim(self):
+        for profile_id in (
+            TimelineEntry.objects.values("profile_id")
+            .annotate(total=Count("id"))
+            .filter(total__gt=self.max_length)
+            .values_list("profile_id", flat=True)
+        ):
+            overflow = TimelineEntry.objects.filter(profile_id=profile_id).order_by(
+                "-created_at"
+            )[self.max_length:]
+            TimelineEntry.objects.filter(
+                id__in=list(overflow.values_list("id", flat=True))
+            ).delete()
+
+
+class RedisTimelineBackend(BaseTimelineBackend):
+    """Keeps each timeline as a sorted set scored by the post timestamp."""
+
+    def __init__(
+        self, max_length, location="redis://localhost:6379/1", key_prefix="timeline"
+    ):
+        import redis
+
+        super().__init__(max_length)
+        self.client = redis.Redis.from_url(location)
+        self.key_prefix = key_prefix
+
+    def make_key(self, profile_id):
+        return f"{self.key_prefix}:{profile_id}"
+
+    def _add(self, pipeline, profile_id, scores):
+        key = self.make_key(profile_id)
+        pipeline.zadd(key, scores)
+        pipeline.zremrangebyrank(key, 0, -self.max_length - 1)
+
+    def push(self, post, profile_ids):
+        pipeline = self.client.pipeline(transaction=False)
+        for profile_id in profile_ids:
+            self._add(pipeline, profile_id, {post.id: post.created_at.timestamp()})
+        pipeline.execute()
+
+    def remove(self, post):
+        profile_ids = [post.author_id]
+        profile_ids.extend(
+            Profile.objects.filter(following=post.author_id).values_list(
+                "id", flat=True
+            )
+        )
+        pipeline = self.client.pipeline(transaction=False)
+        for profile_id in profile_ids:
+            pipeline.zrem(self.make_key(profile_id), post.id)
+        pipeline.execute()
+
+    def backfill(self, profile_id, author_ids):
+        scores = {
+            post_id: created_at.timestamp()
+            for post_id, created_at in self.recent_posts(author_ids)
+        }
+        if scores:
+            pipeline = self.client.pipeline()
+            self._add(pipeline, profile_id, scores)
+            pipeline.execute()
+
+    def purge(self, profile_id, author_ids):
+        stale = list(
+            Post.objects.filter(
+                id__in=self.post_ids(profile_id), author_id__in=author_ids
+            ).values_list("id", flat=True)
+        )
+        if stale:
+            self.client.zrem(self.make_key(profile_id), *stale)
+
+    def post_ids(self, profile_id):
+        return [
+            int(post_id)
+            for post_id in self.client.zrevrange(
+                self.make_key(profile_id), 0, self.max_length - 1
+            )
+        ]
+
+
+def heavy_author_ids(profile):
+    return profile.following.filter(
+        followers_count__gt=get_config()["FANOUT_THRESHOLD"]
+    ).values_list("id", flat=True)
+
+
+def fan_out(post):
+    profile_ids = [post.author_id]
+    followers_count = Profile.objects.values_list("followers_count", flat=True).get(
+        pk=post.author_id
+    )
+
+    if followers_count <= get_config()["FANOUT_THRESHOLD"]:
+        profile_ids.extend(
+            Profile.objects.filter(following=post.author_id).values_list(
+                "id", flat=True
+            )
+        )
+
+    get_backend().push(post, profile_ids)
+
+
+def remove(post):
+    get_backend().remove(post)
+
+
+def follow(profile_id, author_ids):
+    get_backend().backfill(profile_id, author_ids)
+
+
+def unfollow(profile_id, author_ids):
+    get_backend().purge(profile_id, author_ids)
+
+
+def feed(profile, queryset):
+    """
+    Restrict ``queryset`` to the materialized timeline of ``profile``,
+    merging in posts of followed heavy accounts that are not fanned out.
+    """
+    heavy_ids = list(heavy_author_ids(profile))
+    return filter_feed(queryset, get_backend().post_ids(profile.id), heavy_ids)
+
+
+async def afeed(profile, queryset):
+    """``feed`` for async views. The timeline backend is called in a thread."""
+    post_ids = await sync_to_async(get_backend().post_ids)(profile.id)
+    heavy_ids = [pk async for pk in heavy_author_ids(profile)]
+    return filter_feed(queryset, post_ids, heavy_ids)
+
+
+def newest_post_ids(author_id, limit):
+    return (
+        Post.objects.published()
+        .filter(author_id=author_id)
+        .order_by("-created_at", "-id")
+        .values("id")[:limit]
+    )
+
+
+def filter_feed(queryset, post_ids, heavy_ids):
+    condition = Q(id__in=post_ids)
+
+    # Heavy authors are capped like the timeline, each read in index order,
+    # so the feed sorts a bounded merge rather than all of their posts.
+    max_length = get_config()["MAX_LENGTH"]
+    for author_id in heavy_ids:
+        condition |= Q(id__in=newest_post_ids(author_id, max_length))
+
+    return queryset.filter(condition)
@@ -0,0 +1,191 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .images import IMAGE_FIELDS, auto_now_fields
+from .models import ImageUpload
+
+DEFAULTS = {
+    "MAX_SIZE": 20 * 1024 * 1024,
+    "MAX_CHUNK_SIZE": 5 * 1024 * 1024,
+    "MAX_AGE": timedelta(days=1),
+}
+
+# Leading bytes of every accepted content type.
+SIGNATURES = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/gif": (b"GIF87a", b"GIF89a"),
+    "image/webp": (b"RIFF",),
+}
+
+PIL_FORMATS = {
+    "image/jpeg": "JPEG",
+    "image/png": "PNG",
+    "image/gif": "GIF",
+    "image/webp": "WEBP",
+}
+
+TARGET_LABELS = {
+    ImageUpload.Target.POST: "social_media.post",
+    ImageUpload.Target.PROFILE: "social_media.profile",
+}
+
+
+class OffsetConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The chunk does not start at the current upload offset."
+    default_code = "offset_conflict"
+
+    def __init__(self, offset):
+        super().__init__()
+        # Keep the offset an integer so clients can resume from it directly.
+        self.detail = {"detail": self.detail, "offset": offset}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "SOCIAL_MEDIA_UPLOADS", {})}
+
+
+def sniff_content_type(head):
+    for content_type, signatures in SIGNATURES.items():
+        if head.startswith(signatures):
+            if content_type == "image/webp" and head[8:12] != b"WEBP":
+                continue
+            return content_type
+
+    return None
+
+
+class ChunkReader:
+    """Read stored chunks back to back as one file, one chunk open at a time."""
+
+    def __init__(self, names):
+        self.names = iter(names)
+        self.current = None
+        self.advance()
+
+    def advance(self):
+        if self.current is not None:
+            self.current.close()
+
+        name = next(self.names, None)
+        self.current = default_storage.open(name, "rb") if name else None
+
+    def read(self, size=-1):
+        while self.current is not None:
+            data = self.current.read(size)
+            if data:
+                return data
+            self.advance()
+
+        return b""
+
+
+def delete_chunks(upload):
+    for name in upload.chunks:
+        default_storage.delete(name)
+
+
+def write_chunk(upload, offset, stream, length):
+    """
+    Store ``length`` bytes of ``stream`` as the chunk at ``offset``.
+
+    The body goes from the request stream to the storage backend in
+    ``File.chunks()`` sized pieces, never buffered as a whole. The content
+    type is sniffed from the stored first chunk before anything else is kept.
+    """
+    config = get_config()
+
+    if upload.status != ImageUpload.Status.PENDING:
+        raise ValidationError({"detail": "The upload is already finalized."})
+    if offset != upload.offset:
+        raise OffsetConflict(upload.offset)
+    if not 0 < length <= config["MAX_CHUNK_SIZE"]:
+        raise ValidationError({"detail": "Chunk size is out of range."})
+    if offset + length > upload.size:
+        raise ValidationError({"detail": "The chunk runs past the declared size."})
+
+    name = default_storage.save(
+        f"uploads/chunks/{upload.pk}/{offset:012d}-{uuid.uuid4().hex}",
+        File(stream),
+    )
+
+    if default_storage.size(name) != length:
+        default_storage.delete(name)
+        raise ValidationError({"detail": "The chunk was shorter than declared."})
+
+    if offset == 0:
+        with default_storage.open(name, "rb") as chunk:
+            content_type = sniff_content_type(chunk.read(16))
+        if content_type != upload.content_type:
+            default_storage.delete(name)
+            raise ValidationError({"detail": "The content does not match its type."})
+
+    # Only the writer that still sees the old offset may advance it.
+    advanced = ImageUpload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=offset + length, chunks=[*upload.chunks, name]
+    )
+    if not advanced:
+        default_storage.delete(name)
+        upload.refresh_from_db(fields=["offset"])
+        raise OffsetConflict(upload.offset)
+
+    upload.refresh_from_db(fields=["offset", "chunks"])
+    return upload
+
+
+def finalize(upload):
+    """Join the chunks into the image field of the upload target."""
+    if upload.status != ImageUpload.Status.PENDING:
+        raise ValidationError({"detail": "The upload is already finalized."})
+    if upload.offset != upload.size:
+        raise ValidationError({"detail": "The upload is not complete yet."})
+
+    target = upload.get_target()
+    if target is None:
+        raise ValidationError({"detail": "The upload target no longer exists."})
+
+    field = target._meta.get_field(IMAGE_FIELDS[TARGET_LABELS[upload.target]])
+    name = default_storage.save(
+        field.generate_filename(target, upload.filename),
+        File(ChunkReader(upload.chunks)),
+    )
+
+    try:
+        with default_storage.open(name, "rb") as stored, Image.open(stored) as image:
+            image_format = image.format
+            image.verify()
+    except (OSError, SyntaxError, ValueError):
+        image_format = None
+
+    if image_format != PIL_FORMATS[upload.content_type]:
+        default_storage.delete(name)
+        raise ValidationError({"detail": "The uploaded file is not a valid image."})
+
+    setattr(target, field.name, name)
+    target.save(update_fields=[field.name, *auto_now_fields(target)])
+
+    delete_chunks(upload)
+    upload.chunks = []
+    upload.status = ImageUpload.Status.COMPLETE
+    upload.save(update_fields=["chunks", "status"])
+    return target
+
+
+def purge_stale():
+    """Delete uploads older than ``MAX_AGE`` together with their chunks."""
+    cutoff = timezone.now() - get_config()["MAX_AGE"]
+    stale = ImageUpload.objects.filter(created_at__lt=cutoff)
+
+    for upload in stale.iterator():
+        delete_chunks(upload)
+
+    return stale.delete()[0]
@@ -1,11 +1,27 @@
-from django.urls import path, include
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import ProfileViewSet, PostViewSet
+from . import async_views
+from .views import ImageUploadViewSet, MetricsView, ProfileViewSet, PostViewSet
 
 router = DefaultRouter()
 router.register(r"profiles", ProfileViewSet, basename="profile")
 router.register(r"posts", PostViewSet, basename="post")
+router.register(r"uploads", ImageUploadViewSet, basename="upload")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("async/posts/", async_views.post_list, name="async-post-list"),
+    path(
+        "async/posts/liked_posts/",
+        async_views.liked_posts,
+        name="async-post-liked-posts",
+    ),
+    path("async/posts/<int:pk>/", async_views.post_detail, name="async-post-detail"),
+    path(
+        "async/profiles/<int:pk>/",
+        async_views.profile_detail,
+        name="async-profile-detail",
+    ),
+] + router.urls
 
 app_name = "social_media"
@@ -1,37 +1,123 @@
-from rest_framework import viewsets, status
-from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import mixins, viewsets, status
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from .models import Profile, Post
+from rest_framework.views import APIView
+from . import delta, metrics, suggestions, timeline, uploads
+from .cache import CachedRetrieveMixin
+from .models import ImageUpload, Like, Profile, Post
+from .pagination import (
+    CommentCursorPagination,
+    LikeCursorPagination,
+    PostCursorPagination,
+    ProfileCursorPagination,
+    SearchPagination,
+    get_feed_pagination_class,
+)
 from .permissions import IsProfileOwner, IsPostOwner
+from .search import get_backend as get_search_backend
 from .serializers import (
+    BulkIdsSerializer,
+    RelationshipIdsSerializer,
     ProfileSerializer,
     ProfileDetailSerializer,
     ProfileImageSerializer,
     ProfileListSerializer,
+    ProfileSuggestionSerializer,
     PostListSerializer,
     PostDetailSerializer,
+    PostDeltaSerializer,
     CommentSerializer,
+    ImageUploadSerializer,
     PostImageSerializer,
     PostSerializer,
 )
 from rest_framework.decorators import action
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+def get_bulk_ids(request):
+    serializer = BulkIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data["ids"]
+
+
+def get_query_ids(request):
+    """Validate comma separated ``ids`` query parameters, e.g. ``?ids=1,2``."""
+    ids = [
+        pk
+        for value in request.query_params.getlist("ids")
+        for pk in value.split(",")
+        if pk
+    ]
+    serializer = RelationshipIdsSerializer(data={"ids": ids})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data["ids"]
+
+
+def bulk_response(ids, available, changed, done, unchanged):
+    """Report the outcome of a bulk action per requested id, in request order."""
+    changed = set(changed)
+    results = []
+
+    for pk in ids:
+        if pk not in available:
+            result = "unavailable"
+        elif pk in changed:
+            result = done
+        else:
+            result = unchanged
+        results.append({"id": pk, "result": result})
+
+    return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class SearchMixin:
+    search_fields = ()
+
+    @action(methods=["GET"], detail=False, permission_classes=[IsAuthenticated])
+    def search(self, request):
+        query = request.query_params.get("q", "").strip()
+        queryset = self.get_queryset()
+
+        if query:
+            queryset = get_search_backend().search(queryset, self.search_fields, query)
+        else:
+            queryset = queryset.none()
+
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ProfileViewSet(SearchMixin, CachedRetrieveMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsProfileOwner]
-    queryset = Profile.objects.all().prefetch_related("followers", "following")
+    pagination_class = ProfileCursorPagination
+    cache_kind = "profile"
+    search_fields = ("username",)
+    throttle_scopes = {
+        "follow": "follows",
+        "unfollow": "follows",
+        "bulk_follow": "follows",
+        "bulk_unfollow": "follows",
+    }
+    queryset = Profile.objects.all()
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.queryset.for_action(self.action)
         username = self.request.query_params.get("username", None)
 
         if username:
-            queryset = queryset.filter(username__icontains=username)
+            queryset = get_search_backend().filter(queryset, ("username",), username)
 
         return queryset.distinct()
 
     def get_serializer_class(self):
-        if self.action == "list":
+        if self.action in ("list", "search"):
             return ProfileListSerializer
         elif self.action == "retrieve":
             return ProfileDetailSerializer
@@ -40,15 +126,79 @@ class ProfileViewSet(viewsets.ModelViewSet):
 
         return ProfileSerializer
 
+    @action(methods=["GET"], detail=False, permission_classes=[IsAuthenticated])
+    def suggestions(self, request):
+        """Profiles followed by the ones the user follows, most mutual first."""
+        profiles = suggestions.for_profile(request.user.profile)
+        serializer = ProfileSuggestionSerializer(
+            profiles, many=True, context=self.get_serializer_context()
+        )
+        return Response({"results": serializer.data})
+
+    @action(methods=["GET"], detail=False, permission_classes=[IsAuthenticated])
+    def relationships(self, request):
+        """Whether the user follows and is followed by each profile in ``ids``."""
+        ids = get_query_ids(request)
+        user_profile = request.user.profile
+        follows = Profile.followers.through.objects
+        following = set(
+            follows.filter(to_profile=user_profile, from_profile__in=ids).values_list(
+                "from_profile", flat=True
+            )
+        )
+        followed_by = set(
+            follows.filter(from_profile=user_profile, to_profile__in=ids).values_list(
+                "to_profile", flat=True
+            )
+        )
+
+        results = [
+            {"id": pk, "following": pk in following, "followed_by": pk in followed_by}
+            for pk in ids
+        ]
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    def paginate_profiles(self, queryset):
+        page = self.paginate_queryset(queryset)
+        serializer = ProfileListSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(methods=["GET"], detail=True, permission_classes=[IsAuthenticated])
+    def followers(self, request, pk=None):
+        profile = self.get_object()
+        return self.paginate_profiles(Profile.objects.filter(following=profile))
+
+    @action(methods=["GET"], detail=True, permission_classes=[IsAuthenticated])
+    def following(self, request, pk=None):
+        profile = self.get_object()
+        return self.paginate_profiles(Profile.objects.filter(followers=profile))
+
+    def follow_counts(self, user_profile, profile):
+        counts = {
+            pk: (followers, following)
+            for pk, followers, following in Profile.objects.filter(
+                pk__in=[user_profile.pk, profile.pk]
+            ).values_list("pk", "followers_count", "following_count")
+        }
+        return {
+            "followers": counts[profile.pk][0],
+            "following": counts[user_profile.pk][1],
+        }
+
     @action(methods=["POST"], detail=True, permission_classes=[IsAuthenticated])
     def follow(self, request, pk=None):
         profile = self.get_object()
         user_profile = self.request.user.profile
 
-        if user_profile != profile and profile not in user_profile.following.all():
-            user_profile.follow(profile)
+        if user_profile != profile and user_profile.follow(profile):
             return Response(
-                {"detail": "Profile followed successfully."}, status=status.HTTP_200_OK
+                {
+                    "detail": "Profile followed successfully.",
+                    **self.follow_counts(user_profile, profile),
+                },
+                status=status.HTTP_200_OK,
             )
         return Response(
             {"detail": "Unable to follow the profile."},
@@ -60,10 +210,12 @@ class ProfileViewSet(viewsets.ModelViewSet):
         profile = self.get_object()
         user_profile = self.request.user.profile
 
-        if user_profile != profile and profile in user_profile.following.all():
-            user_profile.unfollow(profile)
+        if user_profile != profile and user_profile.unfollow(profile):
             return Response(
-                {"detail": "Profile unfollowed successfully."},
+                {
+                    "detail": "Profile unfollowed successfully.",
+                    **self.follow_counts(user_profile, profile),
+                },
                 status=status.HTTP_200_OK,
             )
         return Response(
@@ -71,6 +223,41 @@ class ProfileViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    def available_follow_ids(self, user_profile, ids):
+        return set(
+            Profile.objects.filter(pk__in=ids)
+            .exclude(pk=user_profile.pk)
+            .values_list("pk", flat=True)
+        )
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-follow",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_follow(self, request):
+        ids = get_bulk_ids(request)
+        user_profile = self.request.user.profile
+        available = self.available_follow_ids(user_profile, ids)
+
+        added = user_profile.follow_many([pk for pk in ids if pk in available])
+        return bulk_response(ids, available, added, "followed", "already_following")
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-unfollow",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_unfollow(self, request):
+        ids = get_bulk_ids(request)
+        user_profile = self.request.user.profile
+        available = self.available_follow_ids(user_profile, ids)
+
+        removed = user_profile.unfollow_many([pk for pk in ids if pk in available])
+        return bulk_response(ids, available, removed, "unfollowed", "not_following")
+
     @action(
         methods=["POST"],
         detail=True,
@@ -87,39 +274,65 @@ class ProfileViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(SearchMixin, CachedRetrieveMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsPostOwner]
-    queryset = (
-        Post.objects.all()
-        .prefetch_related("comments")
-        .select_related("author")
-        .order_by("-created_at")
-    )
+    pagination_class = PostCursorPagination
+    cache_kind = "post"
+    search_fields = ("title", "content")
+    throttle_scopes = {
+        "create": "posts",
+        "comment": "comments",
+        "like_unlike": "likes",
+        "bulk_like": "likes",
+        "bulk_unlike": "likes",
+    }
+    queryset = Post.objects.all().order_by("-created_at")
 
     def get_queryset(self):
         user = self.request.user
         author = self.request.query_params.get("author", None)
         title = self.request.query_params.get("title", None)
+        queryset = self.queryset.for_action(self.action)
 
-        queryset = self.queryset.filter(
-            author__in=user.profile.following.all() | Profile.objects.filter(user=user)
-        )
+        if self.action == "list" and not (author or title):
+            return timeline.feed(user.profile, queryset)
+
+        queryset = queryset.visible_to(user.profile)
 
+        backend = get_search_backend()
         if author:
-            queryset = queryset.filter(author__username__icontains=author)
+            queryset = queryset.filter(
+                author__in=backend.filter(Profile.objects.all(), ("username",), author)
+            )
         if title:
-            queryset = queryset.filter(title__icontains=title)
+            queryset = backend.filter(queryset, ("title",), title)
 
         return queryset.distinct()
 
+    def get_cache_dependencies(self, pk):
+        visible = self.get_queryset().prefetch_related(None)
+        author_id = get_object_or_404(
+            visible.values_list("author_id", flat=True), pk=pk
+        )
+        return [("post", pk), ("profile", author_id)]
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.action == "list":
+                self._paginator = get_feed_pagination_class(self.request)()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
     def get_serializer_class(self):
         if self.action == "retrieve":
             return PostDetailSerializer
-        if self.action == "comment":
+        if self.action in ("comment", "comments"):
             return CommentSerializer
         if self.action == "upload_image":
             return PostImageSerializer
-        if self.action == "list":
+        if self.action in ("list", "search"):
             return PostListSerializer
         return PostSerializer
 
@@ -145,36 +358,179 @@ class PostViewSet(viewsets.ModelViewSet):
         serializer = CommentSerializer(data=request.data)
 
         serializer.is_valid(raise_exception=True)
-        serializer.save(
-            author=user_profile,
-            post=post,
-            content=serializer.validated_data["content"],
-        )
+        with transaction.atomic():
+            serializer.save(
+                author=user_profile,
+                post=post,
+                content=serializer.validated_data["content"],
+            )
 
         return Response(
             {"detail": "Comment added successfully."}, status=status.HTTP_200_OK
         )
 
+    @action(methods=["GET"], detail=True, permission_classes=[IsAuthenticated])
+    def comments(self, request, pk=None):
+        post = self.get_object()
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(post.comments.all(), request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(methods=["POST"], detail=True, permission_classes=[IsAuthenticated])
     def like_unlike(self, request, pk=None):
         post = self.get_object()
         user_profile = self.request.user.profile
 
-        if user_profile not in post.likes.all():
-            post.likes.add(user_profile)
+        liked = post.toggle_like(user_profile)
+        likes = Post.objects.values_list("likes_count", flat=True).get(pk=post.pk)
+
+        if liked:
             return Response(
-                {"detail": "Post liked successfully."}, status=status.HTTP_200_OK
+                {"detail": "Post liked successfully.", "liked": True, "likes": likes},
+                status=status.HTTP_200_OK,
             )
-
-        post.likes.remove(user_profile)
         return Response(
-            {"detail": "Your like was removed."},
+            {"detail": "Your like was removed.", "liked": False, "likes": likes},
             status=status.HTTP_200_OK,
         )
 
+    def available_post_ids(self, ids):
+        return set(
+            self.get_queryset()
+            .prefetch_related(None)
+            .filter(pk__in=ids)
+            .values_list("pk", flat=True)
+        )
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-like",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_like(self, request):
+        ids = get_bulk_ids(request)
+        available = self.available_post_ids(ids)
+
+        added = Post.objects.like_many(
+            self.request.user.profile, [pk for pk in ids if pk in available]
+        )
+        return bulk_response(ids, available, added, "liked", "already_liked")
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-unlike",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_unlike(self, request):
+        ids = get_bulk_ids(request)
+        available = self.available_post_ids(ids)
+
+        removed = Post.objects.unlike_many(
+            self.request.user.profile, [pk for pk in ids if pk in available]
+        )
+        return bulk_response(ids, available, removed, "unliked", "not_liked")
+
     @action(methods=["GET"], detail=False, permission_classes=[IsAuthenticated])
     def liked_posts(self, request):
-        user_profile = self.request.user.profile
-        queryset = Post.objects.filter(likes=user_profile)
-        serializer = self.get_serializer(queryset, many=True)
+        likes = Like.objects.filter(profile=self.request.user.profile)
+        paginator = LikeCursorPagination()
+        page = paginator.paginate_queryset(
+            likes.select_related("post__author"), request, view=self
+        )
+        serializer = self.get_serializer([like.post for like in page], many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="feed/delta",
+        permission_classes=[IsAuthenticated],
+    )
+    def feed_delta(self, request):
+        """
+        Posts of the feed created, edited or deleted since the ``since``
+        cursor, with the cursor to poll next. Polls without changes are
+        answered with 304 to a matching ``If-None-Match``; the refreshed
+        cursor is sent in the ``X-Delta-Since`` header, so that idle pollers
+        do not run into its expiry.
+        """
+        user_profile = request.user.profile
+        feed = timeline.feed(user_profile, Post.objects.for_action("list"))
+        changes = delta.changes(user_profile, feed, request.query_params.get("since"))
+        etag = changes.etag(request.user.pk)
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            serializer = PostDeltaSerializer(
+                changes.posts, many=True, context=self.get_serializer_context()
+            )
+            response = Response(
+                {
+                    "results": serializer.data,
+                    "deleted": changes.deleted,
+                    "since": changes.cursor,
+                    "has_more": changes.has_more,
+                }
+            )
+
+        response["ETag"] = etag
+        response["X-Delta-Since"] = changes.cursor
+        patch_vary_headers(response, ("Authorization",))
+        return response
+
+
+class ImageUploadViewSet(
+    mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
+):
+    """
+    Resumable image uploads: create the upload, PUT the raw bytes in chunks
+    with ``?offset=``, then finalize to attach the image to its target.
+    """
+
+    serializer_class = ImageUploadSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_scopes = {"create": "uploads", "finalize": "uploads"}
+
+    def get_queryset(self):
+        return ImageUpload.objects.filter(owner=self.request.user.profile)
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user.profile)
+
+    def update(self, request, pk=None):
+        upload = self.get_object()
+
+        try:
+            offset = int(request.query_params.get("offset", ""))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return Response(
+                {"detail": "An integer offset is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        uploads.write_chunk(upload, offset, request.stream, length)
+        serializer = self.get_serializer(upload)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(methods=["POST"], detail=True)
+    def finalize(self, request, pk=None):
+        upload = self.get_object()
+        uploads.finalize(upload)
+        serializer = self.get_serializer(upload)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class MetricsView(APIView):
+    """Per-route request statistics of this process, as JSON or Prometheus text."""
+
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (JSONRenderer, metrics.PrometheusRenderer)
+    throttle_classes = ()
+
+    def get(self, request):
+        return Response(metrics.registry.snapshot())
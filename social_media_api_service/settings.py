@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "social_media.middleware.RequestMetricsMiddleware",
+    "social_media.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -79,14 +81,65 @@ WSGI_APPLICATION = "social_media_api_service.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+if os.environ.get("POSTGRES_DB"):
+    POSTGRES = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ["POSTGRES_DB"],
+        "USER": os.environ.get("POSTGRES_USER", "postgres"),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+        "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+        # pgbouncer in transaction pooling mode cannot keep named cursors
+        # open across transactions.
+        "DISABLE_SERVER_SIDE_CURSORS": (
+            os.environ.get("POSTGRES_PGBOUNCER", "0") == "1"
+        ),
     }
+    DATABASES = {
+        "default": {**POSTGRES, "HOST": os.environ.get("POSTGRES_HOST", "localhost")}
+    }
+    replica_hosts = os.environ.get("POSTGRES_REPLICA_HOSTS", "")
+    for index, host in enumerate(filter(None, replica_hosts.split(","))):
+        DATABASES[f"replica_{index}"] = {
+            **POSTGRES,
+            "HOST": host.strip(),
+            "TEST": {"MIRROR": "default"},
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        }
+    }
+
+DATABASE_ROUTERS = ["social_media.replicas.ReplicaRouter"]
+
+SOCIAL_MEDIA_REPLICAS = {
+    "ALIASES": [alias for alias in DATABASES if alias != "default"],
+    "PIN_SECONDS": int(os.environ.get("REPLICA_PIN_SECONDS", "5")),
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+if os.environ.get("REDIS_CACHE_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_CACHE_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -138,13 +191,24 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     # "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "social_media.throttling.AnonRateThrottle",
+        "social_media.throttling.UserRateThrottle",
+        "social_media.throttling.ActionRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "40/day", "user": "300/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "40/day",
+        "user": "300/day",
+        "posts": "30/hour",
+        "comments": "60/hour",
+        "likes": "120/hour",
+        "follows": "60/hour",
+        "uploads": "20/hour",
+    },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
+    "DEFAULT_PAGINATION_CLASS": "social_media.pagination.KeysetPagination",
+    "PAGE_SIZE": 20,
 }
 
 
@@ -152,6 +216,14 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",
+}
+
+USER_TOKEN_BLACKLIST = {
+    "BACKEND": os.environ.get(
+        "TOKEN_BLACKLIST_BACKEND", "user.blacklist.LocalBloomFilterBackend"
+    ),
+    "OPTIONS": {},
 }
 
 CELERY_BROKER_URL = "redis://localhost:6379/0"
@@ -159,3 +231,79 @@ CELERY_RESULT_BACKEND = "redis://localhost:6379/0"
 CELERY_TIMEZONE = "Europe/Kiev"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+CELERY_TASK_ALWAYS_EAGER = os.environ.get("CELERY_TASK_ALWAYS_EAGER", "0") == "1"
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "publish-scheduled-posts": {
+        "task": "social_media.tasks.publish_scheduled_posts",
+        "schedule": timedelta(minutes=1),
+    },
+    "refresh-post-scores": {
+        "task": "social_media.tasks.refresh_post_scores",
+        "schedule": timedelta(minutes=10),
+    },
+    "rebuild-follow-suggestions": {
+        "task": "social_media.tasks.rebuild_follow_suggestions",
+        "schedule": timedelta(hours=6),
+    },
+    "trim-timelines": {
+        "task": "social_media.tasks.trim_timelines",
+        "schedule": timedelta(hours=1),
+    },
+    "prune-outstanding-tokens": {
+        "task": "user.tasks.prune_outstanding_tokens",
+        "schedule": timedelta(hours=1),
+    },
+    "purge-stale-uploads": {
+        "task": "social_media.tasks.purge_stale_uploads",
+        "schedule": timedelta(hours=1),
+    },
+    "purge-post-tombstones": {
+        "task": "social_media.tasks.purge_post_tombstones",
+        "schedule": timedelta(days=1),
+    },
+}
+
+SOCIAL_MEDIA_TIMELINE = {
+    "BACKEND": os.environ.get(
+        "TIMELINE_BACKEND", "social_media.timeline.DatabaseTimelineBackend"
+    ),
+    "OPTIONS": {},
+    "MAX_LENGTH": 800,
+    "FANOUT_THRESHOLD": 1000,
+}
+
+if os.environ.get("REDIS_CACHE_URL"):
+    SOCIAL_MEDIA_THROTTLE = {
+        "BACKEND": "social_media.throttling.RedisRateLimitBackend",
+        "OPTIONS": {"location": os.environ["REDIS_CACHE_URL"]},
+    }
+else:
+    SOCIAL_MEDIA_THROTTLE = {
+        "BACKEND": "social_media.throttling.LocalRateLimitBackend",
+    }
+
+SOCIAL_MEDIA_CACHE = {
+    "ALIAS": "default",
+    "ENABLED": os.environ.get("SOCIAL_MEDIA_CACHE_ENABLED", "1") == "1",
+    "TIMEOUT": 300,
+    "AUTH_TIMEOUT": 60,
+}
+
+SOCIAL_MEDIA_METRICS = {
+    "ENABLED": os.environ.get("SOCIAL_MEDIA_METRICS_ENABLED", "1") == "1",
+    "LATENCY_BUDGET": 500,
+    "QUERY_BUDGET": 20,
+    "TRACE_SAMPLE_RATE": 0.1,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "social_media.metrics": {"handlers": ["console"], "level": "WARNING"},
+    },
+}
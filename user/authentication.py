@@ -0,0 +1,98 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from social_media import cache, metrics
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that loads the user together with its profile in a
+    single query and keeps the pair in the cache for ``AUTH_TIMEOUT``.
+
+    Entries are keyed by the ``("user", id)`` version, which is bumped when
+    the user or its profile changes and on logout.
+    """
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            message = _("Token contained no recognizable user identification")
+            raise InvalidToken(message)
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+
+        if not cache.is_enabled():
+            return self.load_user(user_id)
+
+        key = cache.make_key("auth", user_id, [("user", user_id)])
+        user = cache.get_cache().get(key)
+
+        if user is None:
+            metrics.count("cache_misses")
+            user = self.load_user(user_id)
+            cache.get_cache().set(key, user, cache.get_config()["AUTH_TIMEOUT"])
+        else:
+            metrics.count("cache_hits")
+
+        return user
+
+    def load_user(self, user_id):
+        try:
+            user = self.user_model.objects.select_related("profile").get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        return self.check_active(user)
+
+    def check_active(self, user):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views, through the async ORM and cache."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+
+        if not cache.is_enabled():
+            return await self.aload_user(user_id)
+
+        key = await cache.amake_key("auth", user_id, [("user", user_id)])
+        user = await cache.get_cache().aget(key)
+
+        if user is None:
+            metrics.count("cache_misses")
+            user = await self.aload_user(user_id)
+            await cache.get_cache().aset(key, user, cache.get_config()["AUTH_TIMEOUT"])
+        else:
+            metrics.count("cache_hits")
+
+        return user
+
+    async def aload_user(self, user_id):
+        try:
+            user = await self.user_model.objects.select_related("profile").aget(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        return self.check_active(user)
@@ -0,0 +1,268 @@
+import hashlib
+import math
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+DEFAULTS = {
+    "BACKEND": "user.blacklist.LocalBloomFilterBackend",
+    "OPTIONS": {},
+    "CAPACITY": 100_000,
+    "ERROR_RATE": 0.001,
+}
+
+_backend = None
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "USER_TOKEN_BLACKLIST", {})}
+
+
+def get_backend():
+    global _backend
+
+    if _backend is None:
+        config = get_config()
+        backend_class = import_string(config["BACKEND"])
+        _backend = backend_class(
+            capacity=config["CAPACITY"],
+            error_rate=config["ERROR_RATE"],
+            **config["OPTIONS"],
+        )
+
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+
+    if setting == "USER_TOKEN_BLACKLIST":
+        _backend = None
+
+
+def blacklisted_jtis(after_id=0, unexpired=False):
+    """Yield ``(id, jti)`` of blacklisted tokens in id order."""
+    tokens = BlacklistedToken.objects.filter(id__gt=after_id)
+    if unexpired:
+        tokens = tokens.filter(token__expires_at__gt=timezone.now())
+
+    return tokens.order_by("id").values_list("id", "token__jti").iterator()
+
+
+class BloomFilter:
+    """
+    A fixed-size bloom filter over strings.
+
+    Bits are numbered from the most significant bit of the first byte, the
+    same order Redis uses for ``SETBIT``, so ``bits`` can be stored as is.
+    """
+
+    def __init__(self, capacity, error_rate, bits=None):
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray(math.ceil(self.size / 8))
+
+    def positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8]), int.from_bytes(digest[8:]) | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position // 8] |= 0x80 >> position % 8
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position // 8] & 0x80 >> position % 8
+            for position in self.positions(value)
+        )
+
+
+class LocalBloomFilterBackend:
+    """
+    A per-process filter built from the blacklist on first use.
+
+    After commit, every blacklisted jti is also appended to a numbered log in
+    the shared cache. Each check compares the log length with what this
+    process has seen and applies only the new entries, falling back to a
+    full rebuild when some of them are gone.
+
+    The log only reaches other processes through a cache they share, so
+    with a per-process cache the filter is not ``shared`` and is bypassed.
+    """
+
+    count_key = "token_blacklist:count"
+
+    def __init__(self, capacity, error_rate, alias="default"):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.alias = alias
+        self.filter = None
+        self.seen = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def shared(self):
+        return not isinstance(self.cache, (LocMemCache, DummyCache))
+
+    def entry_key(self, number):
+        return f"token_blacklist:entry:{number}"
+
+    def get_count(self):
+        self.cache.add(self.count_key, 0, None)
+        return self.cache.get(self.count_key)
+
+    def rebuild(self):
+        self.seen = self.get_count()
+        self.filter = BloomFilter(self.capacity, self.error_rate)
+        for _, jti in blacklisted_jtis(unexpired=True):
+            self.filter.add(jti)
+
+    def sync(self):
+        if self.filter is None:
+            self.rebuild()
+            return
+
+        count = self.get_count()
+        if count == self.seen:
+            return
+
+        keys = [self.entry_key(number) for number in range(self.seen + 1, count + 1)]
+        entries = self.cache.get_many(keys)
+        if count < self.seen or len(entries) != len(keys):
+            # The log was reset or partly evicted.
+            self.rebuild()
+            return
+
+        for jti in entries.values():
+            self.filter.add(jti)
+        self.seen = count
+
+    def publish(self, jti):
+        self.cache.add(self.count_key, 0, None)
+        number = self.cache.incr(self.count_key)
+        timeout = api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+        self.cache.set(self.entry_key(number), jti, timeout)
+
+    def add(self, jti):
+        self.sync()
+        self.filter.add(jti)
+        transaction.on_commit(lambda: self.publish(jti))
+
+    def __contains__(self, jti):
+        self.sync()
+        return jti in self.filter
+
+
+class RedisBloomFilterBackend:
+    """
+    A filter shared by every process, kept as a bit string in Redis.
+
+    It is built when the key is missing and swapped in atomically by
+    ``rebuild``, which the pruning task runs after deleting expired tokens.
+    """
+
+    shared = True
+
+    def __init__(self, capacity, error_rate, location, key="token_blacklist:bloom"):
+        import redis
+
+        self.client = redis.Redis.from_url(location)
+        self.shape = BloomFilter(capacity, error_rate, bits=b"")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.key = key
+
+    def rebuild(self):
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        last_id = 0
+        for last_id, jti in blacklisted_jtis(unexpired=True):
+            bloom.add(jti)
+
+        pipeline = self.client.pipeline()
+        pipeline.set(f"{self.key}:new", bytes(bloom.bits))
+        pipeline.rename(f"{self.key}:new", self.key)
+        pipeline.execute()
+
+        # Bits set while the filter was being built were just overwritten.
+        for _, jti in blacklisted_jtis(after_id=last_id):
+            self.set_bits(jti)
+
+    def set_bits(self, jti):
+        pipeline = self.client.pipeline()
+        for position in self.shape.positions(jti):
+            pipeline.setbit(self.key, position, 1)
+        pipeline.execute()
+
+    def add(self, jti):
+        # SETBIT on a missing key would start an empty filter.
+        if not self.client.exists(self.key):
+            self.rebuild()
+
+        self.set_bits(jti)
+        transaction.on_commit(lambda: self.set_bits(jti))
+
+    def __contains__(self, jti):
+        pipeline = self.client.pipeline()
+        pipeline.exists(self.key)
+        for position in self.shape.positions(jti):
+            pipeline.getbit(self.key, position)
+        exists, *bits = pipeline.execute()
+
+        if not exists:
+            self.rebuild()
+            return jti in self
+
+        return all(bits)
+
+
+def might_be_blacklisted(jti):
+    backend = get_backend()
+    # A filter other processes cannot update may miss their blacklisting.
+    return not backend.shared or jti in backend
+
+
+def add(jti):
+    get_backend().add(jti)
+
+
+def rebuild():
+    get_backend().rebuild()
+
+
+def prune_expired(batch_size=1000):
+    """
+    Delete expired outstanding tokens, and their blacklist rows with them,
+    in batches of ``batch_size``, then rebuild the filter without them.
+    """
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+    total = 0
+
+    while True:
+        ids = list(expired.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        total += len(ids)
+
+    if total:
+        rebuild()
+    return total
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from user import blacklist
+
+
+@shared_task
+def prune_outstanding_tokens(batch_size=1000):
+    return blacklist.prune_expired(batch_size=batch_size)
@@ -1,3 +1,166 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from social_media import cache
+from social_media.models import Profile
+from user import blacklist
+from user.authentication import CachedJWTAuthentication
+from user.tasks import prune_outstanding_tokens
+from user.tokens import RefreshToken
+
+
+class ProfileView(APIView):
+    def get(self, request):
+        return Response({"username": request.user.profile.username})
+
+
+class AuthenticationQueryBenchmark(TestCase):
+    """Queries spent per request on resolving ``request.user.profile``."""
+
+    def setUp(self):
+        cache.get_cache().clear()
+        user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.profile = Profile.objects.create(user=user, username="test_user")
+        token = RefreshToken.for_user(user).access_token
+        self.factory = APIRequestFactory(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def queries_per_request(self, authentication_class, requests=3):
+        view = ProfileView.as_view(authentication_classes=[authentication_class])
+        counts = []
+
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as queries:
+                response = view(self.factory.get("/"))
+            self.assertEqual(response.data["username"], "test_user")
+            counts.append(len(queries))
+
+        return counts
+
+    def test_jwt_authentication(self):
+        self.assertEqual(self.queries_per_request(JWTAuthentication), [2, 2, 2])
+
+    def test_cached_jwt_authentication(self):
+        self.assertEqual(self.queries_per_request(CachedJWTAuthentication), [1, 0, 0])
+
+    def test_profile_change_invalidates_cached_user(self):
+        self.queries_per_request(CachedJWTAuthentication, requests=1)
+
+        self.profile.username = "renamed"
+        self.profile.save()
+
+        view = ProfileView.as_view(authentication_classes=[CachedJWTAuthentication])
+        self.assertEqual(view(self.factory.get("/")).data["username"], "renamed")
+
+
+class BloomFilterTests(TestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = blacklist.BloomFilter(capacity=1000, error_rate=0.01)
+        added = [f"added-{index}" for index in range(1000)]
+        for value in added:
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in added))
+        false_positives = sum(f"other-{index}" in bloom for index in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+# A cache that other processes can read too, like Redis in production.
+SHARED_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(tempfile.gettempdir(), "user-tests-cache"),
+    }
+}
+
+
+@override_settings(CACHES=SHARED_CACHES)
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        blacklist.reset_backend("USER_TOKEN_BLACKLIST")
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+
+    def refresh_access(self):
+        return self.client.post(
+            reverse("user:token_refresh"), {"refresh": str(self.refresh)}
+        )
+
+    def test_refresh_skips_the_database_until_blacklisted(self):
+        blacklist.get_backend().sync()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.refresh_access().status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                reverse("user:logout"), {"refresh_token": str(self.refresh)}
+            )
+        self.assertEqual(res.status_code, status.HTTP_205_RESET_CONTENT)
+
+        res = self.refresh_access()
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_blacklist_reaches_other_processes(self):
+        other_process = blacklist.LocalBloomFilterBackend(1000, 0.01)
+        self.assertNotIn("revoked-jti", other_process)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            blacklist.add("revoked-jti")
+
+        self.assertIn("revoked-jti", other_process)
+
+    def test_blacklisting_through_simplejwt_reaches_the_filter(self):
+        token = tokens.RefreshToken(str(self.refresh))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+
+        self.assertTrue(blacklist.might_be_blacklisted(token["jti"]))
+        res = self.refresh_access()
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+    )
+    def test_per_process_cache_falls_back_to_the_database(self):
+        blacklist.get_backend().sync()
+        # Blacklisted without this process hearing of it, as by another one.
+        token = OutstandingToken.objects.get(jti=self.refresh["jti"])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token)])
+
+        self.assertNotIn(self.refresh["jti"], blacklist.get_backend())
+        self.assertTrue(blacklist.might_be_blacklisted(self.refresh["jti"]))
+        res = self.refresh_access()
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_prune_removes_expired_tokens(self):
+        self.refresh.blacklist()
+        OutstandingToken.objects.update(expires_at=timezone.now() - timedelta(1))
+        RefreshToken.for_user(self.user)
+
+        self.assertEqual(prune_outstanding_tokens(batch_size=1), 1)
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertFalse(BlacklistedToken.objects.exists())
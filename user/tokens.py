@@ -0,0 +1,16 @@
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.settings import api_settings
+
+from user import blacklist
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    A refresh token whose blacklist check only reaches the database when the
+    bloom filter reports a possible match. Blacklisted tokens reach the
+    filter from a ``BlacklistedToken`` receiver.
+    """
+
+    def check_blacklist(self):
+        if blacklist.might_be_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
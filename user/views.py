@@ -2,10 +2,10 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.tokens import RefreshToken
-
+from social_media import cache
+from user.authentication import CachedJWTAuthentication
 from user.serializers import UserSerializer
+from user.tokens import RefreshToken
 
 
 class RegisterView(generics.CreateAPIView):
@@ -14,7 +14,7 @@ class RegisterView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
@@ -29,6 +29,7 @@ class LogoutView(APIView):
             refresh_token = request.data["refresh_token"]
             token = RefreshToken(refresh_token)
             token.blacklist()
+            cache.invalidate("user", request.user.pk)
 
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception: